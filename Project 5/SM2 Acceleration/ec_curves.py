@@ -0,0 +1,345 @@
+import functools
+import hashlib
+import random
+import time
+
+import sm2_acc
+from ec_jacobian import INFINITY, add_affine, batch_to_affine, double_a0, double_a3, double_generic, to_affine
+from ec_jacobian import add as jacobian_add
+from sm2_acc import wnaf
+from sm2_field import invert, mpz
+
+try:
+    import ecdsa
+except ImportError:  # ecdsa 为可选依赖，仅用于交叉校验与性能对比
+    ecdsa = None
+
+
+# ========== 通用短 Weierstrass 曲线 ==========
+# y^2 = x^3 + ax + b (mod p)，基点 G 的阶为 n。仿射点为 (x, y) 元组，无穷远点为 None；
+# 内部与 sm2_acc 共用 ec_jacobian 的 Jacobian 公式（Z == 0 为无穷远点）、混合点加与批量求逆归一化，
+# 交错 wNAF 共用一条倍点链。
+# 倍点公式按 a 选择：a = -3（SM2、P-256）dbl-2001-b，a = 0（secp256k1）dbl-2009-l，其余 dbl-2007-bl。
+# 点乘不是恒定时间的，ecdsa_sign 只用于测试与演示。
+
+
+class Curve:
+    # glv = (beta, lam, (a1, b1, a2, b2))：自同态 phi(x, y) = (beta*x, y) = lam*(x, y)，
+    # 标量 k 按格基 (a1, b1)、(a2, b2) 拆成 k1 + k2*lam，k1、k2 约为 n 的一半长，倍点链随之减半
+    def __init__(self, name: str, p, a, b, n, gx, gy, glv=None, base_width: int = 8, width: int = 5):
+        self.name = name
+        self.p, self.a, self.b, self.n = mpz(p), mpz(a) % p, mpz(b), mpz(n)
+        self.G = (mpz(gx), mpz(gy))
+        self.glv = None if glv is None else (mpz(glv[0]), mpz(glv[1]), tuple(mpz(v) for v in glv[2]))
+        self.base_width = base_width
+        self.width = width
+        self.nbits = int(n).bit_length()
+        # 倍点函数签名统一为 (X, Y, Z, p)，点加遇到两点相同时回调它
+        if self.a == 0:
+            self._double = double_a0
+        elif self.a == self.p - 3:
+            self._double = double_a3
+        else:
+            self._double = functools.partial(double_generic, a=self.a)
+        self._base_tables = None
+
+    def __repr__(self):
+        return f"Curve({self.name})"
+
+    # ---------- 仿射工具 ----------
+    def is_on_curve(self, pt) -> bool:
+        if pt is None:
+            return False
+        x, y = pt
+        p = self.p
+        return 0 <= x < p and 0 <= y < p and (y * y - (x * x + self.a) * x - self.b) % p == 0
+
+    def neg(self, pt):
+        return None if pt is None else (pt[0], (-pt[1]) % self.p)
+
+    def endomorphism(self, pt):
+        # phi(P) = lam * P，只需一次域乘法
+        return None if pt is None else (self.glv[0] * pt[0] % self.p, pt[1])
+
+    # ---------- Jacobian 点运算 ----------
+    def to_affine(self, J):
+        return to_affine(*J, self.p)
+
+    def add(self, pt1, pt2):
+        if pt2 is None:
+            return pt1
+        return self.to_affine(add_affine(*self.from_affine(pt1), *pt2, self.p, self._double))
+
+    @staticmethod
+    def from_affine(pt):
+        return INFINITY if pt is None else (pt[0], pt[1], mpz(1))
+
+    # ---------- 标量拆分与预计算 ----------
+    def split(self, k):
+        # GLV 拆分：k ≡ k1 + k2*lam (mod n)，|k1|、|k2| 约为 sqrt(n)
+        _, _, (a1, b1, a2, b2) = self.glv
+        n, half = self.n, self.n >> 1
+        c1 = (b2 * k + half) // n
+        c2 = (-b1 * k + half) // n
+        return k - c1 * a1 - c2 * a2, -c1 * b1 - c2 * b2
+
+    def _odd_multiples(self, pt, width: int):
+        # [P, 3P, ..., (2^(w-1)-1)P] 的仿射坐标及其相反点
+        p, double = self.p, self._double
+        J = self.from_affine(pt)
+        J2 = double(*J, p)
+        jac = [J]
+        for _ in range((1 << (width - 2)) - 1):
+            jac.append(jacobian_add(*jac[-1], *J2, p, double))
+        pos = batch_to_affine(jac, p)
+        return pos, [(x, p - y) for x, y in pos]
+
+    def _phi_table(self, table):
+        # 由 P 的倍点表直接得到 phi(P) 的倍点表：横坐标各乘一次 beta
+        beta, p = self.glv[0], self.p
+        pos, neg = table
+        return [(beta * x % p, y) for x, y in pos], [(beta * x % p, y) for x, y in neg]
+
+    def _tables(self, pt, width: int):
+        # 返回 [(P 的表), (phi(P) 的表)]，无 GLV 时只有前者
+        table = self._odd_multiples(pt, width)
+        return [table, self._phi_table(table)] if self.glv else [table]
+
+    def _base(self):
+        # 基点的宽窗口 wNAF 表在首次使用时构建并缓存
+        if self._base_tables is None:
+            self._base_tables = self._tables(self.G, self.base_width)
+        return self._base_tables
+
+    def _terms(self, k, tables, width: int, use_glv: bool = True):
+        k = int(k) % self.n
+        if self.glv and use_glv:
+            parts = zip(self.split(k), tables)
+        else:
+            parts = [(k, tables[0])]
+        terms = []
+        for part, (pos, neg) in parts:
+            if part < 0:
+                part, pos, neg = -part, neg, pos
+            if part:
+                terms.append((wnaf(part, width), pos, neg))
+        return terms
+
+    def _interleave(self, terms):
+        # 交错 wNAF：所有 (标量, 表) 共用一条倍点链
+        R = INFINITY
+        p, double, add = self.p, self._double, add_affine
+        length = max((len(naf) for naf, _, _ in terms), default=0)
+        for i in range(length - 1, -1, -1):
+            R = double(*R, p)
+            for naf, pos, neg in terms:
+                if i < len(naf):
+                    d = naf[i]
+                    if d > 0:
+                        R = add(*R, *pos[d >> 1], p, double)
+                    elif d < 0:
+                        R = add(*R, *neg[(-d) >> 1], p, double)
+        return R
+
+    # ---------- 点乘 ----------
+    def mul(self, k, pt=None, use_glv: bool = True):
+        # k * pt，pt 省略时为 k * G（走缓存的基点表）
+        if pt is None:
+            terms = self._terms(k, self._base(), self.base_width, use_glv)
+        else:
+            terms = self._terms(k, self._tables(pt, self.width), self.width, use_glv)
+        return self.to_affine(self._interleave(terms))
+
+    def double_mul_jacobian(self, u1, u2, Q):
+        # u1*G + u2*Q，G 部分查缓存的宽窗口表，有 GLV 时共四个半长标量交错
+        terms = self._terms(u1, self._base(), self.base_width)
+        if Q is not None:
+            terms += self._terms(u2, self._tables(Q, self.width), self.width)
+        return self._interleave(terms)
+
+    def double_mul(self, u1, u2, Q):
+        return self.to_affine(self.double_mul_jacobian(u1, u2, Q))
+
+    # ---------- ECDSA ----------
+    def digest_int(self, digest: bytes) -> int:
+        # 摘要比 n 长时只取左侧 nbits 位（与 ecdsa 库的截断方式相同）
+        e = int.from_bytes(digest, "big")
+        excess = len(digest) * 8 - self.nbits
+        return e >> excess if excess > 0 else e
+
+    def ecdsa_sign(self, d, digest: bytes, k=None):
+        n = self.n
+        e = self.digest_int(digest)
+        while True:
+            nonce = k if k is not None else random.randint(1, int(n - 1))
+            r = self.mul(nonce)[0] % n
+            s = invert(nonce, n) * (e + r * d) % n
+            if r and s:
+                return int(r), int(s)
+            if k is not None:
+                raise ValueError("给定的 k 无法产生有效签名")
+
+    def ecdsa_verify(self, Q, digest: bytes, r, s) -> bool:
+        # R = (e/s)*G + (r/s)*Q；比较 x(R) mod n == r 时在 Jacobian 坐标下检查 r*Z^2 == X，
+        # x(R) 落在 [n, p) 时还需比较 r + n，整个验签只有 s 的一次模 n 求逆
+        n, p = self.n, self.p
+        if not (1 <= r < n and 1 <= s < n):
+            return False
+        w = invert(s, n)
+        X, _, Z = self.double_mul_jacobian(self.digest_int(digest) * w % n, r * w % n, Q)
+        if Z == 0:
+            return False
+        zz = Z * Z % p
+        if (r * zz - X) % p == 0:
+            return True
+        return r + n < p and ((r + n) * zz - X) % p == 0
+
+
+# ========== 曲线参数 ==========
+SM2 = Curve("SM2", sm2_acc.P, sm2_acc.A, sm2_acc.B, sm2_acc.N, sm2_acc.Gx, sm2_acc.Gy)
+
+P256 = Curve(
+    "P-256",
+    0xFFFFFFFF00000001000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFF,
+    -3,
+    0x5AC635D8AA3A93E7B3EBBD55769886BC651D06B0CC53B0F63BCE3C3E27D2604B,
+    0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551,
+    0x6B17D1F2E12C4247F8BCE6E563A440F277037D812DEB33A0F4A13945D898C296,
+    0x4FE342E2FE1A7F9B8EE7EB4A7C0F9E162BCE33576B315ECECBB6406837BF51F5,
+)
+
+# secp256k1 的 GLV 参数：beta 为模 p 的三次单位根，lam 为模 n 的三次单位根，格基取自 Guide to ECC / libsecp256k1
+SECP256K1 = Curve(
+    "secp256k1",
+    0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F,
+    0,
+    7,
+    0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141,
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+    glv=(
+        0x7AE96A2B657C07106E64479EAC3434E99CF0497512F58995C1396C28719501EE,
+        0x5363AD4CC05C30E0A5261C028812645A122E22EA20816678DF02967C1B23BD72,
+        (
+            0x3086D221A7D46BCDE86C90E49284EB15,
+            -0xE4437ED6010E88286F547FA90ABFE4C3,
+            0x114CA50F7A8E2F3F657C1108D9D44CFD8,
+            0x3086D221A7D46BCDE86C90E49284EB15,
+        ),
+    ),
+)
+
+CURVES = {c.name: c for c in (SM2, P256, SECP256K1)}
+
+
+# ========== 测试与性能 ==========
+def curves_self_test():
+    for curve in CURVES.values():
+        n = int(curve.n)
+        assert curve.is_on_curve(curve.G), f"{curve.name} 基点不在曲线上"
+        assert curve.mul(n) is None and curve.mul(n - 1) == curve.neg(curve.G), f"{curve.name} 基点阶错误"
+        for k in (1, 2, 3, n - 2, random.randint(1, n - 1), random.randint(1, 1 << 128)):
+            expected = curve.mul(k, curve.G, use_glv=False)
+            assert curve.mul(k) == expected == curve.mul(k, curve.G), f"{curve.name} 点乘结果错误"
+            assert curve.is_on_curve(expected)
+        Q = curve.mul(random.randint(1, n - 1))
+        u1, u2 = random.randint(1, n - 1), random.randint(1, n - 1)
+        assert curve.double_mul(u1, u2, Q) == curve.add(curve.mul(u1), curve.mul(u2, Q))
+        assert curve.double_mul(5, n - 5, curve.G) is None and curve.double_mul(3, 4, curve.G) == curve.mul(7)
+        J = curve.from_affine(Q)
+        generic = double_generic(*J, curve.p, curve.a)
+        assert curve.to_affine(generic) == curve.to_affine(curve._double(*J, curve.p)), "通用倍点公式错误"
+
+        d = random.randint(1, n - 1)
+        Q = curve.mul(d)
+        digest = hashlib.sha256(b"curve test").digest()
+        r, s = curve.ecdsa_sign(d, digest)
+        assert curve.ecdsa_verify(Q, digest, r, s), f"{curve.name} ECDSA 验签失败"
+        assert not curve.ecdsa_verify(Q, hashlib.sha256(b"other").digest(), r, s)
+        assert not curve.ecdsa_verify(Q, digest, r, n - s + 1) and not curve.ecdsa_verify(Q, digest, 0, s)
+        assert curve.ecdsa_verify(Q, digest, r, n - s), "低 s 形式的签名同样有效"
+
+    # 与 sm2_acc 的 SM2 实现一致
+    k = random.randint(1, int(sm2_acc.N - 1))
+    pt = sm2_acc.base_mul(k)
+    assert SM2.mul(k) == (pt.x, pt.y)
+
+    # GLV 参数：phi(G) = lam*G，拆分后的半长标量满足 k1 + k2*lam ≡ k
+    c = SECP256K1
+    beta, lam, _ = c.glv
+    assert pow(beta, 3, c.p) == 1 and pow(lam, 3, c.n) == 1
+    assert c.endomorphism(c.G) == c.mul(lam, c.G, use_glv=False), "GLV 自同态参数错误"
+    for k in (1, int(c.n) - 1, int(lam), random.randint(1, int(c.n) - 1)):
+        k1, k2 = c.split(k)
+        assert (k1 + k2 * lam - k) % c.n == 0 and abs(k1).bit_length() <= 129 and abs(k2).bit_length() <= 129
+
+    if ecdsa is not None:
+        for curve, ref in ((SECP256K1, ecdsa.SECP256k1), (P256, ecdsa.NIST256p)):
+            g = ref.generator
+            assert (curve.p, curve.n, (curve.G[0], curve.G[1])) == (ref.curve.p(), ref.order, (g.x(), g.y())), "曲线参数与 ecdsa 库不一致"
+            sk = ecdsa.SigningKey.generate(curve=ref)
+            point = sk.get_verifying_key().pubkey.point
+            digest = hashlib.sha256(b"cross check").digest()
+            r, s = ecdsa.util.sigdecode_string(sk.sign_digest(digest), ref.order)
+            assert curve.ecdsa_verify((mpz(point.x()), mpz(point.y())), digest, r, s), "ecdsa 库的签名验证失败"
+            r, s = curve.ecdsa_sign(sk.privkey.secret_multiplier, digest)
+            assert sk.get_verifying_key().verify_digest(ecdsa.util.sigencode_string(r, s, ref.order), digest)
+    print("通用曲线 / GLV 测试通过 ✅")
+
+
+def ecdsa_benchmark(rounds: int = 500):
+    # secp256k1 ECDSA 验签：ecdsa.VerifyingKey.verify_digest 与本引擎（GLV 开/关）对比
+    if ecdsa is None:
+        print("未安装 ecdsa，跳过对比")
+        return
+    c = SECP256K1
+    n = ecdsa.SECP256k1.order
+    sk = ecdsa.SigningKey.generate(curve=ecdsa.SECP256k1)
+    vk = sk.get_verifying_key()
+    Q = (mpz(vk.pubkey.point.x()), mpz(vk.pubkey.point.y()))
+    digests = [random.randbytes(32) for _ in range(rounds)]
+    sigs = [sk.sign_digest(d) for d in digests]
+    pairs = [ecdsa.util.sigdecode_string(sig, n) for sig in sigs]
+
+    start = time.perf_counter()
+    ref = [vk.verify_digest(sig, d) for sig, d in zip(sigs, digests)]
+    ref_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ours = [c.ecdsa_verify(Q, d, r, s) for d, (r, s) in zip(digests, pairs)]
+    glv_time = time.perf_counter() - start
+
+    glv, c.glv = c.glv, None
+    try:
+        start = time.perf_counter()
+        plain = [c.ecdsa_verify(Q, d, r, s) for d, (r, s) in zip(digests, pairs)]
+        plain_time = time.perf_counter() - start
+    finally:
+        c.glv = glv
+
+    assert all(ref) and all(ours) and all(plain), "验签结果不一致"
+    print(f"secp256k1 ECDSA验签{rounds}次: ecdsa.verify_digest 平均 {ref_time*1000/rounds:.4f}毫秒")
+    print(f"通用引擎 (无GLV) 平均 {plain_time*1000/rounds:.4f}毫秒, 加速比: {ref_time / plain_time:.2f}x")
+    print(f"通用引擎 (GLV) 平均 {glv_time*1000/rounds:.4f}毫秒, 加速比: {ref_time / glv_time:.2f}x")
+
+
+def curves_performance_test(rounds: int = 500):
+    for curve in CURVES.values():
+        scalars = [random.randint(1, int(curve.n) - 1) for _ in range(rounds)]
+        curve.mul(1)
+        start = time.perf_counter()
+        for k in scalars:
+            curve.mul(k)
+        base = time.perf_counter() - start
+        Q = curve.mul(scalars[0])
+        start = time.perf_counter()
+        for k in scalars[: rounds // 5]:
+            curve.mul(k, Q)
+        var = time.perf_counter() - start
+        print(f"{curve.name}: k*G 平均 {base*1000/rounds:.4f}毫秒, k*Q 平均 {var*5000/rounds:.4f}毫秒")
+    ecdsa_benchmark(rounds)
+
+
+if __name__ == "__main__":
+    curves_self_test()
+    curves_performance_test()
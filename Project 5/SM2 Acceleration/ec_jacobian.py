@@ -0,0 +1,119 @@
+from sm2_field import batch_inv, invert, mpz
+
+# ========== Jacobian 点运算公式 ==========
+# 以坐标分量与模数 p 为参数的短 Weierstrass 曲线公式，sm2_acc.JacobianPoint 与 ec_curves.Curve 共用。
+# (X, Y, Z) 表示仿射点 (X/Z^2, Y/Z^3)，Z == 0 表示无穷远点；仿射结果为 (x, y) 元组，无穷远点为 None。
+# 点加遇到两点相同时改走倍点，倍点公式由调用方按曲线的 a 传入。
+ONE = mpz(1)
+INFINITY = (ONE, ONE, mpz(0))
+
+
+def double_a3(X1, Y1, Z1, p):
+    # dbl-2001-b：a = -3 时 3X^2 + aZ^4 = 3(X - Z^2)(X + Z^2)
+    if Z1 == 0 or Y1 == 0:
+        return INFINITY
+    delta = Z1 * Z1 % p
+    gamma = Y1 * Y1 % p
+    beta = X1 * gamma % p
+    alpha = 3 * (X1 - delta) * (X1 + delta) % p
+    X3 = (alpha * alpha - 8 * beta) % p
+    Z3 = ((Y1 + Z1) * (Y1 + Z1) - gamma - delta) % p
+    Y3 = (alpha * (4 * beta - X3) - 8 * gamma * gamma) % p
+    return X3, Y3, Z3
+
+
+def double_a0(X1, Y1, Z1, p):
+    # dbl-2009-l：a = 0，2M + 5S
+    if Z1 == 0 or Y1 == 0:
+        return INFINITY
+    A = X1 * X1 % p
+    B = Y1 * Y1 % p
+    C = B * B % p
+    D = 2 * ((X1 + B) * (X1 + B) - A - C) % p
+    E = 3 * A
+    X3 = (E * E - 2 * D) % p
+    Y3 = (E * (D - X3) - 8 * C) % p
+    Z3 = 2 * Y1 * Z1 % p
+    return X3, Y3, Z3
+
+
+def double_generic(X1, Y1, Z1, p, a):
+    # dbl-2007-bl：任意 a
+    if Z1 == 0 or Y1 == 0:
+        return INFINITY
+    XX = X1 * X1 % p
+    YY = Y1 * Y1 % p
+    YYYY = YY * YY % p
+    ZZ = Z1 * Z1 % p
+    S = 2 * ((X1 + YY) * (X1 + YY) - XX - YYYY) % p
+    M = (3 * XX + a * ZZ * ZZ) % p
+    X3 = (M * M - 2 * S) % p
+    Y3 = (M * (S - X3) - 8 * YYYY) % p
+    Z3 = ((Y1 + Z1) * (Y1 + Z1) - YY - ZZ) % p
+    return X3, Y3, Z3
+
+
+def add(X1, Y1, Z1, X2, Y2, Z2, p, double):
+    # add-1998-cmo-2：一般 Jacobian 点加
+    if Z1 == 0:
+        return X2, Y2, Z2
+    if Z2 == 0:
+        return X1, Y1, Z1
+    Z1Z1 = Z1 * Z1 % p
+    Z2Z2 = Z2 * Z2 % p
+    U1 = X1 * Z2Z2 % p
+    U2 = X2 * Z1Z1 % p
+    S1 = Y1 * Z2 * Z2Z2 % p
+    S2 = Y2 * Z1 * Z1Z1 % p
+    H = U2 - U1  # 惰性约减：|H|, |r| < p，直接参与乘法
+    r = S2 - S1
+    if H == 0:
+        return double(X1, Y1, Z1, p) if r == 0 else INFINITY
+    HH = H * H % p
+    HHH = H * HH % p
+    V = U1 * HH % p
+    X3 = (r * r - HHH - 2 * V) % p
+    Y3 = (r * (V - X3) - S1 * HHH) % p
+    Z3 = Z1 * Z2 * H % p
+    return X3, Y3, Z3
+
+
+def add_affine(X1, Y1, Z1, x2, y2, p, double):
+    # 混合点加：第二个点为仿射点 (Z2 = 1)，省去 Z2 相关的乘法
+    if Z1 == 0:
+        return x2, y2, ONE
+    Z1Z1 = Z1 * Z1 % p
+    H = x2 * Z1Z1 % p - X1
+    r = y2 * Z1 * Z1Z1 % p - Y1
+    if H == 0:
+        return double(X1, Y1, Z1, p) if r == 0 else INFINITY
+    HH = H * H % p
+    HHH = H * HH % p
+    V = X1 * HH % p
+    X3 = (r * r - HHH - 2 * V) % p
+    Y3 = (r * (V - X3) - Y1 * HHH) % p
+    Z3 = Z1 * H % p
+    return X3, Y3, Z3
+
+
+def to_affine(X, Y, Z, p):
+    if Z == 0:
+        return None
+    z_inv = invert(Z, p)
+    z_inv2 = z_inv * z_inv % p
+    return X * z_inv2 % p, Y * z_inv2 * z_inv % p
+
+
+def batch_to_affine(points, p):
+    # Montgomery 批量求逆：n 个 Jacobian 点归一化只需一次求逆
+    zs = [Z for _, _, Z in points if Z != 0]
+    it = iter(batch_inv(zs, p) if zs else ())
+    result = []
+    for X, Y, Z in points:
+        if Z == 0:
+            result.append(None)
+            continue
+        z_inv = next(it)
+        z_inv2 = z_inv * z_inv % p
+        result.append((X * z_inv2 % p, Y * z_inv2 * z_inv % p))
+    return result
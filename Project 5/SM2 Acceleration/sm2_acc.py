@@ -1,81 +1,47 @@
+import functools
 import random
 import time
-import gmpy2
 from typing import Tuple
 
+from ec_jacobian import add, add_affine, double_a3, to_affine
+from ec_jacobian import batch_to_affine as jacobian_batch_to_affine
+from sm2_field import P, mpz, invert
+from sm3 import SM3, sm3_hash
+
 # === 椭圆曲线参数（SM2 推荐参数） ===
-P = gmpy2.mpz(0xFFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF00000000FFFFFFFFFFFFFFFF)
-A = gmpy2.mpz(0xFFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF00000000FFFFFFFFFFFFFFFC)
-B = gmpy2.mpz(0x28E9FA9E9D9F5E344D5A9E4BCF6509A7F39789F515AB8F92DDBCBD414D940E93)
-N = gmpy2.mpz(0xFFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFF7203DF6B21C6052B53BBF40939D54123)
-Gx = gmpy2.mpz(0x32C4AE2C1F1981195F9904466A39C9948FE30BBFF2660BE1715A4589334C74C7)
-Gy = gmpy2.mpz(0xBC3736A2F4F6779C59BDCEE36B692153D0A9877CC62A474002DF32E52139F0A0)
+A = mpz(0xFFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF00000000FFFFFFFFFFFFFFFC)
+B = mpz(0x28E9FA9E9D9F5E344D5A9E4BCF6509A7F39789F515AB8F92DDBCBD414D940E93)
+N = mpz(0xFFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFF7203DF6B21C6052B53BBF40939D54123)
+Gx = mpz(0x32C4AE2C1F1981195F9904466A39C9948FE30BBFF2660BE1715A4589334C74C7)
+Gy = mpz(0xBC3736A2F4F6779C59BDCEE36B692153D0A9877CC62A474002DF32E52139F0A0)
 
 # 预计算字节参数
 A_bytes = int(A).to_bytes(32, "big")
 B_bytes = int(B).to_bytes(32, "big")
 Gx_bytes = int(Gx).to_bytes(32, "big")
 Gy_bytes = int(Gy).to_bytes(32, "big")
-
-
-# ========== SM3 哈希函数 ==========
-def _rotl(x, n):
-    return ((x << n) & 0xFFFFFFFF) | ((x >> (32 - n)) & 0xFFFFFFFF)
-
-
-def _sm3_ff_j(x, y, z, j):
-    return (x ^ y ^ z) if j < 16 else ((x & y) | (x & z) | (y & z))
-
-
-def _sm3_gg_j(x, y, z, j):
-    return (x ^ y ^ z) if j < 16 else ((x & y) | (~x & z))
-
-
-def _sm3_p0(x):
-    return x ^ _rotl(x, 9) ^ _rotl(x, 17)
-
-
-def _sm3_p1(x):
-    return x ^ _rotl(x, 15) ^ _rotl(x, 23)
-
-
-def sm3_hash(msg: bytes) -> bytes:
-    iv = [0x7380166F, 0x4914B2B9, 0x172442D7, 0xDA8A0600, 0xA96F30BC, 0x163138AA, 0xE38DEE4D, 0xB0FB0E4E]
-    msg_len = len(msg)
-    msg_padding = msg + b"\x80" + b"\x00" * ((56 - (msg_len + 1) % 64) % 64) + (msg_len * 8).to_bytes(8, "big")
-    nblocks = len(msg_padding) // 64
-
-    V = iv[:]
-    for i in range(nblocks):
-        block = msg_padding[64 * i : 64 * (i + 1)]
-        W = [int.from_bytes(block[j : j + 4], "big") for j in range(0, 64, 4)]
-        for j in range(16, 68):
-            W.append(_sm3_p1(W[j - 16] ^ W[j - 9] ^ _rotl(W[j - 3], 15)) ^ _rotl(W[j - 13], 7) ^ W[j - 6])
-        W_ = [W[j] ^ W[j + 4] for j in range(64)]
-        A_, B_, C_, D_, E_, F_, G_, H_ = V
-        for j in range(64):
-            Tj = 0x79CC4519 if j < 16 else 0x7A879D8A
-            SS1 = _rotl((_rotl(A_, 12) + E_ + _rotl(Tj, j % 32)) & 0xFFFFFFFF, 7)
-            SS2 = SS1 ^ _rotl(A_, 12)
-            TT1 = (_sm3_ff_j(A_, B_, C_, j) + D_ + SS2 + W_[j]) & 0xFFFFFFFF
-            TT2 = (_sm3_gg_j(E_, F_, G_, j) + H_ + SS1 + W[j]) & 0xFFFFFFFF
-            D_, C_, B_, A_ = C_, _rotl(B_, 9), A_, TT1
-            H_, G_, F_, E_ = G_, _rotl(F_, 19), E_, _sm3_p0(TT2)
-        V = [a ^ b for a, b in zip(V, [A_, B_, C_, D_, E_, F_, G_, H_])]
-    return b"".join(x.to_bytes(4, "big") for x in V)
+ZERO = mpz(0)
+ONE = mpz(1)
 
 
 # ========== 椭圆曲线工具 ==========
 def mod_inv(a, p):
-    return gmpy2.invert(a, p)
+    return invert(a, p)
+
+
+def is_on_curve(pt: "ECPoint") -> bool:
+    # 检查坐标范围及 y^2 = x^3 + ax + b，无穷远点 (0, 0) 不视为合法公钥
+    if not (0 <= pt.x < P and 0 <= pt.y < P) or (pt.x == 0 and pt.y == 0):
+        return False
+    return (pt.y * pt.y - (pt.x * pt.x + A) * pt.x - B) % P == 0
 
 
 class ECPoint:
     __slots__ = ("x", "y")
 
     def __init__(self, x, y):
-        self.x = gmpy2.mpz(x)
-        self.y = gmpy2.mpz(y)
+        self.x = mpz(x)
+        self.y = mpz(y)
 
     def __eq__(self, other):
         return self.x == other.x and self.y == other.y
@@ -96,9 +62,29 @@ class ECPoint:
         return ECPoint(x3, y3)
 
     def __mul__(self, scalar):
+        # Jacobian 坐标下从高位到低位 double-and-add，只在最后做一次求逆
+        k = mpz(scalar)
+        if k == 0 or (self.x == 0 and self.y == 0):
+            return ECPoint(0, 0)
+        R = JacobianPoint.from_affine(self)
+        for i in range(k.bit_length() - 2, -1, -1):
+            R = R.double()
+            if (k >> i) & 1:
+                R = R.add_affine(self)
+        return R.to_affine()
+
+    def __rmul__(self, scalar):
+        return self.__mul__(scalar)  # 让 int * ECPoint 也能运行
+
+    def mul_ladder(self, scalar):
+        # co-Z 蒙哥马利阶梯，操作序列与标量无关，用于秘密标量
+        return ladder_mul(scalar, self)
+
+    def mul_affine(self, scalar):
+        # 原始仿射坐标 double-and-add，每次点加/倍点都要求逆，保留作对照基准
         result = ECPoint(0, 0)
         addend = self
-        k = gmpy2.mpz(scalar)
+        k = mpz(scalar)
         while k:
             if k & 1:
                 result = result + addend
@@ -106,18 +92,305 @@ class ECPoint:
             k >>= 1
         return result
 
-    def __rmul__(self, scalar):
-        return self.__mul__(scalar)  # 让 int * ECPoint 也能运行
+
+# ========== Jacobian 射影坐标 ==========
+# (X, Y, Z) 表示仿射点 (X/Z^2, Y/Z^3)，Z == 0 表示无穷远点
+class JacobianPoint:
+    __slots__ = ("X", "Y", "Z")
+
+    def __init__(self, X, Y, Z):
+        self.X = X
+        self.Y = Y
+        self.Z = Z
+
+    @staticmethod
+    def from_affine(pt: ECPoint) -> "JacobianPoint":
+        if pt.x == 0 and pt.y == 0:
+            return JacobianPoint(ONE, ONE, ZERO)
+        return JacobianPoint(pt.x, pt.y, ONE)
+
+    def is_infinity(self) -> bool:
+        return self.Z == 0
+
+    def to_affine(self) -> ECPoint:
+        if self.Z == 0:
+            return ECPoint(0, 0)
+        return ECPoint(*to_affine(self.X, self.Y, self.Z, P))
+
+    def __neg__(self):
+        return JacobianPoint(self.X, (-self.Y) % P, self.Z)
+
+    # 点运算公式见 ec_jacobian（与 ec_curves 共用），这里只做对象封装
+    def double(self) -> "JacobianPoint":
+        return JacobianPoint(*double_a3(self.X, self.Y, self.Z, P))
+
+    def add(self, other: "JacobianPoint") -> "JacobianPoint":
+        return JacobianPoint(*add(self.X, self.Y, self.Z, other.X, other.Y, other.Z, P, double_a3))
+
+    def add_affine(self, other: ECPoint) -> "JacobianPoint":
+        if other.x == 0 and other.y == 0:
+            return self
+        return JacobianPoint(*add_affine(self.X, self.Y, self.Z, other.x, other.y, P, double_a3))
+
+
+def batch_to_affine(points):
+    # Montgomery 批量求逆：n 个 Jacobian 点归一化只需一次求逆
+    affine = jacobian_batch_to_affine([(pt.X, pt.Y, pt.Z) for pt in points], P)
+    return [ECPoint(0, 0) if pt is None else ECPoint(*pt) for pt in affine]
+
+
+def x_matches(R: JacobianPoint, x) -> bool:
+    # 判断 R 的仿射横坐标是否等于 x（X == x * Z^2），不做求逆；用于批量验签比较 r
+    Z2 = R.Z * R.Z % P
+    return R.X % P == x * Z2 % P
+
+
+# ========== 固定基点预计算表 ==========
+class FixedBaseTable:
+    # 固定窗口表：table[i][j] = j * 2^(w*i) * base，点乘只需 ceil(256/w) 次混合点加，无需倍点
+    # points 为按窗口顺序展平的仿射点（每个窗口 j = 1..2^w-1），给出时直接使用而不重新构建
+    def __init__(self, base: ECPoint, window: int = 4, points=None):
+        if not 1 <= window <= 8:
+            raise ValueError("窗口宽度需在 1~8 之间")
+        self.base = base
+        self.window = window
+        self.mask = (1 << window) - 1
+        self.windows = (int(N).bit_length() + window - 1) // window
+        if points is not None:
+            if len(points) != self.windows * self.mask:
+                raise ValueError("预计算点数量与窗口参数不符")
+            self.table = [[None] + list(points[i * self.mask : (i + 1) * self.mask]) for i in range(self.windows)]
+            return
+        jac = []
+        B = JacobianPoint.from_affine(base)
+        for _ in range(self.windows):
+            row = [B]
+            for _ in range(self.mask - 1):
+                row.append(row[-1].add(B))
+            jac.extend(row)
+            for _ in range(window):
+                B = B.double()
+        flat = batch_to_affine(jac)
+        self.table = [[None] + flat[i * self.mask : (i + 1) * self.mask] for i in range(self.windows)]
+
+    def mul_jacobian(self, scalar) -> JacobianPoint:
+        k = int(scalar) % N
+        w, mask, table = self.window, self.mask, self.table
+        R = JacobianPoint(ONE, ONE, ZERO)
+        i = 0
+        while k:
+            digit = k & mask
+            if digit:
+                R = R.add_affine(table[i][digit])
+            k >>= w
+            i += 1
+        return R
+
+    def mul(self, scalar) -> ECPoint:
+        return self.mul_jacobian(scalar).to_affine()
+
+    def points(self):
+        # 按窗口顺序展平的预计算点
+        return [pt for row in self.table for pt in row[1:]]
 
 
 # 基点
 G = ECPoint(Gx, Gy)
 
+# 基点表在首次使用时构建，窗口越大点乘越快、表越大（w=4: 960 点, w=8: 8160 点）
+BASE_TABLE_WINDOW = 6
+_base_table = None
+
+
+def get_base_table() -> FixedBaseTable:
+    global _base_table
+    if _base_table is None:
+        _base_table = FixedBaseTable(G, BASE_TABLE_WINDOW)
+    return _base_table
+
+
+def set_base_table_window(window: int):
+    global BASE_TABLE_WINDOW, _base_table
+    BASE_TABLE_WINDOW = window
+    _base_table = None
+
+
+def install_base_table(table: FixedBaseTable):
+    # 直接装入已构建好的基点表（如由父进程传给工作进程），跳过本进程的建表
+    global BASE_TABLE_WINDOW, _base_table
+    if table.base != G:
+        raise ValueError("基点表的基点不是 G")
+    BASE_TABLE_WINDOW = table.window
+    _base_table = table
+
+
+def base_mul(scalar) -> ECPoint:
+    # 计算 scalar * G，走固定基点表
+    return get_base_table().mul(scalar)
+
+
+# ========== 多标量点乘 ==========
+def wnaf(scalar, width: int):
+    # 宽度为 w 的 NAF 表示（低位在前），非零位均为奇数且 |d| < 2^(w-1)
+    k = int(scalar)
+    full = 1 << width
+    half = full >> 1
+    digits = []
+    while k:
+        if k & 1:
+            d = k & (full - 1)
+            if d >= half:
+                d -= full
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+
+def odd_multiples(pt: ECPoint, width: int):
+    # [P, 3P, 5P, ..., (2^(w-1)-1)P]，归一化为仿射坐标以便混合点加
+    J = JacobianPoint.from_affine(pt)
+    J2 = J.double()
+    jac = [J]
+    for _ in range((1 << (width - 2)) - 1):
+        jac.append(jac[-1].add(J2))
+    return batch_to_affine(jac)
+
+
+def multi_scalar_mul(pairs, width: int = 5) -> JacobianPoint:
+    # 交错 wNAF（Shamir 技巧的推广）：所有 (k_i, P_i) 共用一条倍点链
+    terms = []
+    for k, pt in pairs:
+        k = int(k) % N
+        if k == 0 or (pt.x == 0 and pt.y == 0):
+            continue
+        pos = odd_multiples(pt, width)
+        neg = [ECPoint(q.x, (-q.y) % P) for q in pos]
+        terms.append((wnaf(k, width), pos, neg))
+    R = JacobianPoint(ONE, ONE, ZERO)
+    length = max((len(naf) for naf, _, _ in terms), default=0)
+    for i in range(length - 1, -1, -1):
+        R = R.double()
+        for naf, pos, neg in terms:
+            if i < len(naf):
+                d = naf[i]
+                if d > 0:
+                    R = R.add_affine(pos[d >> 1])
+                elif d < 0:
+                    R = R.add_affine(neg[(-d) >> 1])
+    return R
+
+
+def double_base_mul(s, t, Q: ECPoint, use_table: bool = True) -> ECPoint:
+    # 计算 s*G + t*Q：G 部分走固定基点表（无需倍点），否则与 Q 交错共用倍点链
+    if use_table:
+        R = multi_scalar_mul([(t, Q)])
+        return R.add(get_base_table().mul_jacobian(s)).to_affine()
+    return multi_scalar_mul([(s, G), (t, Q)]).to_affine()
+
+
+# ========== co-Z 蒙哥马利阶梯 ==========
+# 两个累加点 R0、R1 共享同一个 Z，只保存 (X, Y)，每一位固定执行一次 XYCZ-ADDC 与一次 XYCZ-ADD
+# （Goundar-Joye-Miyaji / Rivain），不随标量位做分支，只按位选择操作数。
+# 标量先换成 k + N 或 k + 2N 中恰为 257 位的那个，循环次数与标量大小无关。
+# 注意：CPython 大整数运算本身不是恒定时间的，这里保证的是与标量无关的操作序列。
+def ladder_mul_jacobian(scalar, pt: ECPoint) -> JacobianPoint:
+    p = P
+    k = int(scalar) % N
+    k1 = k + N
+    k = k1 + N * (1 - (k1 >> 256))
+    x, y = pt.x, pt.y
+
+    # 初始：R1 = 2P（Z = 1 的 Jacobian 倍点，a = -3），R0 = P 变换到同一 Z
+    gamma = y * y % p
+    beta = x * gamma % p
+    alpha = 3 * (x - 1) * (x + 1) % p
+    X2 = (alpha * alpha - 8 * beta) % p
+    Y2 = (alpha * (4 * beta - X2) - 8 * gamma * gamma) % p
+    Z = 2 * y % p
+    zz = Z * Z % p
+    rx = [x * zz % p, X2]
+    ry = [y * zz % p * Z % p, Y2]
+
+    for i in range(255, -1, -1):
+        b = (k >> i) & 1
+        c = 1 - b
+        X1, Y1, X2, Y2 = rx[b], ry[b], rx[c], ry[c]
+        # XYCZ-ADDC：R_c = R_b + R_c，R_b = R_b - R_c
+        t = X1 - X2
+        C = t * t % p
+        W1 = X1 * C % p
+        W2 = X2 * C % p
+        A1 = Y1 * (W1 - W2) % p
+        dy = Y1 - Y2
+        sy = Y1 + Y2
+        Xs = (dy * dy - W1 - W2) % p
+        Ys = (dy * (W1 - Xs) - A1) % p
+        Xd = (sy * sy - W1 - W2) % p
+        Yd = (sy * (W1 - Xd) - A1) % p
+        Z = Z * t % p
+        # XYCZ-ADD：R_b = R_c + R_b，R_c 更新到新的公共 Z
+        t = Xs - Xd
+        C = t * t % p
+        W1 = Xs * C % p
+        W2 = Xd * C % p
+        A1 = Ys * (W1 - W2) % p
+        dy = Ys - Yd
+        X3 = (dy * dy - W1 - W2) % p
+        rx[b], ry[b] = X3, (dy * (W1 - X3) - A1) % p
+        rx[c], ry[c] = W1, A1
+        Z = Z * t % p
+
+    if Z == 0:
+        # 中间出现 R0 = ±R1（仅 k ≡ 0, ±1 等极少数标量），co-Z 公式退化，改走通用路径
+        return multi_scalar_mul([(scalar, pt)])
+    return JacobianPoint(rx[0], ry[0], Z)
+
+
+def ladder_mul(scalar, pt: ECPoint) -> ECPoint:
+    return ladder_mul_jacobian(scalar, pt).to_affine()
+
+
+# ========== 秘密标量乘模式 ==========
+# 私钥、签名随机数 k 等秘密标量的点乘方式：
+#   "ladder"：co-Z 蒙哥马利阶梯，操作序列与标量无关（默认）
+#   "window"：固定基点表 / wNAF，更快，但查表下标与加法次数依赖标量
+MUL_LADDER = "ladder"
+MUL_WINDOW = "window"
+SECRET_MUL_MODE = MUL_LADDER
+
+
+def set_secret_mul_mode(mode: str):
+    global SECRET_MUL_MODE
+    if mode not in (MUL_LADDER, MUL_WINDOW):
+        raise ValueError(f"未知点乘模式: {mode}")
+    SECRET_MUL_MODE = mode
+
+
+def secret_mul_jacobian(scalar, pt: ECPoint = None, table: FixedBaseTable = None) -> JacobianPoint:
+    # 计算 scalar * pt（默认 pt = G），scalar 为秘密值；window 模式下 table 为 pt 的固定窗口表
+    if SECRET_MUL_MODE == MUL_LADDER:
+        return ladder_mul_jacobian(scalar, G if pt is None else pt)
+    if pt is None:
+        return get_base_table().mul_jacobian(scalar)
+    if table is not None:
+        return table.mul_jacobian(scalar)
+    return multi_scalar_mul([(scalar, pt)])
+
+
+def secret_mul(scalar, pt: ECPoint = None) -> ECPoint:
+    return secret_mul_jacobian(scalar, pt).to_affine()
+
 
 # ========== SM2 核心 ==========
+DEFAULT_USER_ID = b"1234567812345678"
+
+
 def generate_keypair():
     priv = random.randint(1, int(N - 1))
-    return priv, priv * G
+    return priv, secret_mul(priv)
 
 
 def calc_ZA(user_id: bytes, public_key: ECPoint) -> bytes:
@@ -127,51 +400,243 @@ def calc_ZA(user_id: bytes, public_key: ECPoint) -> bytes:
     return sm3_hash(entl + user_id + A_bytes + B_bytes + Gx_bytes + Gy_bytes + px_bytes + py_bytes)
 
 
-def sm2_sign(private_key, msg: bytes, user_id: bytes = b"1234567812345678"):
-    pub_key = private_key * G
-    ZA = calc_ZA(user_id, pub_key)
-    e = int.from_bytes(sm3_hash(ZA + msg), "big")
+def fresh_nonce():
+    # 生成一次性随机数 k 及 (k*G).x
+    k = random.randint(1, int(N - 1))
+    return k, secret_mul(k).x
+
+
+def _sign_digest(private_key, d1_inv, e: int, nonce_source=fresh_nonce):
     while True:
-        k = random.randint(1, int(N - 1))
-        x1y1 = k * G
-        r = (e + x1y1.x) % N
+        k, x1 = nonce_source()
+        r = (e + x1) % N
         if r == 0 or (r + k) % N == 0:
             continue
-        s = (mod_inv(1 + private_key, N) * (k - r * private_key)) % N
+        s = (d1_inv * (k - r * private_key)) % N
         if s != 0:
             return int(r), int(s)
 
 
-def sm2_verify(public_key: ECPoint, msg: bytes, signature, user_id: bytes = b"1234567812345678"):
+def _message_e(za_state: SM3, msg=None, stream=None) -> int:
+    # e = SM3(ZA || M)，在吸收了 ZA 的状态副本上继续哈希，不拼接 ZA + msg
+    h = za_state.copy()
+    if stream is not None:
+        h.update_stream(stream)
+    else:
+        h.update(msg)
+    return int.from_bytes(h.digest(), "big")
+
+
+def sm2_sign(private_key, msg: bytes, user_id: bytes = DEFAULT_USER_ID):
+    # 公钥、(1+d)^-1 与 ZA 随 SigningKey 按私钥缓存，重复签名不再为求 ZA 重算一次阶梯点乘
+    return _signing_key(private_key).sign(msg, user_id)
+
+
+def sm2_verify(public_key: ECPoint, msg: bytes, signature, user_id: bytes = DEFAULT_USER_ID):
     r, s = signature
     if not (1 <= r < N and 1 <= s < N):
         return False
     ZA = calc_ZA(user_id, public_key)
-    e = int.from_bytes(sm3_hash(ZA + msg), "big")
+    e = _message_e(SM3(ZA), msg)
     t = (r + s) % N
     if t == 0:
         return False
-    x1y1 = s * G + t * public_key
+    x1y1 = double_base_mul(s, t, public_key)
     R = (e + x1y1.x) % N
     return R == r
 
 
+# ========== 可复用密钥对象 ==========
+class SigningKey:
+    # 缓存公钥、(1+d)^-1 与各 user_id 的 ZA（及吸收 ZA 后的 SM3 状态），重复签名时只剩 k*G 与消息哈希
+    __slots__ = ("d", "public_key", "d1_inv", "_za")
+
+    def __init__(self, private_key):
+        if not 1 <= private_key < N - 1:
+            raise ValueError("私钥需在 [1, n-2] 范围内")
+        self.d = mpz(private_key)
+        self.public_key = secret_mul(self.d)
+        self.d1_inv = mod_inv(1 + self.d, N)
+        self._za = {}
+
+    @classmethod
+    def generate(cls) -> "SigningKey":
+        return cls(random.randint(1, int(N - 2)))
+
+    def _za_entry(self, user_id: bytes):
+        entry = self._za.get(user_id)
+        if entry is None:
+            ZA = calc_ZA(user_id, self.public_key)
+            entry = self._za[user_id] = (ZA, SM3(ZA))
+        return entry
+
+    def za(self, user_id: bytes = DEFAULT_USER_ID) -> bytes:
+        return self._za_entry(user_id)[0]
+
+    def verifying_key(self, window=None) -> "VerifyingKey":
+        return VerifyingKey(self.public_key, window)
+
+    def sign(self, msg: bytes, user_id: bytes = DEFAULT_USER_ID, nonce_source=fresh_nonce):
+        # nonce_source 返回一次性的 (k, x1)，可替换为预计算池
+        e = _message_e(self._za_entry(user_id)[1], msg)
+        return _sign_digest(self.d, self.d1_inv, e, nonce_source)
+
+    def sign_stream(self, stream, user_id: bytes = DEFAULT_USER_ID, nonce_source=fresh_nonce):
+        # 从文件对象分块读取消息签名，不在内存中保留完整消息
+        e = _message_e(self._za_entry(user_id)[1], stream=stream)
+        return _sign_digest(self.d, self.d1_inv, e, nonce_source)
+
+
+# sm2_sign 的密钥对象缓存：容量很小，但会在内存中保留私钥，clear_signing_keys() 可随时清空
+@functools.lru_cache(maxsize=16)
+def _signing_key(private_key) -> SigningKey:
+    return SigningKey(private_key)
+
+
+def clear_signing_keys():
+    _signing_key.cache_clear()
+
+
+class VerifyingKey:
+    # 缓存各 user_id 的 ZA；热点公钥可再构建公钥的固定窗口表，验签完全不需要倍点
+    __slots__ = ("public_key", "table", "_za")
+
+    def __init__(self, public_key: ECPoint, window=None):
+        self.public_key = public_key
+        self.table = None
+        self._za = {}
+        if window is not None:
+            self.precompute(window)
+
+    def precompute(self, window: int = 4):
+        if not (self.public_key.x == 0 and self.public_key.y == 0):
+            self.table = FixedBaseTable(self.public_key, window)
+
+    def _za_entry(self, user_id: bytes):
+        entry = self._za.get(user_id)
+        if entry is None:
+            ZA = calc_ZA(user_id, self.public_key)
+            entry = self._za[user_id] = (ZA, SM3(ZA))
+        return entry
+
+    def za(self, user_id: bytes = DEFAULT_USER_ID) -> bytes:
+        return self._za_entry(user_id)[0]
+
+    def verify(self, msg: bytes, signature, user_id: bytes = DEFAULT_USER_ID) -> bool:
+        return self._verify(signature, user_id, msg=msg)
+
+    def verify_stream(self, stream, signature, user_id: bytes = DEFAULT_USER_ID) -> bool:
+        return self._verify(signature, user_id, stream=stream)
+
+    def _verify(self, signature, user_id: bytes, msg=None, stream=None) -> bool:
+        r, s = signature
+        if not (1 <= r < N and 1 <= s < N):
+            return False
+        e = _message_e(self._za_entry(user_id)[1], msg, stream)
+        t = (r + s) % N
+        if t == 0:
+            return False
+        if self.table is not None:
+            x1y1 = get_base_table().mul_jacobian(s).add(self.table.mul_jacobian(t)).to_affine()
+        else:
+            x1y1 = double_base_mul(s, t, self.public_key)
+        R = (e + x1y1.x) % N
+        return R == r
+
+
 # ========== 性能测试 ==========
-def performance_test():
-    test_cases = [(generate_keypair() + (random.randbytes(random.randint(10, 100)),)) for _ in range(1000)]
+def performance_test(rounds: int = 1000):
+    test_cases = [(generate_keypair() + (random.randbytes(random.randint(10, 100)),)) for _ in range(rounds)]
 
-    start = time.time()
+    start = time.perf_counter()
     sigs = [sm2_sign(priv, msg) for priv, _, msg in test_cases]
-    sign_time = time.time() - start
-    print(f"签名1000次耗时: {sign_time:.4f}秒, 平均每次: {sign_time*1000/1000:.4f}毫秒")
+    sign_time = time.perf_counter() - start
+    print(f"签名{rounds}次耗时: {sign_time:.4f}秒, 平均每次: {sign_time*1000/rounds:.4f}毫秒")
 
-    start = time.time()
+    start = time.perf_counter()
     results = [sm2_verify(pub, msg, sig) for (_, pub, msg), sig in zip(test_cases, sigs)]
-    verify_time = time.time() - start
-    print(f"验签1000次耗时: {verify_time:.4f}秒, 平均每次: {verify_time*1000/1000:.4f}毫秒")
+    verify_time = time.perf_counter() - start
+    print(f"验签{rounds}次耗时: {verify_time:.4f}秒, 平均每次: {verify_time*1000/rounds:.4f}毫秒")
 
     print("所有验签结果正确 ✅" if all(results) else f"验签错误: {results.count(False)} 个失败 ❌")
 
 
+def key_object_test(rounds: int = 1000):
+    sk = SigningKey.generate()
+    vk = sk.verifying_key(window=4)
+    msgs = [random.randbytes(random.randint(10, 100)) for _ in range(rounds)]
+
+    start = time.perf_counter()
+    sigs = [sm2_sign(sk.d, msg) for msg in msgs]
+    plain_sign = time.perf_counter() - start
+    start = time.perf_counter()
+    key_sigs = [sk.sign(msg) for msg in msgs]
+    key_sign = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [sm2_verify(sk.public_key, msg, sig) for msg, sig in zip(msgs, key_sigs)]
+    plain_verify = time.perf_counter() - start
+    start = time.perf_counter()
+    key_results = [vk.verify(msg, sig) for msg, sig in zip(msgs, sigs)]
+    key_verify = time.perf_counter() - start
+
+    assert all(results) and all(key_results), "密钥对象签名/验签结果错误"
+    print(f"sm2_sign 平均每次: {plain_sign*1000/rounds:.4f}毫秒, SigningKey.sign 平均每次: {key_sign*1000/rounds:.4f}毫秒")
+    print(f"sm2_verify 平均每次: {plain_verify*1000/rounds:.4f}毫秒, VerifyingKey.verify 平均每次: {key_verify*1000/rounds:.4f}毫秒")
+
+
+def scalar_mul_benchmark(rounds: int = 200):
+    scalars = [random.randint(1, int(N - 1)) for _ in range(rounds)]
+
+    start = time.perf_counter()
+    affine = [G.mul_affine(k) for k in scalars]
+    affine_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    jacobian = [k * G for k in scalars]
+    jacobian_time = time.perf_counter() - start
+
+    assert affine == jacobian, "Jacobian 与仿射结果不一致"
+    print(f"仿射坐标点乘{rounds}次耗时: {affine_time:.4f}秒, 平均每次: {affine_time*1000/rounds:.4f}毫秒")
+    print(f"Jacobian点乘{rounds}次耗时: {jacobian_time:.4f}秒, 平均每次: {jacobian_time*1000/rounds:.4f}毫秒")
+    print(f"加速比: {affine_time / jacobian_time:.2f}x")
+
+    start = time.perf_counter()
+    ladder = [ladder_mul(k, G) for k in scalars]
+    ladder_time = time.perf_counter() - start
+    assert ladder == jacobian, "co-Z 阶梯结果不一致"
+    print(f"co-Z 蒙哥马利阶梯(固定运算序列)平均每次: {ladder_time*1000/rounds:.4f}毫秒, 加速比: {affine_time / ladder_time:.2f}x")
+
+    for window in (4, 6, 8):
+        start = time.perf_counter()
+        table = FixedBaseTable(G, window)
+        build_time = time.perf_counter() - start
+        start = time.perf_counter()
+        fixed = [table.mul(k) for k in scalars]
+        fixed_time = time.perf_counter() - start
+        assert fixed == jacobian, "固定基点表结果不一致"
+        print(
+            f"固定基点表(w={window})建表: {build_time*1000:.1f}毫秒, 点乘平均每次: {fixed_time*1000/rounds:.4f}毫秒, "
+            f"加速比: {affine_time / fixed_time:.2f}x"
+        )
+
+    points = [G.mul_affine(random.randint(1, int(N - 1))) for _ in range(rounds)]
+    start = time.perf_counter()
+    separate = [s * G + t * Q for s, t, Q in zip(scalars, reversed(scalars), points)]
+    separate_time = time.perf_counter() - start
+    start = time.perf_counter()
+    shamir = [double_base_mul(s, t, Q, use_table=False) for s, t, Q in zip(scalars, reversed(scalars), points)]
+    shamir_time = time.perf_counter() - start
+    start = time.perf_counter()
+    mixed = [double_base_mul(s, t, Q) for s, t, Q in zip(scalars, reversed(scalars), points)]
+    mixed_time = time.perf_counter() - start
+    assert separate == shamir == mixed, "双标量点乘结果不一致"
+    print(f"s*G + t*Q 分别点乘: 平均每次 {separate_time*1000/rounds:.4f}毫秒")
+    print(f"s*G + t*Q 交错wNAF: 平均每次 {shamir_time*1000/rounds:.4f}毫秒, 加速比: {separate_time / shamir_time:.2f}x")
+    print(f"s*G + t*Q 基点表+wNAF: 平均每次 {mixed_time*1000/rounds:.4f}毫秒, 加速比: {separate_time / mixed_time:.2f}x")
+
+
 if __name__ == "__main__":
     performance_test()
+    scalar_mul_benchmark()
+    key_object_test()
@@ -0,0 +1,54 @@
+import os
+
+# ========== 大整数后端 ==========
+# 可选后端：gmpy2（GMP 加速）或 Python 内置 int。默认 auto：能导入 gmpy2 就用，否则回退到 int。
+# 通过环境变量 SM2_BACKEND=gmpy2|int|auto 或在导入 sm2_field / sm2_acc 之前调用 select() 指定。
+# 曲线常量在模块导入时按所选后端构造，之后不能再切换。
+BACKEND_ENV = "SM2_BACKEND"
+
+name = None
+version = None
+mpz = None
+invert = None
+powmod = None
+_frozen = False
+
+
+def _int_invert(a, p):
+    return pow(a, -1, p)
+
+
+def select(backend: str = "auto") -> str:
+    global name, version, mpz, invert, powmod
+    if _frozen and backend not in ("auto", name):
+        raise RuntimeError(f"后端已锁定为 {name}，需在导入 sm2_field / sm2_acc 之前选择")
+    if _frozen:
+        return name
+    if backend not in ("auto", "gmpy2", "int"):
+        raise ValueError(f"未知后端: {backend}")
+    if backend in ("auto", "gmpy2"):
+        try:
+            import gmpy2
+        except ImportError:
+            if backend == "gmpy2":
+                raise
+        else:
+            name, version = "gmpy2", gmpy2.version()
+            mpz, invert, powmod = gmpy2.mpz, gmpy2.invert, gmpy2.powmod
+            return name
+    name, version = "int", None
+    mpz, invert, powmod = int, _int_invert, pow
+    return name
+
+
+def load():
+    # 由 sm2_field 在导入时调用：确定后端并锁定
+    global _frozen
+    if name is None:
+        select(os.environ.get(BACKEND_ENV, "auto"))
+    _frozen = True
+    return name
+
+
+def describe() -> dict:
+    return {"backend": name, "version": version}
@@ -0,0 +1,101 @@
+import random
+import time
+
+from sm2_acc import N, P, ONE, ZERO, DEFAULT_USER_ID, ECPoint, JacobianPoint, calc_ZA
+from sm2_acc import get_base_table, odd_multiples, wnaf, x_matches, generate_keypair, sm2_sign, sm2_verify
+from sm3 import SM3
+
+
+# ========== 批量验签 ==========
+# SM2 签名只携带 r = (e + x1) mod n，只确定了 R = s*G + t*P 的横坐标而没有纵坐标符号，
+# 因此无法像 Schnorr 那样对 sum z_i*(s_i*G + t_i*P_i - R_i) 做随机线性组合（需要 2^n 种符号组合）。
+# 这里在批次级别摊销开销：同一公钥的 wNAF 奇数倍点表与 ZA 只算一次，G 部分查固定基点表，
+# 最后在 Jacobian 坐标下比较 X == x1 * Z^2，整批验签不做任何求逆。
+def _wnaf_mul(k, pos, neg, width: int) -> JacobianPoint:
+    R = JacobianPoint(ONE, ONE, ZERO)
+    for d in reversed(wnaf(k, width)):
+        R = R.double()
+        if d > 0:
+            R = R.add_affine(pos[d >> 1])
+        elif d < 0:
+            R = R.add_affine(neg[(-d) >> 1])
+    return R
+
+
+def sm2_verify_batch(items, width: int = 5):
+    """批量验签，items 中每项为 (public_key, msg, signature) 或 (public_key, msg, signature, user_id)，返回逐项结果。"""
+    table = get_base_table()
+    za_cache = {}
+    key_cache = {}
+    results = []
+    for item in items:
+        public_key, msg, (r, s) = item[:3]
+        user_id = item[3] if len(item) > 3 else DEFAULT_USER_ID
+        if not (1 <= r < N and 1 <= s < N):
+            results.append(False)
+            continue
+        t = (r + s) % N
+        if t == 0:
+            results.append(False)
+            continue
+        key = (int(public_key.x), int(public_key.y))
+        za_state = za_cache.get((key, user_id))
+        if za_state is None:
+            za_state = za_cache[(key, user_id)] = SM3(calc_ZA(user_id, public_key))
+        h = za_state.copy()
+        h.update(msg)
+        e = int.from_bytes(h.digest(), "big")
+
+        multiples = key_cache.get(key)
+        if multiples is None:
+            if key == (0, 0):
+                multiples = None
+            else:
+                pos = odd_multiples(public_key, width)
+                multiples = (pos, [ECPoint(q.x, (-q.y) % P) for q in pos])
+            key_cache[key] = multiples
+        R = table.mul_jacobian(s)
+        if multiples is not None:
+            R = R.add(_wnaf_mul(t, multiples[0], multiples[1], width))
+
+        # 与 sm2_verify 一致：无穷远点按 x1 = 0 处理
+        if R.is_infinity():
+            results.append(e % N == r)
+            continue
+        x1 = (r - e) % N
+        ok = x_matches(R, x1)
+        if not ok and x1 + N < P:
+            ok = x_matches(R, x1 + N)
+        results.append(ok)
+    return results
+
+
+# ========== 性能测试 ==========
+def batch_performance_test(count: int = 500, keys: int = 8):
+    keypairs = [generate_keypair() for _ in range(keys)]
+    items = []
+    for i in range(count):
+        priv, pub = keypairs[i % keys]
+        msg = random.randbytes(random.randint(10, 100))
+        items.append((pub, msg, sm2_sign(priv, msg)))
+    # 篡改部分签名，检查逐项结果
+    for i in random.sample(range(count), count // 20):
+        pub, msg, (r, s) = items[i]
+        items[i] = (pub, msg, (r, (s + 1) % N))
+
+    start = time.perf_counter()
+    expected = [sm2_verify(pub, msg, sig) for pub, msg, sig in items]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = sm2_verify_batch(items)
+    batch_time = time.perf_counter() - start
+
+    assert results == expected, "批量验签结果与逐个验签不一致"
+    print(f"逐个验签{count}次耗时: {single_time:.4f}秒, 平均每次: {single_time*1000/count:.4f}毫秒")
+    print(f"批量验签{count}次耗时: {batch_time:.4f}秒, 平均每次: {batch_time*1000/count:.4f}毫秒")
+    print(f"加速比: {single_time / batch_time:.2f}x, 失败签名: {results.count(False)} 个（均为篡改项）")
+
+
+if __name__ == "__main__":
+    batch_performance_test()
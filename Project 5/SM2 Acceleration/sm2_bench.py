@@ -0,0 +1,263 @@
+import argparse
+import functools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import sm2_acc
+import sm2_backend
+import sm2_field
+import sm3_batch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "SM2 Base Implementation"))
+import sm2_base  # noqa: E402
+
+
+# ========== 计时 ==========
+def measure(name: str, func, iterations: int, warmup: int) -> dict:
+    # func(i) 执行第 i 次操作；先预热 warmup 次，再逐次用 perf_counter_ns 计时
+    for i in range(warmup):
+        func(i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter_ns()
+        func(i)
+        samples.append(time.perf_counter_ns() - start)
+    samples.sort()
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))] / 1000
+
+    mean = sum(samples) / len(samples) / 1000
+    return {
+        "name": name,
+        "iterations": iterations,
+        "mean_us": mean,
+        "p50_us": pct(50),
+        "p95_us": pct(95),
+        "p99_us": pct(99),
+        "ops_per_sec": 1e6 / mean if mean else 0.0,
+    }
+
+
+# ========== 测试用例 ==========
+def build_cases(scale: int) -> dict:
+    # 返回 {用例名: 工厂}，工厂返回 (func, 迭代次数)。消息、标量等输入先按固定种子生成，
+    # 密钥、签名等较慢的准备工作放在工厂里、首次用到时才做，--only 只选部分用例时不付这部分启动开销。
+    # scale 为基准迭代次数，较慢的操作按比例减少
+    rnd = random.Random(20250713)
+    n = int(sm2_acc.N)
+    msgs = [rnd.randbytes(rnd.randint(10, 100)) for _ in range(scale)]
+    scalars = [rnd.randrange(1, n) for _ in range(scale)]
+    sm3_data = {size: rnd.randbytes(size) for size in (64, 1024, 16384)}
+    many = [rnd.randbytes(64) for _ in range(256)]
+    nonce_rnd = random.Random(rnd.random())
+    lazy = functools.lru_cache(maxsize=None)
+
+    @lazy
+    def base_keys():
+        return [sm2_base.generate_keypair() for _ in range(4)]
+
+    @lazy
+    def acc_keys():
+        return [sm2_acc.generate_keypair() for _ in range(4)]
+
+    @lazy
+    def signing_key():
+        return sm2_acc.SigningKey(acc_keys()[0][0])
+
+    @lazy
+    def base_sigs():
+        keys = base_keys()
+        return [sm2_base.sm2_sign(keys[i % 4][0], m) for i, m in enumerate(msgs)]
+
+    @lazy
+    def acc_sigs():
+        keys = acc_keys()
+        return [sm2_acc.sm2_sign(keys[i % 4][0], m) for i, m in enumerate(msgs)]
+
+    @lazy
+    def key_sigs():
+        sk = signing_key()
+        return [sk.sign(m) for m in msgs]
+
+    @lazy
+    def points():
+        return [sm2_acc.base_mul(k) for k in scalars[:16]]
+
+    def window_nonce():
+        k = nonce_rnd.randrange(1, n)
+        return k, sm2_acc.base_mul(k).x
+
+    # 内层 lambda 的默认参数在工厂被调用时求值，计时循环里不再经过缓存查找
+    cases = {
+        "keygen/sm2_base": lambda: (sm2_base.generate_keypair, scale // 4),
+        "keygen/sm2_acc": lambda: (sm2_acc.generate_keypair, scale),
+        "sign/sm2_base": lambda: (lambda i, k=base_keys(): sm2_base.sm2_sign(k[i % 4][0], msgs[i]), scale // 4),
+        "sign/sm2_acc": lambda: (lambda i, k=acc_keys(): sm2_acc.sm2_sign(k[i % 4][0], msgs[i]), scale),
+        "sign/SigningKey": lambda: (lambda i, sk=signing_key(): sk.sign(msgs[i]), scale),
+        "sign/SigningKey_window": lambda: (lambda i, sk=signing_key(): sk.sign(msgs[i], nonce_source=window_nonce), scale),
+        "verify/sm2_base": lambda: (
+            lambda i, k=base_keys(), sigs=base_sigs(): sm2_base.sm2_verify(k[i % 4][1], msgs[i], sigs[i]),
+            scale // 4,
+        ),
+        "verify/sm2_acc": lambda: (
+            lambda i, k=acc_keys(), sigs=acc_sigs(): sm2_acc.sm2_verify(k[i % 4][1], msgs[i], sigs[i]),
+            scale,
+        ),
+        "verify/VerifyingKey": lambda: (
+            lambda i, vk=signing_key().verifying_key(window=4), sigs=key_sigs(): vk.verify(msgs[i], sigs[i]),
+            scale,
+        ),
+        "scalar_mul/affine": lambda: (lambda i: sm2_acc.G.mul_affine(scalars[i]), scale // 4),
+        "scalar_mul/jacobian": lambda: (lambda i: scalars[i] * sm2_acc.G, scale),
+        "scalar_mul/fixed_base": lambda: (lambda i: sm2_acc.base_mul(scalars[i]), scale),
+        "scalar_mul/ladder": lambda: (lambda i: sm2_acc.ladder_mul(scalars[i], sm2_acc.G), scale),
+        "scalar_mul/double_wnaf": lambda: (
+            lambda i, pts=points(): sm2_acc.double_base_mul(scalars[i], scalars[-i - 1], pts[i % 16], False),
+            scale,
+        ),
+        "scalar_mul/double_table": lambda: (
+            lambda i, pts=points(): sm2_acc.double_base_mul(scalars[i], scalars[-i - 1], pts[i % 16]),
+            scale,
+        ),
+    }
+    for size, data in sm3_data.items():
+        count = max(8, scale * 64 // size)
+        cases[f"sm3/{size}B/sm2_base"] = lambda d=data, c=count: (lambda i: sm2_base.sm3_hash(d), c)
+        cases[f"sm3/{size}B/sm2_acc"] = lambda d=data, c=count: (lambda i: sm2_acc.sm3_hash(d), c)
+    cases["sm3/many_256x64B/loop"] = lambda: (lambda i: [sm2_acc.sm3_hash(m) for m in many], max(4, scale // 20))
+    cases["sm3/many_256x64B/lanes"] = lambda: (lambda i: sm3_batch.sm3_hash_many(many), max(4, scale // 20))
+
+    fx = [sm2_field.mpz(k) for k in scalars]
+    cases["field/mul"] = lambda: (lambda i: fx[i] * fx[-i - 1] % sm2_field.P, scale * 20)
+    cases["field/inv"] = lambda: (lambda i: sm2_field.finv(fx[i]), scale * 10)
+    cases["field/batch_inv_64"] = lambda: (lambda i: sm2_field.batch_inv(fx[:64]), scale)
+    cases["field/sqrt"] = lambda: (lambda i: sm2_field.fsqrt(fx[i]), scale * 10)
+    return cases
+
+
+def run(scale: int = 200, warmup: int = 10, only=None) -> dict:
+    results = []
+    for name, factory in build_cases(scale).items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        func, iterations = factory()
+        call = func if func.__code__.co_argcount else (lambda i, f=func: f())
+        results.append(measure(name, lambda i, f=call: f(i % scale), iterations, warmup))
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "backend": sm2_backend.describe(),
+            "platform": platform.platform(),
+            "scale": scale,
+        },
+        "results": results,
+    }
+
+
+# ========== 启动开销 ==========
+_STARTUP_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import sm2_acc, sm2_backend
+t1 = time.perf_counter()
+sm2_acc.base_mul(1)
+t2 = time.perf_counter()
+print(sm2_backend.name, (t1 - t0) * 1000, (t2 - t1) * 1000)
+"""
+
+
+def measure_startup(backends=("gmpy2", "int"), runs: int = 5) -> list:
+    # 在新进程中分别测量导入耗时与首次用到基点表时的建表耗时，取中位数
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for backend in backends:
+        env = dict(os.environ, **{sm2_backend.BACKEND_ENV: backend})
+        samples = []
+        for _ in range(runs):
+            proc = subprocess.run([sys.executable, "-c", _STARTUP_SNIPPET], cwd=here, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                break
+            name, import_ms, table_ms = proc.stdout.split()
+            samples.append((float(import_ms), float(table_ms)))
+        if not samples:
+            results.append({"backend": backend, "available": False})
+            continue
+        import_ms = sorted(x for x, _ in samples)[len(samples) // 2]
+        table_ms = sorted(y for _, y in samples)[len(samples) // 2]
+        results.append({"backend": name, "available": True, "import_ms": import_ms, "first_table_ms": table_ms})
+    return results
+
+
+def print_report(report: dict):
+    meta = report["meta"]
+    print(f"后端: {meta['backend']['backend']} {meta['backend']['version'] or ''}")
+    for item in report.get("startup", []):
+        if item["available"]:
+            print(f"启动开销[{item['backend']}]: 导入 {item['import_ms']:.1f}毫秒, 首次建基点表 {item['first_table_ms']:.1f}毫秒")
+        else:
+            print(f"启动开销[{item['backend']}]: 不可用")
+    print(f"{'用例':<30}{'次数':>8}{'p50(us)':>12}{'p95(us)':>12}{'p99(us)':>12}{'ops/s':>12}")
+    for r in report["results"]:
+        print(
+            f"{r['name']:<30}{r['iterations']:>8}{r['p50_us']:>12.1f}{r['p95_us']:>12.1f}"
+            f"{r['p99_us']:>12.1f}{r['ops_per_sec']:>12.0f}"
+        )
+
+
+# ========== 回归对比 ==========
+def compare(old: dict, new: dict, threshold: float = 0.10) -> int:
+    # 以 p50 比较两次运行，变慢超过 threshold 记为回归，返回回归项数
+    old_map = {r["name"]: r for r in old["results"]}
+    regressions = 0
+    print(f"{'用例':<30}{'旧 p50(us)':>12}{'新 p50(us)':>12}{'比值':>8}  结论")
+    for r in new["results"]:
+        before = old_map.get(r["name"])
+        if before is None:
+            continue
+        ratio = r["p50_us"] / before["p50_us"] if before["p50_us"] else float("inf")
+        if ratio > 1 + threshold:
+            verdict = "回归 ❌"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            verdict = "提升 ✅"
+        else:
+            verdict = "持平"
+        print(f"{r['name']:<30}{before['p50_us']:>12.1f}{r['p50_us']:>12.1f}{ratio:>8.2f}  {verdict}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SM2/SM3 基准测试")
+    parser.add_argument("--scale", type=int, default=200, help="基准迭代次数")
+    parser.add_argument("--warmup", type=int, default=10, help="预热次数")
+    parser.add_argument("--only", nargs="*", help="只运行指定前缀的用例，如 sign verify sm3")
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="对比两次运行的 JSON 结果")
+    parser.add_argument("--threshold", type=float, default=0.10, help="回归判定阈值（比例）")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            new = json.load(f)
+        return 1 if compare(old, new, args.threshold) else 0
+
+    report = run(args.scale, args.warmup, args.only)
+    report["startup"] = measure_startup()
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
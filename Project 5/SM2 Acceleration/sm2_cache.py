@@ -0,0 +1,169 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from sm2_acc import DEFAULT_USER_ID, ECPoint, VerifyingKey, is_on_curve, generate_keypair, sm2_sign, sm2_verify
+
+
+# ========== 验签公钥缓存 ==========
+class _KeyEntry:
+    __slots__ = ("valid", "vk", "uses")
+
+    def __init__(self, valid: bool, vk: VerifyingKey):
+        self.valid = valid
+        self.vk = vk
+        self.uses = 0
+
+
+class VerifyKeyCache:
+    # 以 (公钥, user_id) 为键的有界 LRU 缓存，保存点合法性、ZA 以及热点公钥的固定窗口表。
+    # 条目数与预计算表数分别受 max_entries / max_tables 限制，表按各自的 LRU 顺序回收。
+    def __init__(self, max_entries: int = 4096, max_tables: int = 64, table_window: int = 4, hot_threshold: int = 16):
+        self.max_entries = max_entries
+        self.max_tables = max_tables
+        self.table_window = table_window
+        self.hot_threshold = hot_threshold
+        self._entries = OrderedDict()
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.table_builds = 0
+        self.table_evictions = 0
+
+    def get(self, public_key: ECPoint, user_id: bytes = DEFAULT_USER_ID) -> _KeyEntry:
+        key = (int(public_key.x), int(public_key.y), user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                entry.uses += 1
+                if key in self._tables:
+                    self._tables.move_to_end(key)
+                build = entry.valid and entry.uses == self.hot_threshold and entry.vk.table is None
+            else:
+                self.misses += 1
+        if entry is None:
+            # 在锁外完成曲线检查与 ZA 计算，并发未命中时最多重复计算一次
+            valid = is_on_curve(public_key)
+            vk = VerifyingKey(public_key)
+            if valid:
+                vk.za(user_id)
+            entry = self._insert(key, _KeyEntry(valid, vk))
+        elif build:
+            self._promote(key, entry)
+        return entry
+
+    def _insert(self, key, entry: _KeyEntry) -> _KeyEntry:
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                return existing
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._tables.pop(old_key, None)
+                self.evictions += 1
+        return entry
+
+    def _promote(self, key, entry: _KeyEntry):
+        entry.vk.precompute(self.table_window)
+        with self._lock:
+            self.table_builds += 1
+            if key not in self._entries:
+                return
+            self._tables[key] = entry
+            while len(self._tables) > self.max_tables:
+                _, cold = self._tables.popitem(last=False)
+                cold.vk.table = None
+                cold.uses = 0  # 重新计数，再次达到阈值时重建表
+                self.table_evictions += 1
+
+    def verify(self, public_key: ECPoint, msg: bytes, signature, user_id: bytes = DEFAULT_USER_ID) -> bool:
+        entry = self.get(public_key, user_id)
+        if not entry.valid:
+            return False
+        return entry.vk.verify(msg, signature, user_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "tables": len(self._tables),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "table_builds": self.table_builds,
+                "table_evictions": self.table_evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tables.clear()
+
+
+default_cache = VerifyKeyCache()
+
+
+def sm2_verify_cached(public_key: ECPoint, msg: bytes, signature, user_id: bytes = DEFAULT_USER_ID) -> bool:
+    # 与 sm2_verify 相同，但不在曲线上的公钥直接判为失败
+    return default_cache.verify(public_key, msg, signature, user_id)
+
+
+# ========== 测试与性能 ==========
+def cache_self_test():
+    keys = [generate_keypair() for _ in range(2)]
+    sigs = [sm2_sign(priv, b"cache") for priv, _ in keys]
+    cache = VerifyKeyCache(max_tables=1, hot_threshold=3)
+    (_, a), (_, b) = keys
+
+    def use(i, times):
+        for _ in range(times):
+            assert cache.verify(keys[i][1], b"cache", sigs[i])
+
+    use(0, 4)
+    assert cache.get(a).vk.table is not None, "热点公钥未构建表"
+    use(1, 4)
+    assert cache.get(b).vk.table is not None and cache.get(a).vk.table is None, "表未按 LRU 回收"
+    use(0, 3)
+    assert cache.get(a).vk.table is not None, "被回收表的公钥再次变热后未重建表"
+    assert cache.stats()["table_builds"] == 3 and cache.stats()["table_evictions"] == 2
+
+    bad = ECPoint(1, 1)
+    assert not cache.verify(bad, b"cache", sigs[0]) and not cache.get(bad).valid
+    print("验签公钥缓存测试通过 ✅")
+
+
+def cache_performance_test(rounds: int = 2000, hot_keys: int = 8, cold_keys: int = 200):
+    # 长尾分布：80% 的请求落在少量热点公钥上
+    hot = [generate_keypair() for _ in range(hot_keys)]
+    cold = [generate_keypair() for _ in range(cold_keys)]
+    cases = []
+    for _ in range(rounds):
+        priv, pub = random.choice(hot) if random.random() < 0.8 else random.choice(cold)
+        msg = random.randbytes(random.randint(10, 100))
+        cases.append((pub, msg, sm2_sign(priv, msg)))
+
+    cache = VerifyKeyCache(max_entries=128, max_tables=hot_keys)
+    start = time.perf_counter()
+    expected = [sm2_verify(pub, msg, sig) for pub, msg, sig in cases]
+    plain_time = time.perf_counter() - start
+    start = time.perf_counter()
+    results = [cache.verify(pub, msg, sig) for pub, msg, sig in cases]
+    cached_time = time.perf_counter() - start
+
+    assert results == expected, "缓存验签结果与 sm2_verify 不一致"
+    print(f"sm2_verify {rounds}次耗时: {plain_time:.4f}秒, 平均每次: {plain_time*1000/rounds:.4f}毫秒")
+    print(f"缓存验签{rounds}次耗时: {cached_time:.4f}秒, 平均每次: {cached_time*1000/rounds:.4f}毫秒")
+    print(f"缓存统计: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    cache_self_test()
+    cache_performance_test()
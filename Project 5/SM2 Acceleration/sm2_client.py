@@ -0,0 +1,143 @@
+import asyncio
+import random
+import struct
+import time
+
+from sm2_acc import DEFAULT_USER_ID, ECPoint, SigningKey, sm2_verify
+from sm2_server import OP_SIGN, OP_VERIFY, SM2Server, decode_response, encode_frame, encode_sign_request, encode_verify_request, read_frame
+
+
+# ========== 客户端 ==========
+class SM2Client:
+    # 单连接流水线客户端：请求按 req_id 匹配响应，可在同一连接上并发发送
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._waiters = {}
+        self._receiver = asyncio.get_running_loop().create_task(self._receive())
+
+    @classmethod
+    async def connect_tcp(cls, host: str = "127.0.0.1", port: int = 9555) -> "SM2Client":
+        return cls(*await asyncio.open_connection(host, port))
+
+    @classmethod
+    async def connect_unix(cls, path: str) -> "SM2Client":
+        return cls(*await asyncio.open_unix_connection(path))
+
+    async def _receive(self):
+        try:
+            while True:
+                payload = await read_frame(self._reader)
+                if payload is None:
+                    break
+                _, req_id, result = decode_response(payload)
+                fut = self._waiters.pop(req_id, None)
+                if fut is None or fut.done():
+                    continue
+                if isinstance(result, Exception):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
+        finally:
+            for fut in self._waiters.values():
+                if not fut.done():
+                    fut.set_exception(ConnectionError("连接已关闭"))
+
+    async def _request(self, encode, *args):
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        req_id = self._next_id
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[req_id] = fut
+        self._writer.write(encode(req_id, *args))
+        await self._writer.drain()
+        return await fut
+
+    async def sign(self, key_id: int, msg: bytes, user_id: bytes = DEFAULT_USER_ID):
+        return await self._request(encode_sign_request, key_id, msg, user_id)
+
+    async def verify(self, public_key: ECPoint, msg: bytes, signature, user_id: bytes = DEFAULT_USER_ID) -> bool:
+        return await self._request(encode_verify_request, public_key, msg, signature, user_id)
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._receiver.cancel()
+        try:
+            await self._receiver
+        except asyncio.CancelledError:
+            pass
+
+
+# ========== 压测 ==========
+def _report(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    pct = {p: latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000 for p in (50, 95, 99)}
+    print(
+        f"{name}: {len(latencies)} 次, 吞吐 {len(latencies) / elapsed:.0f} 次/秒, "
+        f"p50 {pct[50]:.2f}毫秒, p95 {pct[95]:.2f}毫秒, p99 {pct[99]:.2f}毫秒"
+    )
+
+
+async def load_test(client: SM2Client, public_keys, total: int = 1000, concurrency: int = 64):
+    msgs = [random.randbytes(random.randint(10, 100)) for _ in range(total)]
+    sigs = [None] * total
+    latencies = []
+
+    async def run(op):
+        nonlocal cursor
+        while cursor < total:
+            i = cursor
+            cursor += 1
+            start = time.perf_counter()
+            if op == "sign":
+                sigs[i] = await client.sign(i % len(public_keys), msgs[i])
+            else:
+                assert await client.verify(public_keys[i % len(public_keys)], msgs[i], sigs[i]), "服务端验签失败"
+            latencies.append(time.perf_counter() - start)
+
+    for op, name in (("sign", "签名"), ("verify", "验签")):
+        cursor = 0
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*(run(op) for _ in range(concurrency)))
+        _report(name, latencies, time.perf_counter() - start)
+    return msgs, sigs
+
+
+async def malformed_test(host: str, port: int):
+    # 无法解码的帧（未知操作码、user_id 长度越界、验签请求过短）应按原 req_id 返回错误
+    frames = {
+        1: struct.pack(">BI", 0xFF, 1),
+        2: struct.pack(">BIHB", OP_SIGN, 2, 0, 200) + b"1234567812345678",
+        3: struct.pack(">BI", OP_VERIFY, 3) + bytes(100),
+        4: struct.pack(">BI", OP_VERIFY, 4) + bytes(128) + b"\x20" + b"short",
+    }
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"".join(encode_frame(frame) for frame in frames.values()))
+    await writer.drain()
+    for _ in range(len(frames)):
+        _, req_id, result = decode_response(await asyncio.wait_for(read_frame(reader), 5))
+        assert isinstance(result, RuntimeError) and frames.pop(req_id, None) is not None, f"畸形请求 {req_id} 未返回错误"
+    assert not frames, f"畸形请求未全部返回: {sorted(frames)}"
+    writer.close()
+    await writer.wait_closed()
+
+
+async def local_demo(total: int = 1000, concurrency: int = 64, keys: int = 4):
+    # 在本机启动服务并压测
+    signing_keys = [SigningKey.generate() for _ in range(keys)]
+    server = SM2Server(signing_keys, max_batch=64, max_wait=0.002)
+    host, port = await server.start_tcp()
+    client = await SM2Client.connect_tcp(host, port)
+    public_keys = [sk.public_key for sk in signing_keys]
+    msgs, sigs = await load_test(client, public_keys, total, concurrency)
+    await client.close()
+    await malformed_test(host, port)
+    await server.close()
+    assert all(sm2_verify(public_keys[i % keys], m, sig) for i, (m, sig) in enumerate(zip(msgs, sigs))), "签名结果错误"
+    print(f"服务端批次数: {server.batches}, 平均批大小: {server.requests / server.batches:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(local_demo())
@@ -0,0 +1,197 @@
+import time
+
+from sm2_acc import A, B, N, ECPoint, SigningKey, is_on_curve
+from sm2_field import P, fsqrt, mpz
+
+# ========== 点编码（SEC1） ==========
+# 压缩：02/03 || x（33 字节，前缀区分 y 的奇偶）；非压缩：04 || x || y（65 字节）。
+# 无穷远点不是合法公钥，不提供编码。
+COMPRESSED_SIZE = 33
+UNCOMPRESSED_SIZE = 65
+
+
+def encode_point(pt: ECPoint, compressed: bool = True) -> bytes:
+    x = int(pt.x).to_bytes(32, "big")
+    if compressed:
+        return (b"\x03" if pt.y & 1 else b"\x02") + x
+    return b"\x04" + x + int(pt.y).to_bytes(32, "big")
+
+
+def decode_point(data: bytes) -> ECPoint:
+    # 解码并校验点在曲线上，非法编码抛出 ValueError
+    data = bytes(data)
+    if len(data) == COMPRESSED_SIZE and data[0] in (2, 3):
+        x = mpz(int.from_bytes(data[1:], "big"))
+        if x >= P:
+            raise ValueError("点坐标超出范围")
+        y = fsqrt((x * x + A) * x + B)
+        if y is None:
+            raise ValueError("点不在曲线上")
+        if (y & 1) != (data[0] & 1):
+            y = P - y
+        return ECPoint(x, y)
+    if len(data) == UNCOMPRESSED_SIZE and data[0] == 4:
+        pt = ECPoint(int.from_bytes(data[1:33], "big"), int.from_bytes(data[33:], "big"))
+        if not is_on_curve(pt):
+            raise ValueError("点不在曲线上")
+        return pt
+    raise ValueError("无法识别的点编码")
+
+
+def decode_points(items, strict: bool = True) -> list:
+    # 批量解码：压缩与非压缩编码可混合。压缩点用 sm2_field.fsqrt 开平方，
+    # 有平方根即说明点在曲线上；非压缩点逐个验证曲线方程。
+    # 所有常量绑定为局部变量、直接填充 ECPoint 槽位，省去逐点函数调用与重复的类型转换。
+    # strict 为 False 时非法编码对应位置返回 None，否则抛出带序号的 ValueError
+    a, b, p, sqrt = A, B, P, fsqrt
+    new = ECPoint.__new__
+    from_bytes = int.from_bytes
+    result = []
+    append = result.append
+    for i, data in enumerate(items):
+        pt = None
+        n = len(data)
+        prefix = data[0] if n else 0
+        if n == COMPRESSED_SIZE and (prefix == 2 or prefix == 3):
+            x = mpz(from_bytes(data[1:], "big"))
+            if x < p:
+                y = sqrt((x * x + a) * x + b)
+                if y is not None:
+                    if (y & 1) != (prefix & 1):
+                        y = p - y
+                    pt = new(ECPoint)
+                    pt.x, pt.y = x, y
+        elif n == UNCOMPRESSED_SIZE and prefix == 4:
+            x = mpz(from_bytes(data[1:33], "big"))
+            y = mpz(from_bytes(data[33:], "big"))
+            if x < p and y < p and (y * y - (x * x + a) * x - b) % p == 0 and (x or y):
+                pt = new(ECPoint)
+                pt.x, pt.y = x, y
+        if pt is None and strict:
+            raise ValueError(f"第 {i} 个点编码非法")
+        append(pt)
+    return result
+
+
+def iter_records(buf, record_size: int = COMPRESSED_SIZE):
+    # 把定长记录首尾相接的缓冲区（如密钥库文件的 mmap）切分为各条编码，不复制整个缓冲区
+    view = memoryview(buf).cast("B")
+    for off in range(0, len(view) - record_size + 1, record_size):
+        yield view[off : off + record_size]
+
+
+# ========== 签名编码 ==========
+SIGNATURE_SIZE = 64
+
+
+def encode_signature_raw(signature) -> bytes:
+    r, s = signature
+    return int(r).to_bytes(32, "big") + int(s).to_bytes(32, "big")
+
+
+def decode_signature_raw(data: bytes):
+    if len(data) != SIGNATURE_SIZE:
+        raise ValueError("签名长度错误")
+    r, s = int.from_bytes(data[:32], "big"), int.from_bytes(data[32:], "big")
+    if not (1 <= r < N and 1 <= s < N):
+        raise ValueError("签名分量超出范围")
+    return r, s
+
+
+def _der_int(v: int) -> bytes:
+    body = v.to_bytes(v.bit_length() // 8 + 1, "big")
+    return b"\x02" + bytes([len(body)]) + body
+
+
+def encode_signature_der(signature) -> bytes:
+    # SEQUENCE { INTEGER r, INTEGER s }，r、s < 2^256，总长度不超过 72 字节，均为短格式长度
+    r, s = signature
+    body = _der_int(int(r)) + _der_int(int(s))
+    return b"\x30" + bytes([len(body)]) + body
+
+
+def _read_der_int(data: bytes, pos: int):
+    if pos + 2 > len(data) or data[pos] != 0x02:
+        raise ValueError("DER 签名格式错误")
+    length = data[pos + 1]
+    body = data[pos + 2 : pos + 2 + length]
+    if length == 0 or length > 33 or len(body) != length:
+        raise ValueError("DER 整数长度错误")
+    if body[0] & 0x80 or (body[0] == 0 and length > 1 and not body[1] & 0x80):
+        raise ValueError("DER 整数不是最短的非负编码")
+    return int.from_bytes(body, "big"), pos + 2 + length
+
+
+def decode_signature_der(data: bytes):
+    # 严格 DER：只接受规范编码，拒绝多余字节、负数与非最短整数，防止签名可延展
+    data = bytes(data)
+    if len(data) < 2 or data[0] != 0x30 or data[1] != len(data) - 2 or data[1] >= 0x80:
+        raise ValueError("DER 签名格式错误")
+    r, pos = _read_der_int(data, 2)
+    s, pos = _read_der_int(data, pos)
+    if pos != len(data):
+        raise ValueError("DER 签名有多余数据")
+    if not (1 <= r < N and 1 <= s < N):
+        raise ValueError("签名分量超出范围")
+    return r, s
+
+
+# ========== 测试与性能 ==========
+def codec_self_test():
+    keys = [SigningKey.generate() for _ in range(50)]
+    points = [sk.public_key for sk in keys]
+    for pt in points:
+        assert decode_point(encode_point(pt)) == pt and decode_point(encode_point(pt, False)) == pt
+    mixed = [encode_point(pt, i % 2 == 0) for i, pt in enumerate(points)]
+    assert decode_points(mixed) == points, "批量解码结果错误"
+
+    bad = [encode_point(points[0])[:1] + b"\xff" * 32, b"\x04" + b"\x00" * 64, b"\x05" + b"\x01" * 32]
+    bad.append(b"\x04" + encode_point(points[0], False)[1:33] + encode_point(points[1], False)[33:])
+    assert decode_points(bad + mixed[:1], strict=False) == [None] * len(bad) + points[:1]
+    for data in bad:
+        try:
+            decode_point(data)
+            raise AssertionError("非法点编码未被拒绝")
+        except ValueError:
+            pass
+    buf = b"".join(encode_point(pt) for pt in points)
+    assert decode_points(iter_records(buf)) == points
+
+    for sk in keys[:10]:
+        sig = sk.sign(b"codec")
+        assert decode_signature_raw(encode_signature_raw(sig)) == sig
+        der = encode_signature_der(sig)
+        assert decode_signature_der(der) == sig and len(der) <= 72
+    for sig in ((1, 1), (N - 1, N - 1), (0x80, 0x7F)):
+        assert decode_signature_der(encode_signature_der(sig)) == sig
+    der = encode_signature_der((5, 7))
+    for bad_der in (der + b"\x00", b"\x30\x07\x02\x02\x00\x05\x02\x01\x07", b"\x30\x06\x02\x01\x85\x02\x01\x07", der[:-1]):
+        try:
+            decode_signature_der(bad_der)
+            raise AssertionError("非规范 DER 签名未被拒绝")
+        except ValueError:
+            pass
+    print("点与签名编码测试通过 ✅")
+
+
+def codec_performance_test(count: int = 20000):
+    pts = [SigningKey.generate().public_key for _ in range(200)]
+    compressed = [encode_point(pts[i % 200]) for i in range(count)]
+    uncompressed = [encode_point(pts[i % 200], False) for i in range(count)]
+    print(f"{count}个公钥存储: 压缩 {count * COMPRESSED_SIZE / 1024:.0f}KB, 非压缩 {count * UNCOMPRESSED_SIZE / 1024:.0f}KB")
+    rows = [
+        ("逐个解码 (压缩)", lambda: [decode_point(d) for d in compressed]),
+        ("批量解码 (压缩)", lambda: decode_points(compressed)),
+        ("逐个解码 (非压缩)", lambda: [decode_point(d) for d in uncompressed]),
+        ("批量解码 (非压缩)", lambda: decode_points(uncompressed)),
+    ]
+    for name, func in rows:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        print(f"{name}: 平均 {elapsed*1e6/count:.2f}微秒, {count/elapsed:.0f} 个/秒")
+
+
+if __name__ == "__main__":
+    codec_self_test()
+    codec_performance_test()
@@ -0,0 +1,310 @@
+import hmac
+import io
+import os
+import random
+import time
+
+from sm2_acc import N, ECPoint, FixedBaseTable, SigningKey, batch_to_affine, get_base_table, is_on_curve, mpz, multi_scalar_mul, secret_mul, secret_mul_jacobian
+from sm2_codec import decode_point, encode_point
+from sm3 import SM3
+from sm3_batch import sm3_hash_many
+from sm3_hmac import KDFStream, kdf
+
+# ========== SM2 公钥加密 ==========
+# GM/T 0003.4：C1 = k*G（04 || x || y），(x2, y2) = k*P_B，t = KDF(x2 || y2, len(M))，
+# C2 = M ^ t，C3 = SM3(x2 || M || y2)。
+# 新标准密文顺序为 C1 || C3 || C2，旧版为 C1 || C2 || C3。
+MODE_C1C3C2 = "C1C3C2"
+MODE_C1C2C3 = "C1C2C3"
+C1_SIZE = 65
+C3_SIZE = 32
+BATCH_TABLE_THRESHOLD = 16  # fast 批量加密的消息数达到该值时为接收方公钥临时建固定窗口表
+
+
+def _check_mode(mode: str):
+    if mode not in (MODE_C1C3C2, MODE_C1C2C3):
+        raise ValueError(f"未知密文顺序: {mode}")
+
+
+def _xor(data: bytes, key: bytes) -> bytes:
+    # 整段按大整数异或，长数据比逐字节快得多
+    n = len(data)
+    return (int.from_bytes(data, "big") ^ int.from_bytes(key[:n], "big")).to_bytes(n, "big")
+
+
+def _encode_c1(pt: ECPoint) -> bytes:
+    return encode_point(pt, compressed=False)
+
+
+def _decode_c1(data: bytes) -> ECPoint:
+    # C1 固定为非压缩编码，解码时校验点在曲线上
+    if len(data) != C1_SIZE or data[0] != 4:
+        raise ValueError("SM2 解密失败")
+    try:
+        return decode_point(data)
+    except ValueError:
+        raise ValueError("SM2 解密失败") from None
+
+
+def _shared_bytes(pt: ECPoint):
+    return int(pt.x).to_bytes(32, "big"), int(pt.y).to_bytes(32, "big")
+
+
+def _assemble(c1: bytes, x2: bytes, y2: bytes, msg: bytes, mode: str, t: bytes = None, c3: bytes = None):
+    # 返回密文；t 全为 0 时返回 None，由调用方重新选取 k。t、c3 未给出时现算
+    if t is None:
+        t = kdf(x2 + y2, len(msg))
+    if msg and not t.strip(b"\x00"):
+        return None
+    if c3 is None:
+        h = SM3(x2)
+        h.update(msg)
+        h.update(y2)
+        c3 = h.digest()
+    c2 = _xor(msg, t)
+    return c1 + c3 + c2 if mode == MODE_C1C3C2 else c1 + c2 + c3
+
+
+class EncryptionKey:
+    # 接收方公钥；热点公钥可预先构建固定窗口表，k*P_B 与 k*G 一样只需查表点加
+    __slots__ = ("public_key", "table")
+
+    def __init__(self, public_key: ECPoint, window=None):
+        if not is_on_curve(public_key):
+            raise ValueError("公钥不在曲线上")
+        self.public_key = public_key
+        self.table = None
+        if window is not None:
+            self.precompute(window)
+
+    def precompute(self, window: int = 4):
+        self.table = FixedBaseTable(self.public_key, window)
+
+    def _ephemeral(self):
+        # 返回 (C1 编码, x2, y2)；k 为秘密值，按 sm2_acc 的秘密标量乘模式计算，两个点一起归一化
+        k = random.randint(1, int(N - 1))
+        c1, shared = batch_to_affine([secret_mul_jacobian(k), secret_mul_jacobian(k, self.public_key, self.table)])
+        return (_encode_c1(c1),) + _shared_bytes(shared)
+
+    def encrypt(self, msg: bytes, mode: str = MODE_C1C3C2) -> bytes:
+        _check_mode(mode)
+        while True:
+            c1, x2, y2 = self._ephemeral()
+            ct = _assemble(c1, x2, y2, msg, mode)
+            if ct is not None:
+                return ct
+
+    def encrypt_many(self, messages, mode: str = MODE_C1C3C2, fast: bool = False) -> list:
+        # 批量加密：全部 2n 个点一次批量求逆归一化，KDF 各计数器块与 C3 交给多路并行 SM3。
+        # 默认 k*G、k*P_B 按 sm2_acc 的秘密标量点乘模式逐个计算（默认蒙哥马利阶梯）；
+        # fast=True 时改为查表（基点表与接收方公钥表，消息多时临时构建），吞吐更高，但耗时依赖秘密的 k
+        _check_mode(mode)
+        messages = [bytes(m) for m in messages]
+        if not messages:
+            return []
+        ks = [random.randint(1, int(N - 1)) for _ in messages]
+        if fast:
+            table = self.table
+            if table is None and len(messages) >= BATCH_TABLE_THRESHOLD:
+                table = FixedBaseTable(self.public_key, 4)
+            base = get_base_table()
+            if table is not None:
+                mul = table.mul_jacobian
+            else:
+                mul = lambda k: multi_scalar_mul([(k, self.public_key)])  # noqa: E731
+            jac = [base.mul_jacobian(k) for k in ks] + [mul(k) for k in ks]
+        else:
+            jac = [secret_mul_jacobian(k) for k in ks] + [secret_mul_jacobian(k, self.public_key, self.table) for k in ks]
+        points = batch_to_affine(jac)
+        shared = [_shared_bytes(pt) for pt in points[len(ks) :]]
+
+        blocks = [(len(m) + 31) // 32 for m in messages]
+        kdf_inputs = [x2 + y2 + ct.to_bytes(4, "big") for (x2, y2), count in zip(shared, blocks) for ct in range(1, count + 1)]
+        kdf_out = sm3_hash_many(kdf_inputs)
+        c3s = sm3_hash_many(x2 + m + y2 for (x2, y2), m in zip(shared, messages))
+        result = []
+        pos = 0
+        for m, c1, (x2, y2), count, c3 in zip(messages, points, shared, blocks, c3s):
+            t = b"".join(kdf_out[pos : pos + count])[: len(m)]
+            pos += count
+            ct = _assemble(_encode_c1(c1), x2, y2, m, mode, t, c3)
+            result.append(ct if ct is not None else self.encrypt(m, mode))
+        return result
+
+    def encrypt_stream(self, src, dst, mode: str = MODE_C1C3C2, chunk_size: int = 1 << 20) -> int:
+        # 从 src 分块读取明文、与现算的 KDF 输出异或后写入 dst，C3 随读随更新，内存占用与消息长度无关。
+        # C1C3C2 顺序需先写占位再回填 C3，因此要求 dst 可定位。
+        # 密钥流全 0 的概率可忽略（每 32 字节 2^-256），流式模式不做该检查。返回密文长度
+        _check_mode(mode)
+        if mode == MODE_C1C3C2 and not dst.seekable():
+            raise ValueError("C1C3C2 顺序的流式加密需要可定位的输出")
+        c1, x2, y2 = self._ephemeral()
+        keystream = KDFStream(x2 + y2)
+        h = SM3(x2)
+        dst.write(c1)
+        if mode == MODE_C1C3C2:
+            c3_pos = dst.tell()
+            dst.write(b"\x00" * C3_SIZE)
+        total = 0
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+            dst.write(_xor(chunk, keystream.read(len(chunk))))
+            total += len(chunk)
+        h.update(y2)
+        if mode == MODE_C1C3C2:
+            end = dst.tell()
+            dst.seek(c3_pos)
+            dst.write(h.digest())
+            dst.seek(end)
+        else:
+            dst.write(h.digest())
+        return C1_SIZE + C3_SIZE + total
+
+
+class DecryptionKey:
+    __slots__ = ("d", "_public_key")
+
+    def __init__(self, private_key):
+        if not 1 <= private_key < N - 1:
+            raise ValueError("私钥需在 [1, n-2] 范围内")
+        self.d = mpz(private_key)
+        self._public_key = None
+
+    @property
+    def public_key(self) -> ECPoint:
+        # 解密用不到公钥，首次访问时才计算，sm2_decrypt 等一次性调用不必多做一次阶梯点乘
+        if self._public_key is None:
+            self._public_key = secret_mul(self.d)
+        return self._public_key
+
+    def _shared(self, c1: bytes):
+        return _shared_bytes(secret_mul(self.d, _decode_c1(c1)))
+
+    def decrypt(self, ciphertext: bytes, mode: str = MODE_C1C3C2) -> bytes:
+        _check_mode(mode)
+        if len(ciphertext) < C1_SIZE + C3_SIZE:
+            raise ValueError("SM2 解密失败")
+        x2, y2 = self._shared(ciphertext[:C1_SIZE])
+        if mode == MODE_C1C3C2:
+            c3, c2 = ciphertext[C1_SIZE : C1_SIZE + C3_SIZE], ciphertext[C1_SIZE + C3_SIZE :]
+        else:
+            c2, c3 = ciphertext[C1_SIZE:-C3_SIZE], ciphertext[-C3_SIZE:]
+        t = kdf(x2 + y2, len(c2))
+        if c2 and not t.strip(b"\x00"):
+            raise ValueError("SM2 解密失败")
+        msg = _xor(c2, t)
+        h = SM3(x2)
+        h.update(msg)
+        h.update(y2)
+        if not hmac.compare_digest(h.digest(), c3):
+            raise ValueError("SM2 解密失败")
+        return msg
+
+    def decrypt_stream(self, src, dst, mode: str = MODE_C1C3C2, chunk_size: int = 1 << 20) -> int:
+        # 分块解密写入 dst；C3 在读完全部密文后才能校验，校验失败时抛出 ValueError，
+        # 此时已写入 dst 的数据不可信，调用方应丢弃。返回明文长度
+        _check_mode(mode)
+        x2, y2 = self._shared(src.read(C1_SIZE))
+        c3 = src.read(C3_SIZE) if mode == MODE_C1C3C2 else None
+        keystream = KDFStream(x2 + y2)
+        h = SM3(x2)
+        tail = b""
+        total = 0
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            if mode == MODE_C1C2C3:
+                # C3 在末尾：始终扣留最后 32 字节
+                chunk = tail + chunk
+                tail = chunk[-C3_SIZE:]
+                chunk = chunk[:-C3_SIZE]
+            msg = _xor(chunk, keystream.read(len(chunk)))
+            h.update(msg)
+            dst.write(msg)
+            total += len(msg)
+        if mode == MODE_C1C2C3:
+            c3 = tail
+        h.update(y2)
+        if c3 is None or len(c3) != C3_SIZE or not hmac.compare_digest(h.digest(), c3):
+            raise ValueError("SM2 解密失败：C3 校验不通过")
+        return total
+
+
+def sm2_encrypt(public_key: ECPoint, msg: bytes, mode: str = MODE_C1C3C2) -> bytes:
+    return EncryptionKey(public_key).encrypt(msg, mode)
+
+
+def sm2_decrypt(private_key, ciphertext: bytes, mode: str = MODE_C1C3C2) -> bytes:
+    return DecryptionKey(private_key).decrypt(ciphertext, mode)
+
+
+# ========== 测试与性能 ==========
+def encryption_self_test():
+    sk = SigningKey.generate()
+    ek, dk = EncryptionKey(sk.public_key), DecryptionKey(int(sk.d))
+    for mode in (MODE_C1C3C2, MODE_C1C2C3):
+        for size in (0, 1, 31, 32, 33, 1000):
+            msg = os.urandom(size)
+            ct = ek.encrypt(msg, mode)
+            assert len(ct) == C1_SIZE + C3_SIZE + size and dk.decrypt(ct, mode) == msg, "加解密结果错误"
+            assert sm2_decrypt(int(sk.d), sm2_encrypt(sk.public_key, msg, mode), mode) == msg
+        tampered = bytearray(ek.encrypt(b"secret message", mode))
+        tampered[-1] ^= 1
+        try:
+            dk.decrypt(bytes(tampered), mode)
+            raise AssertionError("篡改的密文未被发现")
+        except ValueError:
+            pass
+
+        msgs = [os.urandom(n % 70) for n in range(40)]
+        for fast in (False, True):
+            for msg, ct in zip(msgs, ek.encrypt_many(msgs, mode, fast=fast)):
+                assert dk.decrypt(ct, mode) == msg, "批量加密结果错误"
+
+        msg = os.urandom(100000)
+        enc, dec = io.BytesIO(), io.BytesIO()
+        ek.encrypt_stream(io.BytesIO(msg), enc, mode, chunk_size=4099)
+        assert dk.decrypt(enc.getvalue(), mode) == msg, "流式加密结果错误"
+        dk.decrypt_stream(io.BytesIO(enc.getvalue()), dec, mode, chunk_size=10)
+        assert dec.getvalue() == msg, "流式解密结果错误"
+    print("SM2 加解密测试通过 ✅")
+
+
+def encryption_performance_test(rounds: int = 200):
+    sk = SigningKey.generate()
+    ek, dk = EncryptionKey(sk.public_key), DecryptionKey(int(sk.d))
+    msgs = [os.urandom(32) for _ in range(rounds)]
+
+    start = time.perf_counter()
+    cts = [ek.encrypt(m) for m in msgs]
+    single = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = ek.encrypt_many(msgs)
+    batched = time.perf_counter() - start
+    start = time.perf_counter()
+    batch += ek.encrypt_many(msgs, fast=True)
+    fast = time.perf_counter() - start
+    start = time.perf_counter()
+    for ct in cts + batch:
+        dk.decrypt(ct)
+    dec = (time.perf_counter() - start) / (3 * rounds)
+    print(f"逐条加密{rounds}次: 平均 {single*1e3/rounds:.3f}毫秒")
+    print(f"批量加密{rounds}次: 平均 {batched*1e3/rounds:.3f}毫秒, 加速比: {single/batched:.2f}x")
+    print(f"批量加密{rounds}次 (fast, 查表): 平均 {fast*1e3/rounds:.3f}毫秒, 加速比: {single/fast:.2f}x")
+    print(f"解密: 平均 {dec*1e3:.3f}毫秒")
+
+    size = 1 << 20
+    src, dst = io.BytesIO(os.urandom(size)), io.BytesIO()
+    start = time.perf_counter()
+    ek.encrypt_stream(src, dst)
+    elapsed = time.perf_counter() - start
+    print(f"流式加密 {size >> 20}MB: {elapsed:.2f}秒, {size/elapsed/1e6:.2f} MB/s")
+
+
+if __name__ == "__main__":
+    encryption_self_test()
+    encryption_performance_test()
@@ -0,0 +1,79 @@
+import random
+import time
+
+import sm2_backend
+
+sm2_backend.load()
+from sm2_backend import mpz, invert, powmod  # noqa: E402
+
+# === SM2 素域 ===
+# P = 2^256 - 2^224 - 2^96 + 2^64 - 1 是广义梅森素数（Solinas 素数）
+P = mpz(0xFFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF00000000FFFFFFFFFFFFFFFF)
+_SQRT_EXP = (P + 1) // 4  # P ≡ 3 (mod 4)
+
+
+# ========== 基本运算 ==========
+# 点运算热路径直接内联 a * b % P：经函数封装的乘法/平方实测使倍点慢约 30%，因此这里只保留求逆与开平方
+def finv(a):
+    return invert(a, P)
+
+
+def batch_inv(values, p=P):
+    # Montgomery 批量求逆：n 个元素只需 1 次求逆 + 3(n-1) 次乘法，元素不能为 0；p 可换成其他曲线的模数
+    prefix = []
+    acc = mpz(1)
+    for v in values:
+        prefix.append(acc)
+        acc = acc * v % p
+    inv = finv(acc) if p == P else invert(acc, p)
+    result = [None] * len(prefix)
+    for i in range(len(prefix) - 1, -1, -1):
+        result[i] = inv * prefix[i] % p
+        inv = inv * values[i] % p
+    return result
+
+
+def fsqrt(a):
+    # P ≡ 3 (mod 4)：sqrt(a) = a^((P+1)/4)，a 不是二次剩余时返回 None
+    a = mpz(a) % P
+    r = powmod(a, _SQRT_EXP, P)
+    return r if r * r % P == a else None
+
+
+# ========== 性能测试 ==========
+def _time_op(func, args, rounds):
+    start = time.perf_counter()
+    for a in args:
+        func(a)
+    return (time.perf_counter() - start) * 1e9 / rounds
+
+
+def field_benchmark(rounds: int = 20000):
+    p = int(P)
+    xs = [random.randrange(1, p) for _ in range(rounds)]
+    ys = [random.randrange(1, p) for _ in range(rounds)]
+    mx = [mpz(x) for x in xs]
+    my = [mpz(y) for y in ys]
+    products = [x * y for x, y in zip(mx, my)]
+
+    rows = [
+        ("乘法+约减 (int %)", lambda i: xs[i] * ys[i] % p),
+        (f"乘法+约减 ({sm2_backend.name} %)", lambda i: mx[i] * my[i] % P),
+        (f"约减 ({sm2_backend.name} %)", lambda i: products[i] % P),
+        ("求逆 (int pow(a, -1, p))", lambda i: pow(xs[i], -1, p)),
+        (f"求逆 ({sm2_backend.name})", lambda i: finv(mx[i])),
+        ("平方根 (powmod)", lambda i: fsqrt(mx[i])),
+    ]
+    print(f"{'运算':<28}{'平均耗时(纳秒)':>14}")
+    for name, func in rows:
+        print(f"{name:<28}{_time_op(func, range(rounds), rounds):>14.1f}")
+
+    start = time.perf_counter()
+    invs = batch_inv(mx)
+    batch_ns = (time.perf_counter() - start) * 1e9 / rounds
+    assert invs[0] * mx[0] % P == 1, "批量求逆结果错误"
+    print(f"{'求逆 (Montgomery 批量, 均摊)':<28}{batch_ns:>14.1f}")
+
+
+if __name__ == "__main__":
+    field_benchmark()
@@ -0,0 +1,154 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sm2_acc import DEFAULT_USER_ID, SigningKey, generate_keypair, get_base_table, install_base_table
+from sm2_batch import sm2_verify_batch
+from sm2_codec import decode_points, encode_point
+from sm2_tables import load_table
+
+
+# ========== 工作进程状态 ==========
+# 预计算表只在进程池启动时通过 initializer 传给每个工作进程一次，任务本身只携带消息与签名
+_signing_keys = []
+_verifying_keys = {}
+
+
+def _init_worker(base_table, signing_keys, verifying_keys):
+    global _signing_keys, _verifying_keys
+    install_base_table(base_table)
+    _signing_keys = signing_keys
+    _verifying_keys = {(int(vk.public_key.x), int(vk.public_key.y)): vk for vk in verifying_keys}
+
+
+def _sign_chunk(chunk):
+    out = []
+    for item in chunk:
+        key_id, msg = item[:2]
+        user_id = item[2] if len(item) > 2 else DEFAULT_USER_ID
+        out.append(_signing_keys[key_id].sign(msg, user_id))
+    return out
+
+
+def _verify_chunk(chunk):
+    results = [None] * len(chunk)
+    rest, rest_idx = [], []
+    for i, item in enumerate(chunk):
+        public_key = item[0]
+        vk = _verifying_keys.get((int(public_key.x), int(public_key.y)))
+        if vk is not None:
+            user_id = item[3] if len(item) > 3 else DEFAULT_USER_ID
+            results[i] = vk.verify(item[1], item[2], user_id)
+        else:
+            rest.append(item)
+            rest_idx.append(i)
+    for i, ok in zip(rest_idx, sm2_verify_batch(rest)):
+        results[i] = ok
+    return results
+
+
+def _keygen_chunk(count):
+    return [generate_keypair() for _ in range(count)]
+
+
+def _decode_chunk(chunk):
+    return decode_points(chunk, strict=False)
+
+
+# ========== 多进程执行器 ==========
+class SM2Executor:
+    # 基于进程池的批量签名/验签/密钥生成，任务按 chunk_size 分块，结果保持输入顺序。
+    # signing_keys 为 SigningKey 列表，签名任务以 (下标, msg[, user_id]) 引用；
+    # verifying_keys 中带固定窗口表的热点公钥在工作进程内直接使用。
+    # 给出 table_path（sm2_tables.save_table 生成的基点表文件）时，各工作进程只读映射同一文件，
+    # 传给子进程的只是路径，页缓存由所有进程共享。
+    def __init__(self, workers=None, signing_keys=(), verifying_keys=(), chunk_size: int = 64, table_path=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        base_table = load_table(table_path) if table_path else get_base_table()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(base_table, list(signing_keys), list(verifying_keys)),
+        )
+
+    def _chunks(self, items):
+        items = list(items)
+        return [items[i : i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+
+    def sign_many(self, items):
+        return [sig for chunk in self._pool.map(_sign_chunk, self._chunks(items)) for sig in chunk]
+
+    def verify_many(self, items):
+        return [ok for chunk in self._pool.map(_verify_chunk, self._chunks(items)) for ok in chunk]
+
+    def generate_keypairs(self, count: int):
+        sizes = [min(self.chunk_size, count - i) for i in range(0, count, self.chunk_size)]
+        return [pair for chunk in self._pool.map(_keygen_chunk, sizes) for pair in chunk]
+
+    def decode_points(self, items, strict: bool = True):
+        # 压缩公钥解码的开销几乎全在开平方求幂上，按块分给各工作进程；
+        # 单个任务很轻，块取 chunk_size 的 16 倍以摊薄进程间传输
+        items = [bytes(d) for d in items]
+        size = self.chunk_size * 16
+        chunks = [items[i : i + size] for i in range(0, len(items), size)]
+        points = [pt for chunk in self._pool.map(_decode_chunk, chunks) for pt in chunk]
+        if strict:
+            for i, pt in enumerate(points):
+                if pt is None:
+                    raise ValueError(f"第 {i} 个点编码非法")
+        return points
+
+    def shutdown(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+# ========== 性能测试 ==========
+def scaling_test(count: int = 2000, keys: int = 4):
+    signing_keys = [SigningKey.generate() for _ in range(keys)]
+    verifying_keys = [sk.verifying_key(window=4) for sk in signing_keys]
+    msgs = [random.randbytes(random.randint(10, 100)) for _ in range(count)]
+    sign_items = [(i % keys, msg) for i, msg in enumerate(msgs)]
+    encoded = [encode_point(generate_keypair()[1]) for _ in range(200)] * (count * 5 // 200)
+
+    print(f"CPU 核数: {os.cpu_count()}")
+    baseline = None
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        with SM2Executor(workers, signing_keys, verifying_keys) as ex:
+            ex.generate_keypairs(workers)  # 预热：启动所有工作进程
+            start = time.perf_counter()
+            sigs = ex.sign_many(sign_items)
+            sign_time = time.perf_counter() - start
+            verify_items = [(verifying_keys[i % keys].public_key, msg, sig) for i, (msg, sig) in enumerate(zip(msgs, sigs))]
+            start = time.perf_counter()
+            results = ex.verify_many(verify_items)
+            verify_time = time.perf_counter() - start
+            start = time.perf_counter()
+            ex.generate_keypairs(count)
+            keygen_time = time.perf_counter() - start
+            start = time.perf_counter()
+            points = ex.decode_points(encoded)
+            decode_time = time.perf_counter() - start
+        assert all(results), "多进程验签失败"
+        assert points == decode_points(encoded[:200]) * (len(encoded) // 200), "多进程公钥解码结果错误"
+        ops = (count / sign_time, count / verify_time, count / keygen_time, len(encoded) / decode_time)
+        baseline = baseline or ops
+        print(
+            f"进程数 {workers:>2}: 签名 {ops[0]:8.0f} 次/秒 ({ops[0]/baseline[0]:.2f}x), "
+            f"验签 {ops[1]:8.0f} 次/秒 ({ops[1]/baseline[1]:.2f}x), "
+            f"密钥生成 {ops[2]:8.0f} 次/秒 ({ops[2]/baseline[2]:.2f}x), "
+            f"公钥解码 {ops[3]:8.0f} 个/秒 ({ops[3]/baseline[3]:.2f}x)"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    scaling_test()
@@ -0,0 +1,184 @@
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+
+from sm2_acc import SigningKey, fresh_nonce, sm2_verify
+
+
+# ========== 随机数预计算池 ==========
+class NoncePool:
+    # 后台线程预先计算与消息无关的 (k, x1 = (k*G).x)，签名时只剩几次模运算。
+    # 水位控制：池深度低于 low_water 时唤醒后台线程，补充到 high_water 后休眠。
+    # 每个 (k, x1) 出队后即被丢弃，绝不会被第二次使用。
+    # fork 出的子进程（如 fork 方式启动的进程池工作进程）会继承父进程的队列，
+    # 因此在子进程中清空队列并停止补充，子进程只用自己新算的随机数。
+    def __init__(self, low_water: int = 64, high_water: int = 256):
+        if not 0 <= low_water < high_water:
+            raise ValueError("需满足 0 <= low_water < high_water")
+        self.low_water = low_water
+        self.high_water = high_water
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.produced = 0
+        self.taken = 0
+        self.empty = 0
+        _pools.add(self)
+
+    def _after_fork(self):
+        # 父进程中的锁可能在 fork 时被其他线程持有，补充线程也不会被复制，全部重建
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.produced = self.taken = self.empty = 0
+
+    def start(self, prefill: bool = False):
+        while prefill:
+            pair = fresh_nonce()
+            with self._cond:
+                if len(self._items) >= self.high_water:
+                    break
+                self._items.append(pair)
+                self.produced += 1
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._fill, name="sm2-nonce-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _fill(self):
+        while True:
+            with self._cond:
+                while self._running and len(self._items) >= self.low_water:
+                    self._cond.wait()
+                if not self._running:
+                    return
+            while self._running and len(self._items) < self.high_water:
+                pair = fresh_nonce()
+                with self._cond:
+                    self._items.append(pair)
+                    self.produced += 1
+
+    def take(self):
+        # 出队一个 (k, x1)；池为空时在调用线程内现算
+        with self._cond:
+            if self._items:
+                pair = self._items.popleft()
+                self.taken += 1
+            else:
+                pair = None
+                self.empty += 1
+            if len(self._items) < self.low_water:
+                self._cond.notify()
+        return pair if pair is not None else fresh_nonce()
+
+    def __call__(self):
+        return self.take()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> dict:
+        with self._cond:
+            requests = self.taken + self.empty
+            return {
+                "depth": len(self._items),
+                "produced": self.produced,
+                "taken": self.taken,
+                "empty": self.empty,
+                "empty_rate": self.empty / requests if requests else 0.0,
+            }
+
+
+_pools = weakref.WeakSet()
+
+
+def _reset_pools_after_fork():
+    for pool in list(_pools):
+        pool._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+# ========== 测试与性能 ==========
+def pool_self_test():
+    pool = NoncePool(low_water=1, high_water=8)
+    pool.start(prefill=True)
+    assert pool.stats()["depth"] == 8
+    inherited = {k for k, _ in pool._items}
+    if hasattr(os, "fork"):
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                k, _ = pool.take()
+                ok = pool.stats()["depth"] == 0 and k not in inherited
+                os.write(w, b"1" if ok else b"0")
+            finally:
+                os._exit(0)
+        os.close(w)
+        ok = os.read(r, 1) == b"1"
+        os.close(r)
+        os.waitpid(pid, 0)
+        assert ok, "子进程复用了父进程预计算的随机数"
+    k, _ = pool.take()
+    assert k in inherited and pool.stats()["taken"] == 1
+    pool.stop()
+    print("随机数预计算池测试通过 ✅")
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return {p: samples[min(len(samples) - 1, int(len(samples) * p / 100))] * 1000 for p in (50, 99)}
+
+
+def pool_performance_test(rounds: int = 500):
+    sk = SigningKey.generate()
+    msgs = [random.randbytes(random.randint(10, 100)) for _ in range(rounds)]
+
+    inline = []
+    for msg in msgs:
+        start = time.perf_counter()
+        sk.sign(msg)
+        inline.append(time.perf_counter() - start)
+
+    # 受 GIL 影响，后台补充与签名同时进行会抬高尾延迟；实际部署中补充发生在请求间隙，
+    # 这里预填充足够的随机数，只测签名路径本身
+    pool = NoncePool(low_water=1, high_water=rounds + 1)
+    pool.start(prefill=True)
+    pooled, sigs = [], []
+    for msg in msgs:
+        start = time.perf_counter()
+        sigs.append(sk.sign(msg, nonce_source=pool))
+        pooled.append(time.perf_counter() - start)
+    pool.stop()
+
+    assert all(sm2_verify(sk.public_key, msg, sig) for msg, sig in zip(msgs, sigs)), "预计算池签名验签失败"
+    a, b = _percentiles(inline), _percentiles(pooled)
+    print(f"现算随机数签名: p50 {a[50]:.4f}毫秒, p99 {a[99]:.4f}毫秒")
+    print(f"预计算池签名:   p50 {b[50]:.4f}毫秒, p99 {b[99]:.4f}毫秒")
+    print(f"池统计: {pool.stats()}")
+
+
+if __name__ == "__main__":
+    pool_self_test()
+    pool_performance_test()
@@ -0,0 +1,282 @@
+import asyncio
+import struct
+
+from sm2_acc import DEFAULT_USER_ID, ECPoint, SigningKey
+from sm2_batch import sm2_verify_batch
+
+# ========== 二进制帧格式 ==========
+# 帧: 4 字节长度(大端) || 负载
+# 请求负载: op(1) || req_id(4) || 操作数据
+#   OP_SIGN:   key_id(2) || uid_len(1) || user_id || msg
+#   OP_VERIFY: Px(32) || Py(32) || r(32) || s(32) || uid_len(1) || user_id || msg
+# 响应负载: op(1) || status(1) || req_id(4) || 结果
+#   OP_SIGN:   r(32) || s(32)；OP_VERIFY: 1 字节验签结果；status != 0 时结果为错误信息
+OP_SIGN = 1
+OP_VERIFY = 2
+STATUS_OK = 0
+STATUS_ERROR = 1
+MAX_FRAME = 16 * 1024 * 1024
+
+_HEADER = struct.Struct(">BI")
+_RESPONSE = struct.Struct(">BBI")
+
+
+def encode_frame(payload: bytes) -> bytes:
+    return struct.pack(">I", len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader):
+    # 连接关闭时返回 None
+    try:
+        header = await reader.readexactly(4)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = struct.unpack(">I", header)
+    if length > MAX_FRAME:
+        raise ValueError("帧长度超过上限")
+    return await reader.readexactly(length)
+
+
+def encode_sign_request(req_id: int, key_id: int, msg: bytes, user_id: bytes = DEFAULT_USER_ID) -> bytes:
+    return encode_frame(_HEADER.pack(OP_SIGN, req_id) + struct.pack(">HB", key_id, len(user_id)) + user_id + msg)
+
+
+def encode_verify_request(req_id: int, public_key: ECPoint, msg: bytes, signature, user_id: bytes = DEFAULT_USER_ID) -> bytes:
+    r, s = signature
+    body = b"".join(int(v).to_bytes(32, "big") for v in (public_key.x, public_key.y, r, s))
+    return encode_frame(_HEADER.pack(OP_VERIFY, req_id) + body + bytes([len(user_id)]) + user_id + msg)
+
+
+def decode_request(payload: bytes):
+    # 长度字段与负载不符时报错，不能按截断后的 user_id / msg 继续签名或验签
+    op, req_id = _HEADER.unpack_from(payload)
+    pos = _HEADER.size
+    if op == OP_SIGN:
+        key_id, uid_len = struct.unpack_from(">HB", payload, pos)
+        pos += 3
+        if pos + uid_len > len(payload):
+            raise ValueError("user_id 长度超出负载")
+        return op, req_id, (key_id, payload[pos + uid_len :], payload[pos : pos + uid_len])
+    if op == OP_VERIFY:
+        if len(payload) < pos + 129:
+            raise ValueError("验签请求长度不足")
+        x, y, r, s = (int.from_bytes(payload[pos + 32 * i : pos + 32 * (i + 1)], "big") for i in range(4))
+        pos += 128
+        uid_len = payload[pos]
+        pos += 1
+        if pos + uid_len > len(payload):
+            raise ValueError("user_id 长度超出负载")
+        return op, req_id, (ECPoint(x, y), payload[pos + uid_len :], (r, s), payload[pos : pos + uid_len])
+    raise ValueError(f"未知操作码: {op}")
+
+
+def encode_response(op: int, req_id: int, result) -> bytes:
+    if isinstance(result, Exception):
+        return encode_frame(_RESPONSE.pack(op, STATUS_ERROR, req_id) + str(result).encode())
+    if op == OP_SIGN:
+        body = result[0].to_bytes(32, "big") + result[1].to_bytes(32, "big")
+    else:
+        body = b"\x01" if result else b"\x00"
+    return encode_frame(_RESPONSE.pack(op, STATUS_OK, req_id) + body)
+
+
+def decode_response(payload: bytes):
+    op, status, req_id = _RESPONSE.unpack_from(payload)
+    body = payload[_RESPONSE.size :]
+    if status != STATUS_OK:
+        return op, req_id, RuntimeError(body.decode(errors="replace"))
+    if op == OP_SIGN:
+        return op, req_id, (int.from_bytes(body[:32], "big"), int.from_bytes(body[32:64], "big"))
+    return op, req_id, body == b"\x01"
+
+
+# ========== 微批处理服务 ==========
+class SM2Server:
+    # 并发请求先进入有界队列，批处理协程在 max_batch 条或 max_wait 秒内凑成一批，
+    # 签名与验签分别整批交给线程池（或 SM2Executor 进程池）执行。
+    # 同时执行的批次数受 max_inflight 限制；执行跟不上时队列逐渐填满，
+    # 读协程阻塞在 put 上、停止读取套接字，由此向客户端施加背压。
+    def __init__(
+        self, signing_keys, max_batch: int = 64, max_wait: float = 0.002, max_pending: int = 1024, max_inflight: int = 2, executor=None
+    ):
+        self.signing_keys = list(signing_keys)
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.max_inflight = max_inflight
+        self.executor = executor
+        self.batches = 0
+        self.requests = 0
+        self._queue = None
+        self._inflight = None
+        self._server = None
+        self._batcher = None
+        self._dispatches = set()
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0):
+        self._start_batcher()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()
+
+    async def start_unix(self, path: str):
+        self._start_batcher()
+        self._server = await asyncio.start_unix_server(self._handle, path)
+        return path
+
+    def _start_batcher(self):
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        # 等已发出的批次执行完，再让仍在队列中、尚未成批的请求以错误结束
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+        while self._queue is not None and not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(ConnectionError("服务已关闭"))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        pending = set()
+        try:
+            while True:
+                payload = await read_frame(reader)
+                if payload is None:
+                    break
+                # 先取出 op 与 req_id，负载解析失败时错误响应仍能被客户端按 req_id 匹配
+                if len(payload) >= _HEADER.size:
+                    op, req_id = _HEADER.unpack_from(payload)
+                else:
+                    op, req_id = payload[0] if payload else 0, 0
+                try:
+                    _, _, args = decode_request(payload)
+                except (ValueError, struct.error, IndexError) as exc:
+                    writer.write(encode_response(op, req_id, exc))
+                    continue
+                future = loop.create_future()
+                await self._queue.put((op, args, future))
+                task = loop.create_task(self._respond(writer, op, req_id, future))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            # 连接异常断开时取消尚未写回的响应，避免任务向已关闭的 writer 写入
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, op: int, req_id: int, future):
+        try:
+            result = await future
+        except Exception as exc:
+            result = exc
+        writer.write(encode_response(op, req_id, result))
+        await writer.drain()
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._inflight.acquire()
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # close() 时已出队但尚未成批的请求同样以错误结束
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(ConnectionError("服务已关闭"))
+                raise
+            self.batches += 1
+            self.requests += len(batch)
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch):
+        try:
+            await self._execute(batch)
+        finally:
+            self._inflight.release()
+
+    async def _execute(self, batch):
+        loop = asyncio.get_running_loop()
+        signs = [(args, fut) for op, args, fut in batch if op == OP_SIGN]
+        verifies = [(args, fut) for op, args, fut in batch if op == OP_VERIFY]
+        jobs = []
+        if signs:
+            jobs.append((loop.run_in_executor(None, self._sign_batch, [args for args, _ in signs]), signs))
+        if verifies:
+            jobs.append((loop.run_in_executor(None, self._verify_batch, [args for args, _ in verifies]), verifies))
+        for job, entries in jobs:
+            try:
+                results = await job
+            except Exception as exc:
+                results = [exc] * len(entries)
+            for (_, fut), result in zip(entries, results):
+                if fut.done():
+                    continue
+                if isinstance(result, Exception):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
+
+    def _sign_batch(self, items):
+        results = []
+        for key_id, msg, user_id in items:
+            if key_id >= len(self.signing_keys):
+                results.append(ValueError(f"未知密钥编号: {key_id}"))
+            elif self.executor is None:
+                results.append(self.signing_keys[key_id].sign(msg, user_id))
+            else:
+                results.append(None)
+        if self.executor is not None:
+            # 进程池需以同一组 signing_keys 创建，任务按密钥编号引用
+            idx = [i for i, r in enumerate(results) if r is None]
+            sigs = self.executor.sign_many([items[i] for i in idx])
+            for i, sig in zip(idx, sigs):
+                results[i] = sig
+        return results
+
+    def _verify_batch(self, items):
+        if self.executor is not None:
+            return self.executor.verify_many(items)
+        return sm2_verify_batch(items)
+
+
+async def serve(port: int = 9555, keys: int = 4):
+    signing_keys = [SigningKey.generate() for _ in range(keys)]
+    server = SM2Server(signing_keys)
+    host, port = await server.start_tcp("127.0.0.1", port)
+    print(f"SM2 服务监听 {host}:{port}，签名密钥 {keys} 个")
+    for i, sk in enumerate(signing_keys):
+        print(f"  密钥 {i} 公钥: {int(sk.public_key.x):064x}{int(sk.public_key.y):064x}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -0,0 +1,496 @@
+import cProfile
+import functools
+import io
+import os
+import pstats
+import random
+import sys
+import tempfile
+import time
+import types
+from collections import Counter
+from contextlib import contextmanager
+
+import sm2_acc
+import sm2_field
+import sm3
+from sm2_acc import N, P, ECPoint, FixedBaseTable, JacobianPoint, SigningKey, VerifyingKey, wnaf
+from sm2_tables import MappedTable, load_table, save_table
+
+try:
+    import pyinstrument
+except ImportError:  # pyinstrument 为可选依赖，仅 profile(..., backend="pyinstrument") 需要
+    pyinstrument = None
+
+# ========== 运算计数（按需开启） ==========
+# 关闭时热路径上的函数与方法保持原样，没有任何额外开销；enable() 把它们替换为计数包装，disable() 还原。
+# 点运算公式内部的域乘法不逐次计数，而是按公式的固定代价累加（M = 乘法，S = 平方）：
+#   a = -3 倍点 3M + 5S，一般点加 12M + 4S，混合点加 8M + 3S，
+#   co-Z 阶梯初始化 6M + 4S、每位一次 XYCZ-ADDC + XYCZ-ADD 共 11M + 5S。
+# 求逆按模数区分：模 P 记为 field_inv，模 N（签名中的 (1+d)^-1）记为 scalar_inv。
+# 包装会同时替换本项目其他已加载模块里按名字导入的同一函数对象（如 from sm2_acc import batch_to_affine）；
+# 计数器不加锁，多线程并发时数值只作参考。
+OPS = (
+    "field_mul",
+    "field_sqr",
+    "field_inv",
+    "scalar_inv",
+    "point_add",
+    "point_double",
+    "sm3_compress",
+    "table_hit",
+)
+
+_DOUBLE = Counter(point_double=1, field_mul=3, field_sqr=5)
+_ADD = Counter(point_add=1, field_mul=12, field_sqr=4)
+_ADD_AFFINE = Counter(point_add=1, field_mul=8, field_sqr=3)
+_AFFINE_ADD = Counter(point_add=1, field_mul=2, field_sqr=1)
+_AFFINE_DOUBLE = Counter(point_double=1, field_mul=2, field_sqr=2)
+_TO_AFFINE = Counter(field_mul=3, field_sqr=1, field_inv=1)
+_LADDER = Counter(point_double=1, point_add=512, field_mul=6 + 256 * 11, field_sqr=4 + 256 * 5)
+
+# 统计入口：按调用次数汇总每次调用的运算量（含嵌套调用）
+ENTRY_POINTS = ("generate_keypair", "sm2_sign", "sm2_verify", "base_mul", "secret_mul", "double_base_mul")
+ENTRY_METHODS = ((SigningKey, "sign"), (VerifyingKey, "verify"))
+
+_totals = Counter()
+_calls = {}
+_patched = []
+
+
+# ---------- 计数包装 ----------
+def _bump(cost):
+    # 比 Counter.update 少一层通用映射处理，开启计数时的额外开销约减半
+    for op, n in cost.items():
+        _totals[op] += n
+
+
+def _wrap_double(orig):
+    def double(self):
+        if self.Z and self.Y:
+            _bump(_DOUBLE)
+        return orig(self)
+
+    return double
+
+
+def _wrap_add(orig):
+    # H == 0 时公式内部转去倍点，倍点另行计数，此处仍按完整点加计
+    def add(self, other):
+        if self.Z and other.Z:
+            _bump(_ADD)
+        return orig(self, other)
+
+    return add
+
+
+def _wrap_add_affine(orig):
+    def add_affine(self, other):
+        if self.Z and (other.x or other.y):
+            _bump(_ADD_AFFINE)
+        return orig(self, other)
+
+    return add_affine
+
+
+def _wrap_affine_add(orig):
+    def __add__(self, other):
+        if (self.x or self.y) and (other.x or other.y):
+            if self.x != other.x:
+                _bump(_AFFINE_ADD)
+            elif (self.y + other.y) % P:
+                _bump(_AFFINE_DOUBLE)
+        return orig(self, other)
+
+    return __add__
+
+
+def _wrap_to_affine(orig):
+    def to_affine(self):
+        if self.Z:
+            _bump(_TO_AFFINE)
+        return orig(self)
+
+    return to_affine
+
+
+def _wrap_table_mul(orig):
+    # 每个非零窗口查一次预计算表
+    def mul_jacobian(self, scalar):
+        k, w, mask, hits = int(scalar) % N, self.window, self.mask, 0
+        while k:
+            if k & mask:
+                hits += 1
+            k >>= w
+        _totals["table_hit"] += hits
+        return orig(self, scalar)
+
+    return mul_jacobian
+
+
+def _wrap_multi_scalar_mul(orig):
+    # 每个非零 wNAF 位查一次奇数倍点表
+    def multi_scalar_mul(pairs, width: int = 5):
+        pairs = list(pairs)
+        for k, pt in pairs:
+            if pt.x or pt.y:
+                _totals["table_hit"] += sum(1 for d in wnaf(int(k) % N, width) if d)
+        return orig(pairs, width)
+
+    return multi_scalar_mul
+
+
+def _wrap_ladder(orig):
+    def ladder_mul_jacobian(scalar, pt):
+        _bump(_LADDER)
+        return orig(scalar, pt)
+
+    return ladder_mul_jacobian
+
+
+def _wrap_batch_to_affine(orig):
+    def batch_to_affine(points):
+        points = list(points)
+        n = sum(1 for pt in points if pt.Z)
+        _totals["field_mul"] += 3 * n
+        _totals["field_sqr"] += n
+        return orig(points)
+
+    return batch_to_affine
+
+
+def _wrap_batch_inv(orig):
+    # 前缀积 n 次乘法、回代 2n 次乘法，唯一的一次求逆由 finv 计数；其他曲线的模数（ec_curves）不计
+    def batch_inv(values, p=P):
+        values = list(values)
+        if p == P:
+            _totals["field_mul"] += 3 * len(values)
+        return orig(values, p)
+
+    return batch_inv
+
+
+def _wrap_finv(orig):
+    def finv(a):
+        _totals["field_inv"] += 1
+        return orig(a)
+
+    return finv
+
+
+def _wrap_mod_inv(orig):
+    def mod_inv(a, p):
+        _totals["field_inv" if p == P else "scalar_inv"] += 1
+        return orig(a, p)
+
+    return mod_inv
+
+
+def _wrap_compress(orig):
+    def compress(V, data, offset: int = 0):
+        _totals["sm3_compress"] += 1
+        return orig(V, data, offset)
+
+    return compress
+
+
+def _wrap_compress_lanes(orig):
+    # 多路并行 SM3：一次调用压缩 lanes 个分组
+    def compress_lanes(V, blocks):
+        _totals["sm3_compress"] += blocks.shape[-1]
+        return orig(V, blocks)
+
+    return compress_lanes
+
+
+def _wrap_entry(name, orig):
+    def entry(*args, **kwargs):
+        before = _totals.copy()
+        try:
+            return orig(*args, **kwargs)
+        finally:
+            record = _calls.setdefault(name, [0, Counter()])
+            record[0] += 1
+            record[1].update(_totals - before)
+
+    return entry
+
+
+_METHODS = (
+    (JacobianPoint, "double", _wrap_double),
+    (JacobianPoint, "add", _wrap_add),
+    (JacobianPoint, "add_affine", _wrap_add_affine),
+    (JacobianPoint, "to_affine", _wrap_to_affine),
+    (ECPoint, "__add__", _wrap_affine_add),
+    (FixedBaseTable, "mul_jacobian", _wrap_table_mul),
+    (MappedTable, "mul_jacobian", _wrap_table_mul),
+)
+
+_FUNCTIONS = (
+    ("sm2_acc", "multi_scalar_mul", _wrap_multi_scalar_mul),
+    ("sm2_acc", "ladder_mul_jacobian", _wrap_ladder),
+    ("sm2_acc", "batch_to_affine", _wrap_batch_to_affine),
+    ("sm2_acc", "mod_inv", _wrap_mod_inv),
+    ("sm2_field", "batch_inv", _wrap_batch_inv),
+    ("sm2_field", "finv", _wrap_finv),
+    ("sm3", "compress", _wrap_compress),
+    ("sm3_batch", "compress_lanes", _wrap_compress_lanes),
+)
+
+
+# 只改写本项目目录（Project 5 下各子目录）中的模块，第三方库与标准库保持原样
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _is_project_module(module) -> bool:
+    path = getattr(module, "__file__", None)
+    if not path:
+        return False
+    path = os.path.abspath(path)
+    return path.startswith(_PROJECT_DIR + os.sep) and "site-packages" not in path
+
+
+def _replace_everywhere(replacements):
+    # 在已加载的项目模块中把原函数对象替换为包装，记录位置以便还原
+    this = sys.modules[__name__]
+    for module in list(sys.modules.values()):
+        namespace = getattr(module, "__dict__", None)
+        if module is this or not isinstance(namespace, dict) or not _is_project_module(module):
+            continue
+        for name, value in list(namespace.items()):
+            wrapper = replacements.get(id(value))
+            if wrapper is not None and value is wrapper[0]:
+                setattr(module, name, wrapper[1])
+                _patched.append((module, name, value))
+
+
+def is_enabled() -> bool:
+    return bool(_patched)
+
+
+def enable():
+    if _patched:
+        return
+    for cls, name, make in _METHODS:
+        orig = cls.__dict__[name]
+        setattr(cls, name, functools.wraps(orig)(make(orig)))
+        _patched.append((cls, name, orig))
+    replacements = {}
+    for module_name, name, make in _FUNCTIONS:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            orig = getattr(module, name)
+            replacements[id(orig)] = (orig, functools.wraps(orig)(make(orig)))
+    _replace_everywhere(replacements)
+    # 统计入口最后包装，包住的是已替换为计数版本的函数
+    replacements = {}
+    for name in ENTRY_POINTS:
+        orig = getattr(sm2_acc, name)
+        replacements[id(orig)] = (orig, functools.wraps(orig)(_wrap_entry(name, orig)))
+    _replace_everywhere(replacements)
+    for cls, name in ENTRY_METHODS:
+        orig = cls.__dict__[name]
+        setattr(cls, name, functools.wraps(orig)(_wrap_entry(f"{cls.__name__}.{name}", orig)))
+        _patched.append((cls, name, orig))
+
+
+def disable():
+    # 按替换的逆序还原，同一位置被包装两次时最终回到最初的对象
+    while _patched:
+        owner, name, orig = _patched.pop()
+        setattr(owner, name, orig)
+
+
+def reset():
+    _totals.clear()
+    _calls.clear()
+
+
+def _as_dict(counts, scale: float = 1.0) -> dict:
+    return {op: counts[op] / scale if scale != 1.0 else counts[op] for op in OPS}
+
+
+def snapshot() -> dict:
+    # 自上次 reset 以来的累计运算量，以及各统计入口的调用次数与平均每次运算量
+    return {
+        "enabled": is_enabled(),
+        "totals": _as_dict(_totals),
+        "calls": {
+            name: {"calls": calls, "per_call": _as_dict(counts, calls)} for name, (calls, counts) in sorted(_calls.items())
+        },
+    }
+
+
+class OpCounts(Counter):
+    # counting() 产出的计数结果，退出 with 块后填入块内的运算量
+    def as_dict(self) -> dict:
+        return _as_dict(self)
+
+    def __str__(self):
+        return ", ".join(f"{op}={self[op]}" for op in OPS if self[op])
+
+
+@contextmanager
+def counting():
+    # with counting() as ops: ...  块内临时开启计数（已开启则沿用），ops 为块内运算量，可以嵌套
+    started = not is_enabled()
+    if started:
+        enable()
+    ops = OpCounts()
+    before = _totals.copy()
+    try:
+        yield ops
+    finally:
+        ops.update(_totals - before)
+        if started:
+            disable()
+
+
+def count_call(func, *args, **kwargs):
+    # 单次调用的运算量，返回 (结果, OpCounts)
+    with counting() as ops:
+        result = func(*args, **kwargs)
+    return result, ops
+
+
+def profile(func, *args, backend: str = "cProfile", limit: int = 15, **kwargs):
+    # 在剖析器下运行一次调用并同时计数，打印热点函数与运算量，返回调用结果
+    if backend == "pyinstrument":
+        if pyinstrument is None:
+            raise ImportError("未安装 pyinstrument")
+        profiler = pyinstrument.Profiler()
+        with counting() as ops:
+            profiler.start()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                profiler.stop()
+        print(profiler.output_text())
+    elif backend == "cProfile":
+        profiler = cProfile.Profile()
+        with counting() as ops:
+            result = profiler.runcall(func, *args, **kwargs)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+        print(out.getvalue())
+    else:
+        raise ValueError(f"未知的剖析后端: {backend}")
+    print(f"运算量: {ops}")
+    return result
+
+
+# ========== 测试与性能 ==========
+def stats_self_test():
+    originals = (JacobianPoint.double, sm2_acc.multi_scalar_mul, sm3.compress, sm2_field.finv, sm2_acc.sm2_verify)
+    J = JacobianPoint.from_affine(sm2_acc.G)
+
+    with counting() as ops:
+        J.double()
+    assert ops == _DOUBLE, f"倍点计数错误: {ops}"
+    with counting() as ops:
+        J.add(J.double()).to_affine()
+    assert ops == _DOUBLE + _ADD + _TO_AFFINE, f"点加计数错误: {ops}"
+
+    table = sm2_acc.get_base_table()
+    k = random.randint(1, int(N - 1))
+    digits = sum(1 for i in range(table.windows) if (k >> (table.window * i)) & table.mask)
+    pt, ops = count_call(sm2_acc.base_mul, k)
+    assert pt == sm2_acc.base_mul(k)
+    assert ops["table_hit"] == digits and ops["point_add"] == digits - 1 and ops["field_inv"] == 1, f"查表计数错误: {ops}"
+
+    # 映射表文件与内存表按同样方式计数
+    path = os.path.join(tempfile.gettempdir(), "sm2_stats_test.tbl")
+    save_table(table, path)
+    mapped = load_table(path)
+    with counting() as ops:
+        mapped.mul_jacobian(k)
+    mapped.close()
+    os.unlink(path)
+    assert ops["table_hit"] == digits and ops["point_add"] == digits - 1, f"映射表计数错误: {ops}"
+
+    with counting() as outer:
+        sk = SigningKey.generate()
+        sk.za()  # ZA 在首次签名时计算（4 次压缩），先行缓存
+        with counting() as inner:
+            sig = sk.sign(b"stats")
+        assert sm2_acc.sm2_verify(sk.public_key, b"stats", sig)
+    assert inner["sm3_compress"] == 1 and inner["point_add"] == 512 and inner["table_hit"] == 0, f"签名计数错误: {inner}"
+    assert outer["sm3_compress"] > inner["sm3_compress"] and outer["scalar_inv"] == 1 and outer["table_hit"] > 0, "嵌套计数错误"
+
+    # 项目外的模块（模拟第三方库）即使引用了同一函数也不被改写
+    outside = types.ModuleType("sm2_stats_outside")
+    outside.__file__ = os.path.join(os.path.dirname(_PROJECT_DIR), "site-packages", "outside.py")
+    outside.finv = sm2_field.finv
+    sys.modules[outside.__name__] = outside
+    reset()
+    enable()
+    for _ in range(3):
+        sm2_acc.sm2_verify(sk.public_key, b"stats", sig)
+    calls = snapshot()["calls"]
+    untouched = outside.finv is originals[3] and sm2_field.finv is not originals[3]
+    disable()
+    del sys.modules[outside.__name__]
+    assert untouched, "项目外的模块被改写"
+    assert calls["sm2_verify"]["calls"] == 3 and calls["double_base_mul"]["calls"] == 3
+    assert calls["sm2_verify"]["per_call"]["point_double"] > 200, "验签入口统计错误"
+
+    now = (JacobianPoint.double, sm2_acc.multi_scalar_mul, sm3.compress, sm2_field.finv, sm2_acc.sm2_verify)
+    assert all(a is b for a, b in zip(originals, now)) and not is_enabled(), "关闭后未还原原函数"
+    print("运算计数测试通过 ✅")
+
+
+def stats_performance_test(rounds: int = 200):
+    sk = SigningKey.generate()
+    vk = sk.verifying_key(window=4)
+    msgs = [random.randbytes(64) for _ in range(rounds)]
+    sigs = [sk.sign(m) for m in msgs]
+
+    def cost(func):
+        with counting() as ops:
+            for i in range(rounds):
+                func(i)
+        return {op: ops[op] / rounds for op in OPS}
+
+    def window_sign(i):
+        mode = sm2_acc.SECRET_MUL_MODE
+        sm2_acc.set_secret_mul_mode(sm2_acc.MUL_WINDOW)
+        try:
+            return sk.sign(msgs[i])
+        finally:
+            sm2_acc.set_secret_mul_mode(mode)
+
+    rows = [
+        ("SigningKey.sign (阶梯)", lambda i: sk.sign(msgs[i])),
+        ("SigningKey.sign (窗口)", window_sign),
+        ("sm2_verify (基点表+wNAF)", lambda i: sm2_acc.sm2_verify(sk.public_key, msgs[i], sigs[i])),
+        ("VerifyingKey.verify (w=4 公钥表)", lambda i: vk.verify(msgs[i], sigs[i])),
+        ("double_base_mul (交错wNAF)", lambda i: sm2_acc.double_base_mul(i + 1, N - i - 2, sk.public_key, use_table=False)),
+    ]
+    short = ("M", "S", "I", "I_n", "ADD", "DBL", "SM3", "表")
+    print(f"{'每次调用平均运算量':<34}" + "".join(f"{s:>8}" for s in short))
+    for name, func in rows:
+        counts = cost(func)
+        print(f"{name:<34}" + "".join(f"{counts[op]:>8.1f}" for op in OPS))
+
+    # 关闭时函数未被替换，开启计数后的额外耗时
+    def timed():
+        start = time.perf_counter()
+        for m, sig in zip(msgs, sigs):
+            sm2_acc.sm2_verify(sk.public_key, m, sig)
+        return (time.perf_counter() - start) * 1000 / rounds
+
+    plain = timed()
+    enable()
+    try:
+        counted = timed()
+    finally:
+        disable()
+    print(f"sm2_verify 平均每次: 关闭计数 {plain:.4f}毫秒, 开启计数 {counted:.4f}毫秒 (+{(counted / plain - 1) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    stats_self_test()
+    stats_performance_test()
+    if "--profile" in sys.argv:
+        key = SigningKey.generate()
+        profile(lambda: [sm2_acc.sm2_verify(key.public_key, b"profile", key.sign(b"profile")) for _ in range(50)])
@@ -0,0 +1,225 @@
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import time
+
+from sm2_acc import N, ONE, ZERO, ECPoint, JacobianPoint, FixedBaseTable, G
+
+# ========== 预计算表文件格式 ==========
+# 头部 128 字节：
+#   magic(8) || version(2) || window(1) || reserved(1) || windows(2) || reserved(2) || count(4) || reserved(12)
+#   || base_x(32) || base_y(32) || digest(32)
+# 数据：count 个点，每点 x(32) || y(32)，大端定长，按窗口 i、数字 j = 1..2^w-1 顺序排列。
+# digest = SHA-256(头部前 96 字节 || 数据)，用于加载时的完整性校验。
+MAGIC = b"SM2TBL\x00\x00"
+VERSION = 1
+HEADER_SIZE = 128
+POINT_SIZE = 64
+_HEAD = struct.Struct(">8sHBxHxxI12x")
+
+
+class TableFormatError(ValueError):
+    pass
+
+
+def _header(table_window: int, windows: int, count: int, base: ECPoint) -> bytes:
+    return _HEAD.pack(MAGIC, VERSION, table_window, windows, count) + int(base.x).to_bytes(32, "big") + int(base.y).to_bytes(32, "big")
+
+
+def save_table(table: FixedBaseTable, path: str):
+    # 先写临时文件再原子替换，避免其他进程读到写了一半的表
+    points = table.points()
+    body = b"".join(int(pt.x).to_bytes(32, "big") + int(pt.y).to_bytes(32, "big") for pt in points)
+    head = _header(table.window, table.windows, len(points), table.base)
+    digest = hashlib.sha256(head + body).digest()
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".sm2tbl-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(head + digest + body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory: str):
+    # 目录项也要落盘，掉电后 rename 才不会丢失；Windows 不能以只读方式打开目录，跳过
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class MappedTable:
+    # 以只读 mmap 映射的预计算表，接口与 FixedBaseTable 相同。
+    # 点在查表时才从映射内存解码，不复制整张表；同一文件被多个进程映射时共享页缓存。
+    def __init__(self, path: str, verify: bool = True):
+        with open(path, "rb") as f:
+            # 先检查长度：空文件无法映射，mmap 只会抛出笼统的 ValueError
+            if os.fstat(f.fileno()).st_size < HEADER_SIZE:
+                raise TableFormatError("文件过短")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mm)
+        try:
+            magic, version, window, windows, count = _HEAD.unpack_from(buf)
+            if magic != MAGIC:
+                raise TableFormatError("不是 SM2 预计算表文件")
+            if version != VERSION:
+                raise TableFormatError(f"不支持的表版本: {version}")
+            mask = (1 << window) - 1
+            if not 1 <= window <= 8 or windows != (int(N).bit_length() + window - 1) // window or count != windows * mask:
+                raise TableFormatError("窗口参数不一致")
+            if len(buf) != HEADER_SIZE + count * POINT_SIZE:
+                raise TableFormatError("文件长度与点数不符")
+            if verify:
+                h = hashlib.sha256(buf[:96])
+                h.update(buf[HEADER_SIZE:])
+                if h.digest() != bytes(buf[96:HEADER_SIZE]):
+                    raise TableFormatError("完整性校验失败")
+        except BaseException:
+            buf.release()
+            self._mm.close()
+            raise
+        self._buf = buf
+        self.path = path
+        self.digest = bytes(buf[96:HEADER_SIZE]) if verify else None  # 已校验过的摘要
+        self.window = window
+        self.windows = windows
+        self.mask = mask
+        self.base = ECPoint(int.from_bytes(buf[32:64], "big"), int.from_bytes(buf[64:96], "big"))
+
+    def point(self, index: int) -> ECPoint:
+        off = HEADER_SIZE + index * POINT_SIZE
+        buf = self._buf
+        return ECPoint(int.from_bytes(buf[off : off + 32], "big"), int.from_bytes(buf[off + 32 : off + 64], "big"))
+
+    def mul_jacobian(self, scalar) -> JacobianPoint:
+        k = int(scalar) % N
+        w, mask = self.window, self.mask
+        R = JacobianPoint(ONE, ONE, ZERO)
+        base = -1
+        while k:
+            digit = k & mask
+            if digit:
+                R = R.add_affine(self.point(base + digit))
+            k >>= w
+            base += mask
+        return R
+
+    def mul(self, scalar) -> ECPoint:
+        return self.mul_jacobian(scalar).to_affine()
+
+    def points(self):
+        return [self.point(i) for i in range(self.windows * self.mask)]
+
+    def materialize(self) -> FixedBaseTable:
+        # 解码为常驻内存的 FixedBaseTable，查表更快
+        return FixedBaseTable(self.base, self.window, self.points())
+
+    def close(self):
+        self._buf.release()
+        self._mm.close()
+
+    def __getstate__(self):
+        # 传给子进程时只传路径与父进程校验过的摘要，由子进程自行映射
+        return {"path": self.path, "digest": self.digest}
+
+    def __setstate__(self, state):
+        # 父进程校验过的表在子进程中重新完整校验，并要求摘要不变，
+        # 父进程加载之后被替换的表文件（即使本身合法）也会被拒绝
+        expected = state["digest"]
+        self.__init__(state["path"], verify=expected is not None)
+        if expected is not None and self.digest != expected:
+            self.close()
+            raise TableFormatError("表文件在父进程加载后被替换")
+
+
+def load_table(path: str, verify: bool = True, materialize: bool = False):
+    table = MappedTable(path, verify)
+    if materialize:
+        resident = table.materialize()
+        table.close()
+        return resident
+    return table
+
+
+# ========== 测试与性能 ==========
+def table_self_test():
+    path = os.path.join(tempfile.gettempdir(), "sm2_tables_test.tbl")
+    save_table(FixedBaseTable(G, 2), path)
+    table = load_table(path)
+    k = int.from_bytes(os.urandom(32), "big") % N
+    clone = pickle.loads(pickle.dumps(table))
+    assert clone.mul(k) == G.mul_affine(k), "子进程重新映射的表结果错误"
+    clone.close()
+
+    # 父进程加载后表文件被替换为另一张合法的表
+    save_table(FixedBaseTable(G.mul_affine(2), 2), path)
+    try:
+        pickle.loads(pickle.dumps(table))
+        raise AssertionError("被替换的表文件未被拒绝")
+    except TableFormatError:
+        pass
+    table.close()
+
+    with open(path, "r+b") as f:
+        f.seek(HEADER_SIZE)
+        f.write(b"\xff")
+    try:
+        load_table(path)
+        raise AssertionError("被篡改的表文件未被拒绝")
+    except TableFormatError:
+        pass
+
+    for size in (0, 10):
+        with open(path, "wb") as f:
+            f.write(MAGIC[:size])
+        try:
+            load_table(path)
+            raise AssertionError("过短的表文件未被拒绝")
+        except TableFormatError:
+            pass
+    os.unlink(path)
+    print("预计算表文件测试通过 ✅")
+
+
+def table_startup_test(window: int = 6, rounds: int = 200):
+    path = os.path.join(tempfile.gettempdir(), f"sm2_base_w{window}.tbl")
+    start = time.perf_counter()
+    built = FixedBaseTable(G, window)
+    build_time = time.perf_counter() - start
+    save_table(built, path)
+
+    start = time.perf_counter()
+    mapped = load_table(path)
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    resident = load_table(path, materialize=True)
+    materialize_time = time.perf_counter() - start
+
+    scalars = [int.from_bytes(os.urandom(32), "big") % N for _ in range(rounds)]
+    timings, outputs = [], []
+    for table in (built, mapped, resident):
+        start = time.perf_counter()
+        outputs.append([table.mul(k) for k in scalars])
+        timings.append((time.perf_counter() - start) * 1000 / rounds)
+    assert outputs[0] == outputs[1] == outputs[2], "映射表结果不一致"
+    print(f"表文件: {path} ({os.path.getsize(path)} 字节)")
+    print(f"现场建表: {build_time*1000:.2f}毫秒, mmap 加载(含校验): {load_time*1000:.2f}毫秒, 加载并解码: {materialize_time*1000:.2f}毫秒")
+    print(f"点乘平均每次: 内存表 {timings[0]:.4f}毫秒, mmap 表 {timings[1]:.4f}毫秒, 解码后 {timings[2]:.4f}毫秒")
+    mapped.close()
+
+
+if __name__ == "__main__":
+    table_self_test()
+    table_startup_test()
@@ -0,0 +1,538 @@
+import random
+import sys
+import time
+
+import sm2_acc
+from sm2_acc import DEFAULT_USER_ID, G, N, P, ECPoint, FixedBaseTable, JacobianPoint, calc_ZA, mpz
+from sm2_acc import MUL_WINDOW, base_mul, batch_to_affine, multi_scalar_mul, secret_mul, set_secret_mul_mode
+from sm2_acc import SigningKey, sm2_verify, x_matches
+from sm2_field import batch_inv
+from sm2_batch import sm2_verify_batch
+from sm3 import SM3
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时逐点调用 sm2_acc
+    np = None
+
+# ========== 多 limb 域元素（实验性） ==========
+# 一批域元素存为形状 (10, lanes) 的 int64 数组：第 i 行是各路的第 i 个 26 位 limb，
+# 值 = sum(limb_i * 2^(26i))，limb 允许为负或略超 26 位（惰性约减），只在输出时化为规范整数。
+# 元素以 Montgomery 形式 a*R mod P 存放，R = 2^286（11 个 limb）。
+# 乘法：10×10 个 limb 乘积按列累加（每项 < 2^56，列和 < 2^62），得到 21 行的乘积；
+# 约减：P ≡ -1 (mod 2^64)，逐 limb 约减时 m 就是当前 limb 的低 26 位，不需要乘 P'，
+# 而 m*P = m*(2^256 - 2^224 - 2^96 + 2^64 - 1) 按 P 的 Solinas 形式只是 4 次移位加减，
+# 11 轮后乘积除以 R，结果 < 2^257，正好落在 10 个 limb 内。
+LIMBS = 10
+LIMB_BITS = 26
+LIMB_MASK = (1 << LIMB_BITS) - 1
+MONT_R = 1 << (LIMB_BITS * (LIMBS + 1))
+MIN_LANES = 64  # 路数太少时数组运算的固定开销超过收益，直接逐点计算
+MAX_LANES = 4096  # 每次处理的最大路数，中间数组保持在缓存内
+INV_LEAVES = 32  # 批量求逆的乘积树缩到这个宽度后转为整数求逆
+BASE_WINDOW = 8  # 基点表窗口宽度：8 位时标量的每个字节就是一个窗口的下标
+_R_INV = pow(MONT_R, -1, int(P))
+_R2 = MONT_R * MONT_R % P
+
+
+def _limbs(values):
+    # 整数（0 <= v < 2^260）列表 -> (10, lanes) limb 数组，不做 Montgomery 变换
+    n = len(values)
+    words = np.frombuffer(b"".join(int(v).to_bytes(40, "little") for v in values), dtype="<u8").reshape(n, 5).T
+    a = np.empty((LIMBS, n), dtype=np.int64)
+    for i in range(LIMBS):
+        q, r = divmod(LIMB_BITS * i, 64)
+        x = words[q] >> r
+        if r + LIMB_BITS > 64:
+            x |= words[q + 1] << (64 - r)
+        a[i] = x & LIMB_MASK
+    return a
+
+
+def _ints(a) -> list:
+    # limb 数组 -> [0, P) 内的整数列表，不做 Montgomery 变换
+    vals = a[LIMBS - 1].astype(object)
+    for i in range(LIMBS - 2, -1, -1):
+        vals = (vals << LIMB_BITS) + a[i].astype(object)
+    return [mpz(v % P) for v in vals]
+
+
+def fe_from_ints(values):
+    return _limbs([v * MONT_R % P for v in values])
+
+
+def fe_to_ints(a) -> list:
+    return [v * _R_INV % P for v in _ints(a)]
+
+
+if np is not None:
+    _ONE = _limbs([MONT_R % P])
+
+
+def _conv(a, b):
+    t = np.zeros((2 * LIMBS + 1, a.shape[1]), dtype=np.int64)
+    for i in range(LIMBS):
+        t[i : i + LIMBS] += a[i] * b
+    return t
+
+
+def _conv_sqr(a):
+    # 平方：交叉项只算一半再乘 2，乘法次数 55 次
+    t = np.zeros((2 * LIMBS + 1, a.shape[1]), dtype=np.int64)
+    for i in range(LIMBS):
+        t[2 * i] += a[i] * a[i]
+        t[2 * i + 1 : i + LIMBS] += (a[i] << 1) * a[i + 1 :]
+    return t
+
+
+def _reduce(t):
+    # Montgomery 约减：t -> t / R (mod P)。t 的第 11~20 行权重为 R，
+    # 因此从乘积中减去 Montgomery 形式的 s（惰性合并）写作 t[LIMBS + 1:] -= s
+    for i in range(LIMBS + 1):
+        m = t[i] & LIMB_MASK
+        t[i + 1] += t[i] >> LIMB_BITS
+        t[i + 2] += m << 12
+        t[i + 3] -= m << 18
+        t[i + 8] -= m << 16
+        t[i + 9] += m << 22
+    x = t[LIMBS + 1 :]
+    for i in range(LIMBS - 1):
+        x[i + 1] += x[i] >> LIMB_BITS
+        x[i] &= LIMB_MASK
+    return x
+
+
+def fe_mul(a, b):
+    return _reduce(_conv(a, b))
+
+
+def fe_sqr(a):
+    return _reduce(_conv_sqr(a))
+
+
+def fe_batch_inv(a):
+    # 各路分别求逆（Montgomery 批量求逆的乘积树形式）：相邻两路两两相乘逐层减半，
+    # 剩下 INV_LEAVES 路转为整数批量求逆，再逐层向下 inv_left = inv * right、inv_right = inv * left。
+    # 每路约 3 次乘法；有一路为 0 时返回 None
+    levels = []
+    x = a
+    while x.shape[1] > INV_LEAVES:
+        if x.shape[1] & 1:
+            x = np.concatenate((x, _ONE), axis=1)
+        levels.append(x)
+        x = fe_mul(x[:, 0::2], x[:, 1::2])
+    vals = _ints(x)
+    if any(v == 0 for v in vals):
+        return None
+    # (aR)^-1 * R^2 = a^-1 * R
+    inv = _limbs([v * _R2 % P for v in batch_inv(vals)])
+    for x in reversed(levels):
+        inv = inv[:, : x.shape[1] // 2]
+        out = np.empty_like(x)
+        out[:, 0::2] = fe_mul(inv, x[:, 1::2])
+        out[:, 1::2] = fe_mul(inv, x[:, 0::2])
+        inv = out
+    return inv[:, : a.shape[1]]
+
+
+# ========== 批量 Jacobian 点运算 ==========
+# 一批点为 (X, Y, Z) 三个 limb 数组，所有路执行同一条公式、没有分支，公式与 JacobianPoint 相同（a = -3）。
+# 输出坐标以乘积之差的形式在约减前合并（X3、Y3 各只约减一次）。
+# 无穷远点与点加的例外情形不在公式内判断：调用方用掩码选择，或在最后发现 Z ≡ 0 后逐点重算。
+def vec_double(X, Y, Z):
+    delta = fe_sqr(Z)
+    gamma = fe_sqr(Y)
+    beta = fe_mul(X, gamma)
+    alpha = fe_mul(X - delta, 3 * (X + delta))
+    t = _conv_sqr(alpha)
+    t[LIMBS + 1 :] -= beta << 3
+    X3 = _reduce(t)
+    t = _conv(alpha, (beta << 2) - X3)
+    t -= _conv_sqr(gamma) << 3
+    Y3 = _reduce(t)
+    Z3 = fe_mul(Y, Z << 1)
+    return X3, Y3, Z3
+
+
+def vec_add_affine(X1, Y1, Z1, x2, y2):
+    # 混合点加，(x2, y2) 为仿射点
+    Z1Z1 = fe_sqr(Z1)
+    H = fe_mul(x2, Z1Z1) - X1
+    r = fe_mul(y2, fe_mul(Z1, Z1Z1)) - Y1
+    HH = fe_sqr(H)
+    HHH = fe_mul(H, HH)
+    V = fe_mul(X1, HH)
+    t = _conv_sqr(r)
+    t[LIMBS + 1 :] -= HHH + (V << 1)
+    X3 = _reduce(t)
+    t = _conv(r, V - X3)
+    t -= _conv(Y1, HHH)
+    Y3 = _reduce(t)
+    Z3 = fe_mul(Z1, H)
+    return X3, Y3, Z3
+
+
+def vec_add(X1, Y1, Z1, X2, Y2, Z2):
+    # 一般 Jacobian 点加
+    Z1Z1 = fe_sqr(Z1)
+    Z2Z2 = fe_sqr(Z2)
+    U1 = fe_mul(X1, Z2Z2)
+    S1 = fe_mul(Y1, fe_mul(Z2, Z2Z2))
+    H = fe_mul(X2, Z1Z1) - U1
+    r = fe_mul(Y2, fe_mul(Z1, Z1Z1)) - S1
+    HH = fe_sqr(H)
+    HHH = fe_mul(H, HH)
+    V = fe_mul(U1, HH)
+    t = _conv_sqr(r)
+    t[LIMBS + 1 :] -= HHH + (V << 1)
+    X3 = _reduce(t)
+    t = _conv(r, V - X3)
+    t -= _conv(S1, HHH)
+    Y3 = _reduce(t)
+    Z3 = fe_mul(fe_mul(Z1, Z2), H)
+    return X3, Y3, Z3
+
+
+def vec_to_affine(X, Y, Z):
+    # 批量归一化，Z 不能为 0；返回 None 表示有路 Z ≡ 0
+    z_inv = fe_batch_inv(Z)
+    if z_inv is None:
+        return None
+    z_inv2 = fe_sqr(z_inv)
+    return fe_mul(X, z_inv2), fe_mul(Y, fe_mul(z_inv2, z_inv))
+
+
+def _select(mask, a, b):
+    # 按路选择：mask 为真的路取 a，否则取 b（a、b 为坐标元组）
+    return tuple(np.where(mask, u, v) for u, v in zip(a, b))
+
+
+# ========== 批量标量乘 ==========
+_vec_base_table = None
+
+
+def _get_vec_base_table():
+    # 基点表的 limb 形式：形状 (窗口, 10, 256)，第 0 项为占位（对应数字 0，由掩码跳过）
+    global _vec_base_table
+    if _vec_base_table is None:
+        rows = FixedBaseTable(G, BASE_WINDOW).table
+        shape = (len(rows), 1 << BASE_WINDOW, LIMBS)
+        coords = []
+        for c in "xy":
+            flat = [getattr(pt, c) for row in rows for pt in [row[1]] + row[1:]]
+            coords.append(fe_from_ints(flat).T.reshape(shape).transpose(0, 2, 1).copy())
+        _vec_base_table = tuple(coords)
+    return _vec_base_table
+
+
+def _scalar_bytes(scalars, order: str):
+    # 各路标量 mod N 的 32 字节编码，形状 (32, lanes)
+    buf = b"".join((int(k) % N).to_bytes(32, order) for k in scalars)
+    return np.frombuffer(buf, dtype=np.uint8).reshape(len(scalars), 32).T.astype(np.intp)
+
+
+def _base_mul_lanes(scalars):
+    # 固定基点梳：第 i 个窗口的数字就是标量的第 i 个字节（小端），每个窗口做一次仿射点加，
+    # 各路的 1/(x2 - x1) 一起用乘积树批量求逆（约 3 次乘法），比混合 Jacobian 点加少近一半乘法。
+    # 对 [1, N-1] 内的标量，累加值与表项不会相同或互为相反点；万一出现 x2 == x1 则返回 None
+    tx, ty = _get_vec_base_table()
+    digits = _scalar_bytes(scalars, "little")
+    x, y = tx[0][:, digits[0]], ty[0][:, digits[0]]
+    inf = digits[0] == 0
+    for i in range(1, len(tx)):
+        d = digits[i]
+        x2, y2 = tx[i][:, d], ty[i][:, d]
+        skip = d == 0
+        add = ~(skip | inf)
+        inv = fe_batch_inv(np.where(add, x2 - x, _ONE))
+        if inv is None:
+            return None
+        lam = fe_mul(y2 - y, inv)
+        t = _conv_sqr(lam)
+        t[LIMBS + 1 :] -= x + x2
+        x3 = _reduce(t)
+        t = _conv(lam, x - x3)
+        t[LIMBS + 1 :] -= y
+        y3 = _reduce(t)
+        x, y = _select(skip, (x, y), _select(inf, (x2, y2), (x3, y3)))
+        inf &= skip
+    return x, y, inf
+
+
+def _mul_lanes(scalars, points):
+    # 各路基点不同：每路先算 1~15 倍点并批量归一化为仿射点，
+    # 再按 4 位固定窗口从高到低处理，每个窗口 4 次倍点 + 1 次混合点加
+    n = len(scalars)
+    lanes = np.arange(n)
+    px, py = fe_from_ints([pt.x for pt in points]), fe_from_ints([pt.y for pt in points])
+    multiples = [vec_double(px, py, np.repeat(_ONE, n, axis=1))]
+    while len(multiples) < 14:
+        multiples.append(vec_add_affine(*multiples[-1], px, py))
+    # jP (2 <= j <= 15) 在 [1, N-1] 内互不相同，Z 不会为 0
+    X, Y, Z = (np.concatenate([m[c] for m in multiples], axis=1) for c in range(3))
+    ax, ay = vec_to_affine(X, Y, Z)
+    table = [np.stack([p, p] + np.split(a, 14, axis=1), axis=1) for p, a in ((px, ax), (py, ay))]  # (10, 16, lanes)
+
+    raw = _scalar_bytes(scalars, "big")
+    digits = np.empty((64, n), dtype=np.intp)
+    digits[0::2] = raw >> 4
+    digits[1::2] = raw & 15
+    R = (table[0][:, digits[0], lanes], table[1][:, digits[0], lanes], np.repeat(_ONE, n, axis=1))
+    inf = digits[0] == 0
+    for d in digits[1:]:
+        for _ in range(4):
+            R = vec_double(*R)
+        T = (table[0][:, d, lanes], table[1][:, d, lanes])
+        S = _select(inf, T + (_ONE,), vec_add_affine(*R, *T))
+        R = _select(d == 0, R, S)
+        inf &= d == 0
+    return R, inf
+
+
+def _jacobian_ints(R, inf, recompute) -> list:
+    # 批量结果转为 JacobianPoint 列表。公式未处理的例外（中途出现相同点相加，最终 Z ≡ 0 但并非无穷远点）
+    # 交给 recompute(i) 逐点重算；在 [1, N-1] 内的标量上只有两部分相加的 verify 可能触发
+    X, Y, Z = (fe_to_ints(c) for c in R)
+    result = []
+    for i, flag in enumerate(inf.tolist()):
+        if flag:
+            result.append(JacobianPoint(mpz(1), mpz(1), mpz(0)))
+        elif Z[i] == 0:
+            result.append(recompute(i))
+        else:
+            result.append(JacobianPoint(X[i], Y[i], Z[i]))
+    return result
+
+
+def _chunks(n: int):
+    for start in range(0, n, MAX_LANES):
+        yield start, min(start + MAX_LANES, n)
+
+
+def base_mul_many(scalars) -> list:
+    """批量计算 k*G，结果与 sm2_acc.base_mul 逐个计算相同。"""
+    scalars = list(scalars)
+    if np is None or len(scalars) < MIN_LANES:
+        return [base_mul(k) for k in scalars]
+    result = []
+    for start, end in _chunks(len(scalars)):
+        part = scalars[start:end]
+        out = _base_mul_lanes(part)
+        if out is None:
+            result += [base_mul(k) for k in part]
+            continue
+        x, y, inf = out
+        for px, py, flag in zip(fe_to_ints(x), fe_to_ints(y), inf.tolist()):
+            result.append(ECPoint(0, 0) if flag else ECPoint(px, py))
+    return result
+
+
+def mul_many(scalars, points) -> list:
+    """批量计算 k_i * P_i，结果与 sm2_acc 逐点计算相同。"""
+    scalars, points = list(scalars), list(points)
+    if np is None or len(scalars) < MIN_LANES:
+        return [multi_scalar_mul([(k, pt)]).to_affine() for k, pt in zip(scalars, points)]
+    jac = []
+    for start, end in _chunks(len(scalars)):
+        pts = points[start:end]
+        # 无穷远点不能进入仿射公式，以 G 占位，结果在逐点重算时修正
+        lane_pts = [G if pt.x == 0 and pt.y == 0 else pt for pt in pts]
+        R, inf = _mul_lanes(scalars[start:end], lane_pts)
+        out = _jacobian_ints(R, inf, lambda i, s=start: multi_scalar_mul([(scalars[s + i], points[s + i])]))
+        for i, pt in enumerate(pts):
+            if pt.x == 0 and pt.y == 0:
+                out[i] = JacobianPoint(mpz(1), mpz(1), mpz(0))
+        jac += out
+    return batch_to_affine(jac)
+
+
+def _double_mul_lanes(s_list, t_list, points):
+    # 各路 s*G + t*Q：两部分分别在批内计算后做一次混合点加；基点部分出现例外时返回 None
+    A = _base_mul_lanes(s_list)
+    if A is None:
+        return None
+    ax, ay, inf_a = A
+    B, inf_b = _mul_lanes(t_list, points)
+    R = vec_add_affine(*B, ax, ay)
+    R = _select(inf_a, B, _select(inf_b, (ax, ay, _ONE), R))
+    return R, inf_a & inf_b
+
+
+def double_mul_many(s_list, t_list, points) -> list:
+    """批量计算 s_i*G + t_i*Q_i（Q_i 不能是无穷远点）。"""
+    s_list, t_list, points = list(s_list), list(t_list), list(points)
+    if np is None or len(s_list) < MIN_LANES:
+        return [multi_scalar_mul([(s, G), (t, Q)]).to_affine() for s, t, Q in zip(s_list, t_list, points)]
+    jac = []
+    for start, end in _chunks(len(s_list)):
+        recompute = lambda i, o=start: multi_scalar_mul([(s_list[o + i], G), (t_list[o + i], points[o + i])])  # noqa: E731
+        out = _double_mul_lanes(s_list[start:end], t_list[start:end], points[start:end])
+        if out is None:
+            jac += [recompute(i) for i in range(end - start)]
+            continue
+        jac += _jacobian_ints(*out, recompute)
+    return batch_to_affine(jac)
+
+
+# ========== 批量密钥生成与验签 ==========
+def generate_keypairs(count: int, fast: bool = False) -> list:
+    # 批量生成密钥对。默认逐个按 sm2_acc 的秘密标量点乘模式计算公钥（默认蒙哥马利阶梯）；
+    # fast=True 时走多 limb 批量查表，吞吐更高，但查表下标依赖私钥（与 sm2_acc 的 "window" 模式相同）
+    privs = [random.randint(1, int(N - 1)) for _ in range(count)]
+    return list(zip(privs, base_mul_many(privs) if fast else [secret_mul(k) for k in privs]))
+
+
+def sm2_verify_many(items) -> list:
+    """批量验签，items 格式与 sm2_batch.sm2_verify_batch 相同，返回逐项结果。"""
+    items = list(items)
+    if np is None or len(items) < MIN_LANES:
+        return sm2_verify_batch(items)
+    results = [False] * len(items)
+    za_cache = {}
+    lanes = []  # (序号, e, r, s, t, 公钥)
+    for i, item in enumerate(items):
+        public_key, msg, (r, s) = item[:3]
+        user_id = item[3] if len(item) > 3 else DEFAULT_USER_ID
+        if not (1 <= r < N and 1 <= s < N) or (r + s) % N == 0:
+            continue
+        if public_key.x == 0 and public_key.y == 0:
+            results[i] = sm2_verify(public_key, msg, (r, s), user_id)
+            continue
+        key = (int(public_key.x), int(public_key.y), user_id)
+        za_state = za_cache.get(key)
+        if za_state is None:
+            za_state = za_cache[key] = SM3(calc_ZA(user_id, public_key))
+        h = za_state.copy()
+        h.update(msg)
+        lanes.append((i, int.from_bytes(h.digest(), "big"), r, s, (r + s) % N, public_key))
+
+    for start, end in _chunks(len(lanes)):
+        part = lanes[start:end]
+        out = _double_mul_lanes([x[3] for x in part], [x[4] for x in part], [x[5] for x in part])
+        jac = [None] * len(part) if out is None else _jacobian_ints(*out, lambda j: None)
+        for (i, e, r, s, t, pub), pt in zip(part, jac):
+            if pt is None:
+                item = items[i]
+                results[i] = sm2_verify(pub, item[1], (r, s), item[3] if len(item) > 3 else DEFAULT_USER_ID)
+            elif pt.Z == 0:
+                results[i] = e % N == r
+            else:
+                x1 = (r - e) % N
+                results[i] = x_matches(pt, x1) or (x1 + N < P and x_matches(pt, x1 + N))
+    return results
+
+
+# ========== 测试与性能 ==========
+def vec_self_test():
+    if np is None:
+        print("未安装 numpy，跳过多 limb 批量点运算测试")
+        return
+    rnd = random.Random(2023)
+    xs = [rnd.randrange(P) for _ in range(300)] + [0, 1, int(P) - 1]
+    ys = [rnd.randrange(P) for _ in range(300)] + [int(P) - 1, int(P) - 1, int(P) - 1]
+    a, b = fe_from_ints(xs), fe_from_ints(ys)
+    assert fe_to_ints(a) == xs
+    assert fe_to_ints(fe_mul(a, b)) == [x * y % P for x, y in zip(xs, ys)], "limb 乘法结果错误"
+    assert fe_to_ints(fe_sqr(a)) == [x * x % P for x in xs], "limb 平方结果错误"
+    inv = fe_to_ints(fe_batch_inv(a[:, :300]))
+    assert all(x * i % P == 1 for x, i in zip(xs, inv)), "批量求逆结果错误"
+    assert fe_batch_inv(a[:, 290:]) is None
+    # 惰性约减的边界：输入 limb 取到约 2^29
+    c = 7 * fe_mul(a, b) - (a << 2)
+    assert fe_to_ints(fe_sqr(c)) == [(7 * x * y - 4 * x) ** 2 % P for x, y in zip(xs, ys)]
+
+    scalars = [rnd.randrange(1, N) for _ in range(200)]
+    scalars += [1, 2, 255, 256, 1 << 200, int(N) - 1, int(N) - 2, 0, int(N), 0x100000001]
+    expected = [base_mul(k) for k in scalars]
+    assert base_mul_many(scalars) == expected, "批量 k*G 与 sm2_acc 不一致"
+    points = [base_mul(rnd.randrange(1, N)) for _ in range(len(scalars) - 1)] + [ECPoint(0, 0)]
+    expected = [multi_scalar_mul([(k, pt)]).to_affine() for k, pt in zip(scalars, points)]
+    assert mul_many(scalars, points) == expected, "批量 k*P 与 sm2_acc 不一致"
+
+    # 例外情形：s*G 与 t*G 相加时出现相同点（走逐点重算）与互为相反点（无穷远点）
+    s_list = scalars[:100] + [5, 7, 9]
+    t_list = scalars[100:200] + [5, N - 7, 11]
+    qs = points[:100] + [G, G, base_mul(3)]
+    expected = [multi_scalar_mul([(s, G), (t, Q)]).to_affine() for s, t, Q in zip(s_list, t_list, qs)]
+    assert double_mul_many(s_list, t_list, qs) == expected, "批量 s*G + t*Q 与 sm2_acc 不一致"
+
+    pairs = generate_keypairs(4) + generate_keypairs(4, fast=True)
+    assert all(base_mul(priv) == pub for priv, pub in pairs), "批量密钥生成结果错误"
+    keys = [SigningKey(priv) for priv, _ in pairs]
+    items = []
+    for i in range(200):
+        sk = keys[i % 8]
+        msg = rnd.randbytes(rnd.randint(1, 80))
+        items.append((sk.public_key, msg, sk.sign(msg)))
+    for i in range(0, 200, 9):
+        pub, msg, (r, s) = items[i]
+        items[i] = (pub, msg, (r, (s + 1) % N))
+    items.append((keys[0].public_key, b"abc", (0, 1)))
+    items.append((keys[1].public_key, b"uid", keys[1].sign(b"uid", b"alice"), b"alice"))
+    assert sm2_verify_many(items) == [sm2_verify(*item) for item in items], "批量验签结果与逐个验签不一致"
+    print("多 limb 批量点运算测试通过 ✅")
+
+
+def _time(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def vec_performance_test(count: int = 10000):
+    if np is None:
+        return
+    rnd = random.Random(7)
+    lanes = min(count, MAX_LANES)
+    xs = [rnd.randrange(P) for _ in range(lanes)]
+    ys = [rnd.randrange(P) for _ in range(lanes)]
+    gx, gy = [mpz(x) for x in xs], [mpz(y) for y in ys]
+    a, b = fe_from_ints(xs), fe_from_ints(ys)
+    loop, _ = _time(lambda: [x * y % P for x, y in zip(gx, gy)])
+    vec, _ = _time(lambda: [fe_mul(a, b) for _ in range(10)])
+    print(f"域乘法({lanes}路): gmpy2逐个 {loop*1e6/lanes:.3f}微秒/次, 多limb批量 {vec*1e5/lanes:.3f}微秒/次")
+
+    pts = [JacobianPoint.from_affine(base_mul(rnd.randrange(1, N))) for _ in range(lanes)]
+    aff = [base_mul(rnd.randrange(1, N)) for _ in range(lanes)]
+    V = tuple(fe_from_ints([getattr(p, c) for p in pts]) for c in "XYZ")
+    W = tuple(c[:, ::-1].copy() for c in V)
+    ax, ay = fe_from_ints([p.x for p in aff]), fe_from_ints([p.y for p in aff])
+    for name, single, batch in (
+        ("倍点", lambda: [p.double() for p in pts], lambda: vec_double(*V)),
+        ("混合点加", lambda: [p.add_affine(q) for p, q in zip(pts, aff)], lambda: vec_add_affine(*V, ax, ay)),
+        ("一般点加", lambda: [p.add(q) for p, q in zip(pts, pts[::-1])], lambda: vec_add(*V, *W)),
+    ):
+        t1, _ = _time(single)
+        t2, _ = _time(batch)
+        print(f"{name}({lanes}路): 逐点 {t1*1e6/lanes:.2f}微秒, 批量 {t2*1e6/lanes:.2f}微秒, 加速比: {t1/t2:.2f}x")
+
+    _get_vec_base_table()
+    scalars = [rnd.randrange(1, N) for _ in range(count)]
+    t1, expected = _time(lambda: [base_mul(k) for k in scalars])
+    t2, result = _time(lambda: base_mul_many(scalars))
+    assert result == expected
+    print(f"k*G {count}次: 逐个查表 {t1*1e6/count:.1f}微秒/次, 批量 {t2*1e6/count:.1f}微秒/次, 加速比: {t1/t2:.2f}x")
+
+    points = [base_mul(rnd.randrange(1, N)) for _ in range(count)]
+    t1, expected = _time(lambda: [multi_scalar_mul([(k, pt)]).to_affine() for k, pt in zip(scalars, points)])
+    t2, result = _time(lambda: mul_many(scalars, points))
+    assert result == expected
+    print(f"k*P {count}次: 逐个wNAF {t1*1e6/count:.1f}微秒/次, 批量 {t2*1e6/count:.1f}微秒/次, 加速比: {t1/t2:.2f}x")
+
+    mode = sm2_acc.SECRET_MUL_MODE
+    set_secret_mul_mode(MUL_WINDOW)  # 只为快速准备测试签名
+    keys = [SigningKey(rnd.randrange(1, N - 1)) for _ in range(16)]
+    items = []
+    for i in range(count):
+        msg = rnd.randbytes(32)
+        items.append((keys[i % 16].public_key, msg, keys[i % 16].sign(msg)))
+    set_secret_mul_mode(mode)
+    t1, expected = _time(lambda: sm2_verify_batch(items))
+    t2, result = _time(lambda: sm2_verify_many(items))
+    assert result == expected and all(result)
+    print(f"验签 {count}次: sm2_verify_batch {t1*1e6/count:.1f}微秒/次, 批量 {t2*1e6/count:.1f}微秒/次, 加速比: {t1/t2:.2f}x")
+
+
+if __name__ == "__main__":
+    vec_self_test()
+    vec_performance_test(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,172 @@
+import os
+import struct
+import time
+
+from sm3 import BLOCK_SIZE, DIGEST_SIZE, IV, SM3, STATE_HEADER, _T_ROT, sm3_hash
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时逐条调用 sm3_hash
+    np = None
+
+# ========== 多路并行 SM3 ==========
+# 对应 sm3_merkle.c 中的 sm3_batch：一条消息占一路（lane），
+# 分组数相同的消息放进同一个 uint32 数组，每次压缩同时处理所有路。
+# uint32 数组的加法与左移天然按 2^32 回绕，无需再做掩码。
+MIN_LANES = 8  # 路数太少时数组运算的固定开销超过收益，直接逐条计算
+MAX_LANES = 16384  # 单次压缩的最大路数，限制中间数组大小
+_T = [np.uint32(t) for t in _T_ROT] if np is not None else None
+
+
+def _pad(msg: bytes) -> bytes:
+    return msg + b"\x80" + b"\x00" * ((55 - len(msg)) % 64) + struct.pack(">Q", len(msg) * 8)
+
+
+def _rotl(x, n):
+    return (x << np.uint32(n)) | (x >> np.uint32(32 - n))
+
+
+def compress_lanes(V, blocks):
+    # V: 8 个形状为 (lanes,) 的 uint32 数组；blocks: 形状为 (16, lanes) 的 uint32 数组
+    W = list(blocks)
+    for j in range(16, 68):
+        x = W[j - 16] ^ W[j - 9] ^ _rotl(W[j - 3], 15)
+        W.append(x ^ _rotl(x, 15) ^ _rotl(x, 23) ^ _rotl(W[j - 13], 7) ^ W[j - 6])
+
+    A, B, C, D, E, F, G, H = V
+    for j in range(64):
+        a12 = _rotl(A, 12)
+        SS1 = _rotl(a12 + E + _T[j], 7)
+        if j < 16:
+            ff = A ^ B ^ C
+            gg = E ^ F ^ G
+        else:
+            ff = (A & B) | (C & (A | B))
+            gg = ((F ^ G) & E) ^ G
+        TT1 = ff + D + (SS1 ^ a12) + (W[j] ^ W[j + 4])
+        TT2 = gg + H + SS1 + W[j]
+        D = C
+        C = _rotl(B, 9)
+        B = A
+        A = TT1
+        H = G
+        G = _rotl(F, 19)
+        F = E
+        E = TT2 ^ _rotl(TT2, 9) ^ _rotl(TT2, 17)
+    return [v ^ x for v, x in zip(V, (A, B, C, D, E, F, G, H))]
+
+
+def _hash_group(padded):
+    # padded 中各消息填充后长度相同，返回按原顺序排列的摘要
+    lanes = len(padded)
+    nblocks = len(padded[0]) // BLOCK_SIZE
+    words = np.frombuffer(b"".join(padded), dtype=">u4").astype(np.uint32)
+    words = words.reshape(lanes, nblocks, 16).transpose(1, 2, 0)
+    V = [np.full(lanes, v, dtype=np.uint32) for v in IV]
+    for b in range(nblocks):
+        V = compress_lanes(V, np.ascontiguousarray(words[b]))
+    out = np.stack(V, axis=1).astype(">u4").tobytes()
+    return [out[i * DIGEST_SIZE : (i + 1) * DIGEST_SIZE] for i in range(lanes)]
+
+
+def sm3_hash_many(messages) -> list:
+    # 批量计算 SM3 摘要，结果与输入顺序一致
+    messages = [bytes(m) for m in messages]
+    if np is None:
+        return [sm3_hash(m) for m in messages]
+    groups = {}
+    for i, m in enumerate(messages):
+        groups.setdefault((len(m) + 8) // BLOCK_SIZE, []).append(i)
+    result = [None] * len(messages)
+    for idx in groups.values():
+        for start in range(0, len(idx), MAX_LANES):
+            chunk = idx[start : start + MAX_LANES]
+            if len(chunk) < MIN_LANES:
+                for i in chunk:
+                    result[i] = sm3_hash(messages[i])
+                continue
+            for i, digest in zip(chunk, _hash_group([_pad(messages[i]) for i in chunk])):
+                result[i] = digest
+    return result
+
+
+def sm3_hash_records(buf, record_size: int, prefix: bytes = b"", state: SM3 = None) -> bytes:
+    # buf 由若干条等长记录首尾相接组成，逐条计算 SM3(prefix || 记录)，返回拼接的摘要。
+    # 填充直接在 uint8 数组上完成，不为每条记录创建 bytes 对象，适合 Merkle 树逐层构建。
+    # 给定 state 时各路从该中间状态继续（不修改 state），如 KDF 的各计数器块
+    view = memoryview(buf).cast("B")
+    count = len(view) // record_size
+    if count * record_size != len(view):
+        raise ValueError("缓冲区长度不是记录长度的整数倍")
+    if np is None or count < MIN_LANES:
+        base = SM3(prefix) if state is None else state.copy()
+        if state is not None:
+            base.update(prefix)
+        out = []
+        for i in range(count):
+            h = base.copy()
+            h.update(view[i * record_size : (i + 1) * record_size])
+            out.append(h.digest())
+        return b"".join(out)
+    V0, absorbed = IV, 0
+    if state is not None:
+        exported = state.export_state()
+        *V0, length = STATE_HEADER.unpack_from(exported)
+        buf = exported[STATE_HEADER.size :]
+        absorbed, prefix = length - len(buf), buf + prefix
+    msg_len = len(prefix) + record_size
+    padded_len = (msg_len + 8) // BLOCK_SIZE * BLOCK_SIZE + BLOCK_SIZE
+    tail = np.frombuffer(b"\x80" + b"\x00" * (padded_len - msg_len - 9) + struct.pack(">Q", (absorbed + msg_len) * 8), dtype=np.uint8)
+    records = np.frombuffer(view, dtype=np.uint8).reshape(count, record_size)
+    out = []
+    for start in range(0, count, MAX_LANES):
+        chunk = records[start : start + MAX_LANES]
+        lanes = len(chunk)
+        padded = np.empty((lanes, padded_len), dtype=np.uint8)
+        padded[:, : len(prefix)] = np.frombuffer(prefix, dtype=np.uint8)
+        padded[:, len(prefix) : msg_len] = chunk
+        padded[:, msg_len:] = tail
+        words = padded.view(">u4").astype(np.uint32).reshape(lanes, -1, 16).transpose(1, 2, 0)
+        V = [np.full(lanes, v, dtype=np.uint32) for v in V0]
+        for b in range(len(words)):
+            V = compress_lanes(V, np.ascontiguousarray(words[b]))
+        out.append(np.stack(V, axis=1).astype(">u4").tobytes())
+    return b"".join(out)
+
+
+# ========== 测试与性能 ==========
+def batch_self_test():
+    msgs = [os.urandom(n % 300) for n in range(0, 3000, 7)] + [b"abc"] * MIN_LANES
+    assert sm3_hash_many(msgs) == [sm3_hash(m) for m in msgs], "批量SM3结果与逐条计算不一致"
+    for size, prefix in ((32, b"\x00"), (64, b"\x01"), (55, b""), (100, b"ab")):
+        buf = os.urandom(size * 50)
+        expected = b"".join(sm3_hash(prefix + buf[i : i + size]) for i in range(0, len(buf), size))
+        assert sm3_hash_records(buf, size, prefix) == expected, "定长记录批量SM3结果错误"
+        state = SM3(b"z" * 100)
+        expected = b"".join(sm3_hash(b"z" * 100 + prefix + buf[i : i + size]) for i in range(0, len(buf), size))
+        assert sm3_hash_records(buf, size, prefix, state) == expected, "从中间状态继续的批量SM3结果错误"
+        assert sm3_hash_records(buf[: size * 3], size, prefix, state) == expected[:96]
+    print("批量SM3结果校验通过 ✅")
+
+
+def batch_performance_test(count: int = 2000):
+    if np is None:
+        print("未安装 numpy，跳过批量SM3测试")
+        return
+    for size in (32, 64, 200):
+        msgs = [os.urandom(size) for _ in range(count)]
+        start = time.perf_counter()
+        expected = [sm3_hash(m) for m in msgs]
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        digests = sm3_hash_many(msgs)
+        batch_time = time.perf_counter() - start
+        assert digests == expected
+
+        print(f"{count}条{size}字节消息: 逐条 {loop_time:.4f}秒, 批量 {batch_time:.4f}秒, 加速比: {loop_time/batch_time:.2f}x")
+
+
+if __name__ == "__main__":
+    batch_self_test()
+    batch_performance_test()
@@ -0,0 +1,181 @@
+import hmac
+import os
+import struct
+import time
+
+from sm3 import BLOCK_SIZE, DIGEST_SIZE, SM3, sm3_hash
+from sm3_batch import sm3_hash_records
+
+# ========== HMAC-SM3 ==========
+# HMAC(K, m) = SM3((K ^ opad) || SM3((K ^ ipad) || m))。
+# K ^ ipad 与 K ^ opad 恰好各占一个分组，吸收后的中间状态只与密钥有关：
+# HMACKey 预先算好这两个状态，之后每次 MAC 从副本继续，省去两次压缩。
+_IPAD = bytes(x ^ 0x36 for x in range(256))
+_OPAD = bytes(x ^ 0x5C for x in range(256))
+
+
+class HMACKey:
+    __slots__ = ("_inner", "_outer")
+
+    def __init__(self, key: bytes):
+        if len(key) > BLOCK_SIZE:
+            key = sm3_hash(key)
+        key = key.ljust(BLOCK_SIZE, b"\x00")
+        self._inner = SM3(key.translate(_IPAD))
+        self._outer = SM3(key.translate(_OPAD))
+
+    def new(self, msg: bytes = b"") -> "HMAC":
+        return HMAC(self, msg)
+
+    def mac(self, msg: bytes) -> bytes:
+        inner = self._inner.copy()
+        inner.update(msg)
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return outer.digest()
+
+    def verify(self, msg: bytes, tag: bytes) -> bool:
+        return hmac.compare_digest(self.mac(msg), tag)
+
+
+class HMAC:
+    # 增量 HMAC 对象，接口与 SM3 相同
+    __slots__ = ("_key", "_inner")
+    digest_size = DIGEST_SIZE
+    block_size = BLOCK_SIZE
+
+    def __init__(self, key: HMACKey, msg: bytes = b""):
+        self._key = key
+        self._inner = key._inner.copy()
+        if msg:
+            self._inner.update(msg)
+
+    def update(self, data):
+        self._inner.update(data)
+
+    def copy(self) -> "HMAC":
+        other = HMAC.__new__(HMAC)
+        other._key = self._key
+        other._inner = self._inner.copy()
+        return other
+
+    def digest(self) -> bytes:
+        outer = self._key._outer.copy()
+        outer.update(self._inner.digest())
+        return outer.digest()
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+
+def hmac_sm3(key: bytes, msg: bytes) -> bytes:
+    # 一次性接口，每次调用重新吸收 ipad/opad，不在进程内保留密钥；
+    # 同一密钥反复计算 MAC 时应显式创建 HMACKey 复用中间状态
+    return HMACKey(bytes(key)).mac(msg)
+
+
+# ========== SM3 密钥派生函数 ==========
+# GM/T 0003.4 KDF：K = SM3(Z || ct=1) || SM3(Z || ct=2) || ...，ct 为 32 位大端计数器。
+# Z 的整分组部分只压缩一次，各计数器块从同一中间状态继续，互不依赖，
+# 因此成批交给多路并行 SM3 计算（批量不足 MIN_LANES 时逐块计算）。
+KDF_BATCH = 1024  # 流式输出时每批最多计算的计数器块数
+
+
+def _kdf_range(base: SM3, start: int, count: int) -> bytes:
+    # 计数器 start .. start+count-1 对应的密钥流
+    if start + count - 1 > 0xFFFFFFFF:
+        raise OverflowError("KDF 计数器溢出")
+    counters = b"".join(struct.pack(">I", ct) for ct in range(start, start + count))
+    return sm3_hash_records(counters, 4, state=base)
+
+
+def kdf_blocks(z: bytes):
+    # 逐批产生密钥流，批大小从 1 块倍增到 KDF_BATCH 块，不预先生成全部输出
+    base = SM3(z)
+    ct, count = 1, 1
+    while True:
+        yield _kdf_range(base, ct, count)
+        ct += count
+        count = min(count * 2, KDF_BATCH)
+
+
+def kdf(z: bytes, klen: int) -> bytes:
+    # klen 为输出字节数
+    return _kdf_range(SM3(z), 1, (klen + DIGEST_SIZE - 1) // DIGEST_SIZE)[:klen]
+
+
+class KDFStream:
+    # 按需读取任意长度的 KDF 输出，可用于与数据流逐段异或；每次只计算本次读取缺少的块
+    __slots__ = ("_base", "_ct", "_buf")
+
+    def __init__(self, z: bytes):
+        self._base = SM3(z)
+        self._ct = 1
+        self._buf = b""
+
+    def read(self, n: int) -> bytes:
+        if n > len(self._buf):
+            count = (n - len(self._buf) + DIGEST_SIZE - 1) // DIGEST_SIZE
+            self._buf += _kdf_range(self._base, self._ct, count)
+            self._ct += count
+        data = self._buf[:n]
+        self._buf = self._buf[n:]
+        return data
+
+
+# ========== 测试与性能 ==========
+def hmac_self_test():
+    for key in (b"", b"key", os.urandom(64), os.urandom(65), os.urandom(200)):
+        for msg in (b"", b"abc", os.urandom(63), os.urandom(1000)):
+            expected = hmac.new(key, msg, SM3).digest()
+            assert hmac_sm3(key, msg) == expected, "HMAC-SM3 与标准库 hmac 构造结果不一致"
+            h = HMACKey(key).new(msg[:10])
+            h.update(msg[10:])
+            assert h.digest() == expected
+    assert HMACKey(b"k").verify(b"m", hmac_sm3(b"k", b"m")) and not HMACKey(b"k").verify(b"m2", hmac_sm3(b"k", b"m"))
+
+    z = os.urandom(100)
+    direct = b"".join(sm3_hash(z + ct.to_bytes(4, "big")) for ct in range(1, 12))
+    for klen in (0, 1, 16, 32, 33, 352):
+        assert kdf(z, klen) == direct[:klen], "KDF 结果与定义不一致"
+    stream = KDFStream(z)
+    assert stream.read(5) + stream.read(60) + stream.read(0) + stream.read(100) == direct[:165]
+    blocks = kdf_blocks(z)
+    assert b"".join(next(blocks) for _ in range(3)) == direct[:224]
+    long_direct = b"".join(sm3_hash(z + ct.to_bytes(4, "big")) for ct in range(1, 101))
+    assert kdf(z, 3200) == long_direct, "批量 KDF 结果与定义不一致"
+    print("HMAC-SM3 / KDF 测试通过 ✅")
+
+
+def hmac_performance_test(rounds: int = 2000):
+    key = os.urandom(32)
+    msgs = [os.urandom(64) for _ in range(rounds)]
+    hkey = HMACKey(key)
+    rows = [
+        ("标准库 hmac (每次重算 ipad/opad)", lambda m: hmac.new(key, m, SM3).digest()),
+        ("HMACKey.mac (缓存中间状态)", hkey.mac),
+        ("hmac_sm3 (一次性)", lambda m: hmac_sm3(key, m)),
+    ]
+    for name, func in rows:
+        start = time.perf_counter()
+        for m in msgs:
+            func(m)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: 64字节消息 {rounds}次, 平均 {elapsed*1e6/rounds:.1f}微秒, {rounds/elapsed:.0f} 次/秒")
+
+    z = os.urandom(64)
+    klen = 1 << 16
+    start = time.perf_counter()
+    b"".join(sm3_hash(z + ct.to_bytes(4, "big")) for ct in range(1, klen // DIGEST_SIZE + 1))
+    naive = time.perf_counter() - start
+    start = time.perf_counter()
+    stream = KDFStream(z)
+    for _ in range(klen // 4096):
+        stream.read(4096)
+    streamed = time.perf_counter() - start
+    print(f"KDF 输出 {klen // 1024}KB (Z 为64字节): 逐块重算 {naive:.3f}秒, 复用Z中间状态批量流式输出 {streamed:.3f}秒, {klen/streamed/1e6:.2f} MB/s")
+
+
+if __name__ == "__main__":
+    hmac_self_test()
+    hmac_performance_test()
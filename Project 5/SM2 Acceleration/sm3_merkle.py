@@ -0,0 +1,324 @@
+import bisect
+import os
+import sys
+import time
+
+from sm3 import DIGEST_SIZE, sm3_hash
+from sm3_batch import sm3_hash_many, sm3_hash_records
+
+# ========== RFC 6962 Merkle 树（SM3） ==========
+# 叶子哈希 = SM3(0x00 || 数据)，内部节点 = SM3(0x01 || 左 || 右)，空树根 = SM3("")。
+# 树按层存储：levels[0] 为叶子哈希，每层是 32 字节摘要首尾相接的 bytearray；
+# 某层节点数为奇数时最后一个节点原样提升到上一层，与 RFC 6962 按最大 2 的幂拆分的定义等价，
+# 因此第 j 层第 i 个节点恰为叶子区间 [i*2^j, min((i+1)*2^j, n)) 的 MTH。
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+EMPTY_ROOT = sm3_hash(b"")
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return sm3_hash(LEAF_PREFIX + data)
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return sm3_hash(NODE_PREFIX + left + right)
+
+
+def _split(n: int) -> int:
+    # 小于 n 的最大 2 的幂（n > 1）
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+def _parent_level(level) -> bytearray:
+    # 由一层节点批量计算上一层：成对节点作为 64 字节记录一次性交给多路并行 SM3
+    pairs = len(level) // (2 * DIGEST_SIZE)
+    parent = bytearray(sm3_hash_records(memoryview(level)[: pairs * 2 * DIGEST_SIZE], 2 * DIGEST_SIZE, NODE_PREFIX))
+    if len(level) > pairs * 2 * DIGEST_SIZE:
+        parent += level[-DIGEST_SIZE:]
+    return parent
+
+
+class MerkleTree:
+    def __init__(self, leaves=()):
+        self.levels = [bytearray(b"".join(sm3_hash_many(LEAF_PREFIX + bytes(d) for d in leaves)))]
+        self._build()
+
+    @classmethod
+    def from_records(cls, buf, record_size: int) -> "MerkleTree":
+        # 叶子为等长记录首尾相接的缓冲区，叶子哈希同样走定长记录批量路径
+        tree = cls.__new__(cls)
+        tree.levels = [bytearray(sm3_hash_records(buf, record_size, LEAF_PREFIX))]
+        tree._build()
+        return tree
+
+    def _build(self):
+        del self.levels[1:]
+        while len(self.levels[-1]) > DIGEST_SIZE:
+            self.levels.append(_parent_level(self.levels[-1]))
+
+    def __len__(self) -> int:
+        return len(self.levels[0]) // DIGEST_SIZE
+
+    @property
+    def size(self) -> int:
+        return len(self)
+
+    def _node(self, level: int, index: int) -> bytes:
+        return bytes(self.levels[level][index * DIGEST_SIZE : (index + 1) * DIGEST_SIZE])
+
+    def leaf(self, index: int) -> bytes:
+        return self._node(0, index)
+
+    def root(self, size: int = None) -> bytes:
+        size = len(self) if size is None else size
+        if not 0 <= size <= len(self):
+            raise ValueError(f"树大小超出范围: {size}")
+        return self._mth(0, size) if size else EMPTY_ROOT
+
+    # ---------- 增量追加 ----------
+    def append(self, data: bytes) -> int:
+        # 追加一个叶子，只重算最右侧路径上的 O(log n) 个节点，返回叶子序号
+        return self.append_hash(leaf_hash(data))
+
+    def append_hash(self, digest: bytes) -> int:
+        levels = self.levels
+        levels[0] += digest
+        index = len(self) - 1
+        level = 0
+        while len(levels[level]) > DIGEST_SIZE:
+            i = len(levels[level]) // DIGEST_SIZE - 1
+            if i & 1:
+                parent = node_hash(self._node(level, i - 1), self._node(level, i))
+            else:
+                parent = self._node(level, i)
+            if level + 1 == len(levels):
+                levels.append(bytearray())
+            upper = levels[level + 1]
+            pos = (i >> 1) * DIGEST_SIZE
+            if pos == len(upper):
+                upper += parent
+            else:
+                upper[pos : pos + DIGEST_SIZE] = parent
+            level += 1
+        return index
+
+    def extend(self, leaves):
+        for data in leaves:
+            self.append(data)
+
+    # ---------- 子树哈希 ----------
+    def _mth(self, start: int, end: int) -> bytes:
+        # 叶子区间 [start, end) 的 MTH；对齐的完整子树或当前树的右边缘直接查层，否则按 RFC 6962 递归拆分
+        n = end - start
+        j = (n - 1).bit_length()
+        if start % (1 << j) == 0 and (n == 1 << j or end == len(self)):
+            return self._node(j, start >> j)
+        k = _split(n)
+        return node_hash(self._mth(start, start + k), self._mth(start + k, end))
+
+    # ---------- 证明 ----------
+    def inclusion_proof(self, index: int, size: int = None) -> list:
+        # RFC 6962 PATH(m, D[n])：从叶子向上的兄弟节点列表
+        size = len(self) if size is None else size
+        if not 0 <= index < size <= len(self):
+            raise ValueError(f"叶子序号或树大小超出范围: {index}, {size}")
+        proof = []
+        start, end = 0, size
+        while end - start > 1:
+            k = _split(end - start)
+            if index < start + k:
+                proof.append(self._mth(start + k, end))
+                end = start + k
+            else:
+                proof.append(self._mth(start, start + k))
+                start += k
+        proof.reverse()
+        return proof
+
+    def consistency_proof(self, old_size: int, size: int = None) -> list:
+        # RFC 6962 PROOF(m, D[n])，0 < m <= n
+        size = len(self) if size is None else size
+        if not 0 < old_size <= size <= len(self):
+            raise ValueError(f"树大小超出范围: {old_size}, {size}")
+        proof = []
+        m, start, end, complete = old_size, 0, size, True
+        while m != end - start:
+            k = _split(end - start)
+            if m <= k:
+                proof.append(self._mth(start + k, end))
+                end = start + k
+            else:
+                proof.append(self._mth(start, start + k))
+                m -= k
+                start += k
+                complete = False
+        if not complete:
+            proof.append(self._mth(start, end))
+        proof.reverse()
+        return proof
+
+
+# ========== 证明验证 ==========
+def verify_inclusion(leaf: bytes, index: int, size: int, proof, root: bytes) -> bool:
+    # RFC 9162 2.1.3.2，leaf 为叶子哈希
+    if not 0 <= index < size:
+        return False
+    fn, sn, r = index, size - 1, leaf
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            while not fn & 1 and fn:
+                fn >>= 1
+                sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_consistency(old_size: int, size: int, old_root: bytes, root: bytes, proof) -> bool:
+    # RFC 9162 2.1.4.2
+    if not 0 < old_size <= size:
+        return False
+    proof = list(proof)
+    if old_size == size:
+        return not proof and old_root == root
+    if old_size & (old_size - 1) == 0:
+        proof.insert(0, old_root)
+    if not proof:
+        return False
+    fn, sn = old_size - 1, size - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+    fr = sr = proof[0]
+    for c in proof[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = node_hash(c, fr)
+            sr = node_hash(c, sr)
+            while not fn & 1 and fn:
+                fn >>= 1
+                sn >>= 1
+        else:
+            sr = node_hash(sr, c)
+        fn >>= 1
+        sn >>= 1
+    return fr == old_root and sr == root and sn == 0
+
+
+# ========== 有序叶子与不存在性证明 ==========
+class SortedMerkleTree(MerkleTree):
+    # 叶子按字节序严格递增；保留叶子数据以便二分查找相邻叶子
+    def __init__(self, leaves=()):
+        self.data = sorted(set(bytes(d) for d in leaves))
+        super().__init__(self.data)
+
+    def append(self, data: bytes) -> int:
+        data = bytes(data)
+        if self.data and data <= self.data[-1]:
+            raise ValueError("有序树只能追加大于最后一个叶子的数据")
+        self.data.append(data)
+        return super().append(data)
+
+    def absence_proof(self, value: bytes) -> list:
+        # 返回相邻叶子的 (序号, 数据, 包含证明) 列表：value 小于首叶子或大于尾叶子时只有一项
+        value = bytes(value)
+        i = bisect.bisect_left(self.data, value)
+        if i < len(self.data) and self.data[i] == value:
+            raise ValueError("该数据存在于树中")
+        return [(j, self.data[j], self.inclusion_proof(j)) for j in (i - 1, i) if 0 <= j < len(self.data)]
+
+
+def verify_absence(value: bytes, size: int, root: bytes, proof) -> bool:
+    if size == 0:
+        return not proof and root == EMPTY_ROOT
+    if not proof or len(proof) > 2:
+        return False
+    for index, data, path in proof:
+        if not verify_inclusion(leaf_hash(data), index, size, path, root):
+            return False
+    if len(proof) == 2:
+        (lo, lo_data, _), (hi, hi_data, _) = proof
+        return hi == lo + 1 and lo_data < value < hi_data
+    index, data, _ = proof[0]
+    return (index == 0 and value < data) or (index == size - 1 and data < value)
+
+
+# ========== 测试与性能 ==========
+def _reference_root(hashes):
+    # RFC 6962 MTH 的直接递归定义，仅用于校验
+    if len(hashes) == 1:
+        return hashes[0]
+    k = _split(len(hashes))
+    return node_hash(_reference_root(hashes[:k]), _reference_root(hashes[k:]))
+
+
+def merkle_self_test():
+    leaves = [i.to_bytes(4, "big") for i in range(70)]
+    hashes = [leaf_hash(d) for d in leaves]
+    incremental = MerkleTree()
+    assert incremental.root() == EMPTY_ROOT
+    for n in range(1, len(leaves) + 1):
+        incremental.append(leaves[n - 1])
+        bulk = MerkleTree(leaves[:n])
+        expected = _reference_root(hashes[:n])
+        assert bulk.root() == incremental.root() == expected, f"{n} 个叶子的根哈希错误"
+        assert incremental.levels == bulk.levels, "增量追加与整体构建结果不一致"
+    tree = incremental
+    for n in range(1, 41):
+        root = tree.root(n)
+        for m in range(n):
+            assert verify_inclusion(hashes[m], m, n, tree.inclusion_proof(m, n), root), "包含证明验证失败"
+        for m in range(1, n + 1):
+            assert verify_consistency(m, n, tree.root(m), root, tree.consistency_proof(m, n)), "一致性证明验证失败"
+    proof = tree.inclusion_proof(5)
+    assert not verify_inclusion(hashes[6], 5, len(tree), proof, tree.root()), "篡改叶子未被发现"
+    proof = tree.consistency_proof(13)
+    assert not verify_consistency(13, len(tree), tree.root(12), tree.root(), proof), "篡改旧根未被发现"
+
+    records = os.urandom(32 * 1000)
+    bulk = MerkleTree.from_records(records, 32)
+    assert bulk.root() == MerkleTree(records[i : i + 32] for i in range(0, len(records), 32)).root()
+
+    sorted_tree = SortedMerkleTree(i.to_bytes(4, "big") for i in range(0, 200, 2))
+    root, size = sorted_tree.root(), len(sorted_tree)
+    for value in (b"\x00\x00\x00\x03", b"\x00\x00\x00\x00\x01", b"\xff"):
+        assert verify_absence(value, size, root, sorted_tree.absence_proof(value)), "不存在性证明验证失败"
+    forged = sorted_tree.absence_proof(b"\x00\x00\x00\x03")
+    assert not verify_absence(b"\x00\x00\x00\x04", size, root, forged), "伪造的不存在性证明未被发现"
+    print("Merkle 树测试通过 ✅")
+
+
+def merkle_performance_test(max_leaves: int = 100000):
+    # 与 sm3_merkle.c 相同的 10 万叶子规模；命令行参数可指定更大规模，如 10000000
+    sizes = [n for n in (1000, 10000, 100000, 1000000, 10000000) if n < max_leaves] + [max_leaves]
+    for n in sizes:
+        records = os.urandom(32 * n)
+        start = time.perf_counter()
+        tree = MerkleTree.from_records(records, 32)
+        build = time.perf_counter() - start
+
+        index = n // 3
+        start = time.perf_counter()
+        proof = tree.inclusion_proof(index)
+        prove = time.perf_counter() - start
+        assert verify_inclusion(tree.leaf(index), index, n, proof, tree.root())
+
+        start = time.perf_counter()
+        for i in range(100):
+            tree.append(i.to_bytes(8, "big"))
+        append = (time.perf_counter() - start) / 100
+        print(
+            f"{n}个叶子: 构建 {build:.3f}秒 ({build*1e6/n:.2f}微秒/叶子), 根 {tree.root(n).hex()[:16]}..., "
+            f"包含证明 {len(proof)}个节点 {prove*1e6:.0f}微秒, 追加 {append*1e6:.0f}微秒/叶子"
+        )
+
+
+if __name__ == "__main__":
+    merkle_self_test()
+    merkle_performance_test(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
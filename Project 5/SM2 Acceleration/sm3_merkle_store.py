@@ -0,0 +1,252 @@
+import itertools
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+
+from sm3 import DIGEST_SIZE
+from sm3_batch import sm3_hash_many
+from sm3_merkle import LEAF_PREFIX, MerkleTree, _parent_level, _split, node_hash, verify_inclusion
+
+# ========== Merkle 节点文件格式 ==========
+# 头部 64 字节：magic(8) || version(2) || slot_size(2) || leaf_count(8) || reserved(44)
+# 数据：32 字节槽位，按后序排列（与 MMR 相同）：每追加一个叶子，先写叶子哈希，
+# 再依次写出因此变完整的各层父节点。n 个叶子共占 2n - popcount(n) 个槽位，
+# 已写槽位从不改写，追加只在文件尾部进行。
+# 崩溃安全：新槽位先落盘，再更新头部的叶子数作为提交点；重新打开时只认头部记录的叶子数，
+# 提交点之后写了一半的槽位会被忽略并在下次追加时覆盖。
+MAGIC = b"SM3MKL\x00\x00"
+VERSION = 1
+HEADER_SIZE = 64
+_HEAD = struct.Struct(">8sHHQ44x")
+BATCH_LEAVES = 1 << 16
+
+
+class StoreFormatError(ValueError):
+    pass
+
+
+def _slots(n: int) -> int:
+    return 2 * n - n.bit_count()
+
+
+def _pos(height: int, index: int) -> int:
+    # 第 height 层第 index 个完整子树根的槽位：紧跟在它最后一个叶子及其下方父节点之后
+    last = ((index + 1) << height) - 1
+    return 2 * last - last.bit_count() + height
+
+
+_OFFSETS = {}
+
+
+def _postorder_offsets(height: int) -> list:
+    # 高度为 height 的完整子树内，按层序（叶子层、上一层……）排列的节点在后序中的相对槽位
+    if height not in _OFFSETS:
+        _OFFSETS[height] = [_pos(h, i) for h in range(height + 1) for i in range(1 << (height - h))]
+    return _OFFSETS[height]
+
+
+class MappedMerkleTree(MerkleTree):
+    # 节点保存在 mmap 映射文件中的 RFC 6962 Merkle 树，证明与验证接口与 MerkleTree 相同。
+    # 生成证明只读取 O(log n) 个槽位，常驻内存与叶子数无关。
+    def __init__(self, path: str, sync: bool = True):
+        self.path = path
+        self.sync = sync
+        self.reads = 0
+        self._file = open(path, "r+b")
+        try:
+            head = self._file.read(HEADER_SIZE)
+            if len(head) < HEADER_SIZE:
+                raise StoreFormatError("文件过短")
+            magic, version, slot_size, count = _HEAD.unpack(head)
+            if magic != MAGIC:
+                raise StoreFormatError("不是 Merkle 节点文件")
+            if version != VERSION or slot_size != DIGEST_SIZE:
+                raise StoreFormatError(f"不支持的文件版本: {version}")
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER_SIZE + _slots(count) * DIGEST_SIZE:
+                raise StoreFormatError("文件长度小于已提交的槽位数")
+            self._mm = mmap.mmap(self._file.fileno(), size)
+        except BaseException:
+            self._file.close()
+            raise
+        self._count = count
+        self._end = _slots(count)
+
+    @classmethod
+    def create(cls, path: str, leaves=(), sync: bool = True, batch: int = BATCH_LEAVES) -> "MappedMerkleTree":
+        # 新建（覆盖）节点文件，并从叶子迭代器流式构建
+        with open(path, "wb") as f:
+            f.write(_HEAD.pack(MAGIC, VERSION, DIGEST_SIZE, 0))
+            f.write(b"\x00" * 1024 * DIGEST_SIZE)
+            f.flush()
+            os.fsync(f.fileno())
+        tree = cls(path, sync)
+        tree.extend(leaves, batch)
+        return tree
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    # ---------- 槽位读写 ----------
+    def _slot(self, pos: int) -> bytes:
+        self.reads += 1
+        off = HEADER_SIZE + pos * DIGEST_SIZE
+        return self._mm[off : off + DIGEST_SIZE]
+
+    def _reserve(self, slots: int):
+        # 文件按倍增预留空间，扩容后重新映射
+        need = HEADER_SIZE + slots * DIGEST_SIZE
+        if need <= len(self._mm):
+            return
+        size = max(need, 2 * len(self._mm))
+        self._mm.close()
+        self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+
+    def _write(self, data: bytes):
+        off = HEADER_SIZE + self._end * DIGEST_SIZE
+        self._mm[off : off + len(data)] = data
+        self._end += len(data) // DIGEST_SIZE
+
+    def _commit(self, count: int):
+        if self.sync:
+            self._mm.flush()
+        self._mm[:HEADER_SIZE] = _HEAD.pack(MAGIC, VERSION, DIGEST_SIZE, count)
+        if self.sync:
+            self._mm.flush()
+        self._count = count
+
+    # ---------- 追加 ----------
+    def leaf(self, index: int) -> bytes:
+        return self._slot(_pos(0, index))
+
+    def append_hash(self, digest: bytes) -> int:
+        self.extend_hashes(digest)
+        return self._count - 1
+
+    def extend(self, leaves, batch: int = BATCH_LEAVES):
+        # 按批读取叶子迭代器，每批批量计算叶子哈希、写入后提交一次
+        leaves = iter(leaves)
+        while True:
+            chunk = list(itertools.islice(leaves, batch))
+            if not chunk:
+                return
+            self.extend_hashes(b"".join(sm3_hash_many(LEAF_PREFIX + bytes(d) for d in chunk)))
+
+    def extend_hashes(self, hashes):
+        # hashes 为若干叶子哈希首尾相接。每次取一段恰好构成对齐完整子树的叶子，
+        # 逐层批量计算后按后序写入，再与左侧等高的子树根合并
+        hashes = memoryview(hashes).cast("B")
+        total = len(hashes) // DIGEST_SIZE
+        n = self._count
+        self._reserve(_slots(n + total))
+        done = 0
+        while done < total:
+            limit = total - done
+            if n:
+                limit = min(limit, n & -n)
+            height = limit.bit_length() - 1
+            c = 1 << height
+            levels = [bytearray(hashes[done * DIGEST_SIZE : (done + c) * DIGEST_SIZE])]
+            for _ in range(height):
+                levels.append(_parent_level(levels[-1]))
+            nodes = bytearray(_slots(c) * DIGEST_SIZE)
+            offsets = iter(_postorder_offsets(height))
+            for level in levels:
+                for i in range(0, len(level), DIGEST_SIZE):
+                    off = next(offsets) * DIGEST_SIZE
+                    nodes[off : off + DIGEST_SIZE] = level[i : i + DIGEST_SIZE]
+            self._write(bytes(nodes))
+            n += c
+            done += c
+            right = bytes(levels[-1])
+            while not (n >> height) & 1:
+                right = node_hash(self._slot(_pos(height, (n >> height) - 2)), right)
+                self._write(right)
+                height += 1
+        self._commit(n)
+
+    # ---------- 子树哈希 ----------
+    def _mth(self, start: int, end: int) -> bytes:
+        # 对齐的完整子树直接读一个槽位，其余区间按 RFC 6962 拆分，最多 O(log n) 次哈希
+        n = end - start
+        if n & (n - 1) == 0 and start % n == 0:
+            height = n.bit_length() - 1
+            return self._slot(_pos(height, start >> height))
+        k = _split(n)
+        return node_hash(self._mth(start, start + k), self._mth(start + k, end))
+
+
+# ========== 测试与性能 ==========
+def store_self_test():
+    path = os.path.join(tempfile.gettempdir(), "sm3_merkle_store_test.bin")
+    leaves = [i.to_bytes(4, "big") for i in range(300)]
+    memory = MerkleTree(leaves)
+    with MappedMerkleTree.create(path, leaves[:100], sync=False, batch=37) as tree:
+        for data in leaves[100:150]:
+            tree.append(data)
+        tree.extend(leaves[150:], batch=64)
+        for n in (1, 2, 3, 100, 128, 255, 300):
+            assert tree.root(n) == memory.root(n), f"{n} 个叶子的根哈希与内存树不一致"
+        for m in range(0, 300, 7):
+            assert tree.inclusion_proof(m) == memory.inclusion_proof(m), "包含证明与内存树不一致"
+        for m in range(1, 300, 11):
+            assert tree.consistency_proof(m) == memory.consistency_proof(m), "一致性证明与内存树不一致"
+
+        # 模拟崩溃：新槽位已写入但头部叶子数未提交
+        tree._reserve(tree._end + 8)
+        tree._write(os.urandom(8 * DIGEST_SIZE))
+        tree._mm.flush()
+    with MappedMerkleTree(path) as tree:
+        assert len(tree) == 300 and tree.root() == memory.root(), "重新打开后状态错误"
+        tree.append(b"after crash")
+        memory.append(b"after crash")
+        assert tree.root() == memory.root(), "崩溃后继续追加结果错误"
+    os.unlink(path)
+    print("Merkle 节点文件测试通过 ✅")
+
+
+def store_performance_test(leaves: int = 1000000):
+    path = os.path.join(tempfile.gettempdir(), "sm3_merkle_store_bench.bin")
+    start = time.perf_counter()
+    with MappedMerkleTree.create(path, (i.to_bytes(8, "big") for i in range(leaves))) as tree:
+        build = time.perf_counter() - start
+        root = tree.root()
+    size = os.path.getsize(path)
+
+    # 重新打开：不预读任何节点，证明只访问 O(log n) 个槽位
+    with MappedMerkleTree(path) as tree:
+        index = leaves // 3
+        tree.reads = 0
+        start = time.perf_counter()
+        proof = tree.inclusion_proof(index)
+        prove = time.perf_counter() - start
+        reads = tree.reads
+        assert verify_inclusion(tree.leaf(index), index, leaves, proof, root)
+
+        start = time.perf_counter()
+        for i in range(100):
+            tree.append(b"log entry %d" % i)
+        append = (time.perf_counter() - start) / 100
+    os.unlink(path)
+    print(f"{leaves}个叶子流式构建: {build:.2f}秒 ({build*1e6/leaves:.2f}微秒/叶子), 文件 {size/2**20:.1f} MB")
+    print(f"包含证明: {len(proof)}个节点, 读取 {reads} 个槽位, 耗时 {prove*1e6:.0f}微秒")
+    print(f"崩溃安全追加（每次落盘提交）: 平均 {append*1e3:.2f}毫秒/叶子")
+
+
+if __name__ == "__main__":
+    store_self_test()
+    store_performance_test(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
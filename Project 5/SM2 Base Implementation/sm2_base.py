@@ -162,23 +162,23 @@ def sm2_verify(public_key: ECPoint, msg: bytes, signature: Tuple[int, int], user
 
 
 # ========== 性能测试 ==========
-def performance_test():
-    # 生成 100 组测试数据
+def performance_test(rounds: int = 100):
+    # 生成 rounds 组测试数据
     test_cases = []
-    for _ in range(100):
+    for _ in range(rounds):
         priv, pub = generate_keypair()
         msg = random.randbytes(random.randint(10, 100))
         test_cases.append((priv, pub, msg))
 
-    start = time.time()
+    start = time.perf_counter()
     sigs = [sm2_sign(priv, msg) for priv, _, msg in test_cases]
-    sign_time = time.time() - start
-    print(f"签名100次耗时: {sign_time:.4f}秒, 平均每次: {sign_time*1000/1000:.4f}毫秒")
+    sign_time = time.perf_counter() - start
+    print(f"签名{rounds}次耗时: {sign_time:.4f}秒, 平均每次: {sign_time*1000/rounds:.4f}毫秒")
 
-    start = time.time()
+    start = time.perf_counter()
     results = [sm2_verify(pub, msg, sig) for (_, pub, msg), sig in zip(test_cases, sigs)]
-    verify_time = time.time() - start
-    print(f"验签100次耗时: {verify_time:.4f}秒, 平均每次: {verify_time*1000/1000:.4f}毫秒")
+    verify_time = time.perf_counter() - start
+    print(f"验签{rounds}次耗时: {verify_time:.4f}秒, 平均每次: {verify_time*1000/rounds:.4f}毫秒")
 
     if all(results):
         print("所有验签结果正确 ✅")
@@ -1,7 +1,11 @@
 import ecdsa
 import hashlib
 import os
-from ecdsa import ellipticcurve  # Import the ellipticcurve module
+import sys
+
+# 点运算与验签使用 SM2 Acceleration 中的通用曲线引擎（secp256k1 走 GLV 自同态），ecdsa 库只用于生成密钥与对照
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "SM2 Acceleration"))
+from ec_curves import SECP256K1, ecdsa_benchmark  # noqa: E402
 
 # --- 1. 场景设置 ---
 # 使用比特币所用的椭圆曲线 SECP256k1
@@ -12,6 +16,7 @@ n = curve.order  # 曲线的阶
 # 为了实验，我们在此生成一个全新的密钥对
 private_key = ecdsa.SigningKey.generate(curve=curve)
 public_key = private_key.get_verifying_key()
+Q = (public_key.pubkey.point.x(), public_key.pubkey.point.y())
 
 print("--- 密钥信息 ---")
 print(f"私钥 (十六进制): {private_key.to_string().hex()}")
@@ -37,20 +42,19 @@ u2 = int.from_bytes(os.urandom(32), "big") % n
 print(f"1. 攻击者选择随机数 u1, u2")
 
 # 步骤 2: 计算伪造的点 R' = u1*G + u2*pubKey
-# G 是曲线的生成点
-G = curve.generator
-R_prime = u1 * G + u2 * public_key.pubkey.point
+# G 是曲线的生成点，u1*G 与 u2*pubKey 交错计算、共用一条倍点链
+R_prime = SECP256K1.double_mul(u1, u2, Q)
 print(f"2. 计算伪造点 R' = u1*G + u2*pubKey")
 
 # #################################################
 # ##                 CORRECTED LINE              ##
 # #################################################
-if R_prime == ellipticcurve.INFINITY:
+if R_prime is None:
     raise ValueError("计算出的R'是无穷远点，请重新选择u1, u2")
 
 # 步骤 3: 从 R' 构造伪造的 r' 和 s'
-# r' 是 R' 点的 x 坐标
-forged_r = R_prime.x()
+# r' 是 R' 点的 x 坐标（模 n）
+forged_r = int(R_prime[0]) % n
 # s' = r' * u2⁻¹ mod n
 # modInverse(a, m) 计算 a 在模 m 下的乘法逆元
 forged_s = (forged_r * ecdsa.numbertheory.inverse_mod(u2, n)) % n
@@ -75,20 +79,20 @@ print("-" * 60)
 
 # --- 4. 脆弱的验证过程 ---
 # 这个验证函数存在安全漏洞：它直接接受外部传入的哈希值
-def vulnerable_verify(vk, signature, provided_hash_bytes):
+def vulnerable_verify(pub, signature, provided_hash_bytes):
     """一个有漏洞的验证函数，它信任外部提供的哈希值。"""
     try:
-        # ecdsa库的verify_digest方法正是用于这种情况
-        # 它假设你已经安全地计算了哈希摘要
-        return vk.verify_digest(signature, provided_hash_bytes, sigdecode=ecdsa.util.sigdecode_der)
-    except ecdsa.BadSignatureError:
+        # 与 ecdsa 库的 verify_digest 相同：假设调用者已经安全地计算了哈希摘要
+        r, s = ecdsa.util.sigdecode_der(signature, n)
+    except ecdsa.der.UnexpectedDER:
         return False
+    return SECP256K1.ecdsa_verify(pub, provided_hash_bytes, r, s)
 
 
 print("--- 场景A: 脆弱的验证过程 ---")
 print("验证者直接使用攻击者提供的伪造哈希进行验证...")
 
-is_valid_vulnerable = vulnerable_verify(public_key, forged_signature, forged_hash_bytes)
+is_valid_vulnerable = vulnerable_verify(Q, forged_signature, forged_hash_bytes)
 
 print(f"\n验证结果: {is_valid_vulnerable}")
 if is_valid_vulnerable:
@@ -101,13 +105,13 @@ print("-" * 60)
 
 # --- 5. 正确且安全的验证过程 ---
 # 这个验证函数是安全的：它忽略外部哈希，自己对原始消息进行哈希计算
-def secure_verify(vk, signature, original_message):
+def secure_verify(pub, signature, original_message):
     """一个安全的验证函数，它总是自己计算消息的哈希值。"""
     try:
-        # ecdsa库的verify方法会先对message进行哈希（默认SHA-1，需指定）
-        return vk.verify(signature, original_message, hashfunc=hashlib.sha256, sigdecode=ecdsa.util.sigdecode_der)
-    except ecdsa.BadSignatureError:
+        r, s = ecdsa.util.sigdecode_der(signature, n)
+    except ecdsa.der.UnexpectedDER:
         return False
+    return SECP256K1.ecdsa_verify(pub, hashlib.sha256(original_message).digest(), r, s)
 
 
 print("--- 场景B: 安全的验证过程 ---")
@@ -118,7 +122,7 @@ real_hash_of_forged_message = hashlib.sha256(forged_message).digest()
 print(f"伪造消息的真实哈希 (bytes): {real_hash_of_forged_message.hex()}")
 print(f"攻击者构造的伪造哈希 (bytes): {forged_hash_bytes.hex()}")
 
-is_valid_secure = secure_verify(public_key, forged_signature, forged_message)
+is_valid_secure = secure_verify(Q, forged_signature, forged_message)
 
 print(f"\n验证结果: {is_valid_secure}")
 if not is_valid_secure:
@@ -127,3 +131,14 @@ if not is_valid_secure:
 else:
     print("❌ 防御失败，这不应该发生！")
 print("-" * 60)
+
+
+# --- 6. 与 ecdsa 库对照 ---
+print("--- ecdsa 库对照与验签性能 ---")
+try:
+    library_result = public_key.verify_digest(forged_signature, forged_hash_bytes, sigdecode=ecdsa.util.sigdecode_der)
+except ecdsa.BadSignatureError:
+    library_result = False
+print(f"ecdsa.verify_digest 对伪造签名的结果: {library_result} (与脆弱验证一致: {library_result == is_valid_vulnerable})")
+ecdsa_benchmark(200)
+print("-" * 60)